@@ -1,3 +1,17 @@
-# Import the whole augmentation tree
+# The augmentation tree is imported on first use: netlab CLI commands that don't transform
+# topologies (status, connect, help) don't have to load it
+#
+import importlib
+import typing
 
-from . import components, config, devices, groups, links, main, nodes, plugin, tools, topology, validate
+AUGMENT_MODULES: typing.Final[tuple] = (
+  'cache', 'components', 'config', 'devices', 'groups', 'links', 'main', 'nodes', 'plugin', 'tools', 'topology', 'validate')
+
+if typing.TYPE_CHECKING:                          # pragma: no cover -- let the type checkers see the whole tree
+  from . import cache, components, config, devices, groups, links, main, nodes, plugin, tools, topology, validate
+
+def __getattr__(name: str) -> typing.Any:
+  if name in AUGMENT_MODULES:
+    return importlib.import_module(f'.{name}',__name__)
+
+  raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -48,9 +48,9 @@ parameters when the corresponding addressing parameteres are missing:
 * _p2p_ and _p2p_subnet_ defaults are used to create _p2p_ pool
 '''
 
+import bisect
 import ipaddress
 import sys
-import types
 import typing
 
 import netaddr
@@ -211,6 +211,68 @@ def validate_pools(addrs: Box, topology: Box) -> None:
       category=log.MissingValue,
       module='addressing')
 
+"""
+SubnetAllocator -- allocate subnets of an addressing pool prefix
+
+The allocator computes the subnets with integer arithmetic (no subnet lists or generators)
+and keeps track of the used subnets:
+
+* next() returns the next unused subnet
+* nth(n) returns the n-th subnet from the list of subnets allocated by index. The list is
+  extended with unused subnets when needed, so the two allocation methods never return
+  the same subnet.
+
+Both methods return None when the pool is exhausted.
+"""
+IPNetwork = typing.Union[ipaddress.IPv4Network,ipaddress.IPv6Network]
+
+class SubnetAllocator:
+  def __init__(self, prefix: IPNetwork, plen: int) -> None:
+    self.prefix = prefix
+    self.plen = plen
+    self.base = int(prefix.network_address)
+    self.step = 1 << max(prefix.max_prefixlen - plen,0)
+    self.count = 1 << (plen - prefix.prefixlen) if prefix.prefixlen <= plen <= prefix.max_prefixlen else 0
+    self.used = 0                                     # Number of allocated subnets
+    self.nth_runs: typing.List[typing.Tuple[int,int,int]] = []
+    self.nth_start: typing.List[int] = []             # Subnets allocated by index: (first index, first subnet, count)
+    self.nth_count = 0                                # ... and the index of the first unallocated element
+
+  def __repr__(self) -> str:
+    return f'SubnetAllocator({self.prefix} -> /{self.plen}, used {self.used}/{self.count})'
+
+  def subnet(self, idx: int) -> IPNetwork:
+    if not self.count:                                # Same error as the one raised by ip_network.subnets
+      raise ValueError(f'Cannot split {self.prefix} into /{self.plen} subnets')
+    return type(self.prefix)((self.base + idx * self.step,self.plen))
+
+  def next(self) -> typing.Optional[IPNetwork]:
+    if self.used >= self.count:
+      if not self.count:
+        self.subnet(0)                                # Raise an exception if the pool cannot be split
+      return None
+
+    self.used += 1
+    return self.subnet(self.used - 1)
+
+  def nth(self, n: int) -> typing.Optional[IPNetwork]:
+    if n > self.nth_count:                            # Extend the list of subnets allocated by index
+      take = min(n - self.nth_count,self.count - self.used)
+      if take and self.nth_runs and self.nth_runs[-1][1] + self.nth_runs[-1][2] == self.used:
+        self.nth_runs[-1] = (self.nth_runs[-1][0],self.nth_runs[-1][1],self.nth_runs[-1][2] + take)
+      elif take:
+        self.nth_runs.append((self.nth_count,self.used,take))
+        self.nth_start.append(self.nth_count)
+      self.used += take
+      self.nth_count += take
+      if n > self.nth_count:
+        if not self.count:
+          self.subnet(0)
+        return None
+
+    run = self.nth_runs[bisect.bisect_right(self.nth_start,n - 1) - 1]
+    return self.subnet(run[1] + n - 1 - run[0])
+
 def create_pool_generators(addrs: Box, no_copy_list: list) -> Box:
   if not addrs:       # pragma: no cover (pretty hard not to have address pools)
     addrs = get_empty_box()
@@ -221,9 +283,9 @@ def create_pool_generators(addrs: Box, no_copy_list: list) -> Box:
       if "_pfx" in key:
         af   = key.replace('_pfx','')
         plen = pfx['prefix'] if af == 'ipv4' else pfx.get('prefix6',64)
-        gen[pool][af] = data.subnets(new_prefix=plen)
+        gen[pool][af] = SubnetAllocator(data,plen)
         if (af == 'ipv4' and plen == 32) or (af == 'ipv6' and plen >= 127) or (pool == 'loopback'):
-          next(gen[pool][af])
+          gen[pool][af].next()
       elif not key in no_copy_list:
         gen[pool][key] = data
   return gen
@@ -239,44 +301,31 @@ def get_pool(pools: Box, pool_list: typing.List[str]) -> typing.Optional[str]:
     module='addressing')                       # pragma: no cover (impossible to get here due to built-in default pools)
   return None                                  # pragma: no cover
 
-def get_nth_subnet(n: int, subnet: types.GeneratorType, cache_list: list) -> ipaddress._BaseNetwork:
-  while len(cache_list) < n:
-    cache_list.append(next(subnet))
-  return cache_list[n-1]
-
 def get_pool_prefix(pools: Box, p: str, n: typing.Optional[int] = None) -> Box:
-  prefixes = get_empty_box()
-  for af in list(pools[p]):
-    if 'cache' in af:                                                 # Skipping over caches
-      continue
-    if not isinstance(pools[p][af],types.GeneratorType):              # Copy non-generator attributes
-      prefixes[af] = pools[p][af]
+  prefixes: dict = {}
+  for af,allocator in pools[p].items():
+    if not isinstance(allocator,SubnetAllocator):                     # Copy non-allocator attributes
+      prefixes[af] = allocator
       continue
 
-    subnet_cache = f'cache_{af}'
-    if n:                                                             # Allocating a specific prefix or IP address from a subnet
-      if not subnet_cache in pools[p]:                                # Set up a cache to speed up things
-        pools[p][subnet_cache] = []
-      try:
-        prefixes[af] = get_nth_subnet(n,pools[p][af],pools[p][subnet_cache])
-      except StopIteration:
-        log.error(
-          f'Cannot allocate {n}-th {af} element from {p} pool',
-          log.IncorrectValue,
-          'addressing')
-    else:                                                             # Just asking for the next available prefix
-      try:
-        prefixes[af] = next(pools[p][af])                             # Let's see if we can get one more
-      except StopIteration:                                           # Ouch, ran out of prefixes, report that
-        log.error(
-          f'Ran out of {af} prefixes in {p} pool' +
-          (' (use --debug addr CLI argument to get more details)' if not log.debug_active('addr') else ''),
-          log.MissingValue,
-          'addressing')
+    subnet = allocator.nth(n) if n else allocator.next()              # Allocate a specific prefix or the next available one
+    if subnet is not None:
+      prefixes[af] = subnet
+    elif n:
+      log.error(
+        f'Cannot allocate {n}-th {af} element from {p} pool',
+        log.IncorrectValue,
+        'addressing')
+    else:                                                             # Ouch, ran out of prefixes, report that
+      log.error(
+        f'Ran out of {af} prefixes in {p} pool' +
+        (' (use --debug addr CLI argument to get more details)' if not log.debug_active('addr') else ''),
+        log.MissingValue,
+        'addressing')
 
   if log.debug_active('addressing'):
     print(f'get_pool_prefix: {p} => {prefixes}')
-  return prefixes
+  return get_box(prefixes)
 
 def get(pools: Box, pool_list: typing.Optional[typing.List[str]] = None, n: typing.Optional[int] = None) -> Box:
   if not pool_list:
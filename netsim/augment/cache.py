@@ -0,0 +1,207 @@
+#
+# Content-addressed cache of transformed topologies
+#
+# The cache key is a hash of the loaded topology (which includes the topology file,
+# included files, defaults, environment variables and CLI settings), the netlab
+# version, and the last-modified time of netlab Python code. The current directory is
+# not part of the key: the loaded topology already contains the names of the input files.
+#
+# Plugin source files are found only during the transformation, so their hashes are
+# stored in the cache entry and checked when the cache entry is used.
+#
+import hashlib
+import os
+import pathlib
+import pickle
+import sys
+import time
+import typing
+
+from box import Box
+
+from .. import __version__
+from ..data import get_box, global_vars
+from ..utils import files as _files
+from ..utils import log, manifest
+from . import main
+
+CACHE_DIR: typing.Final[str] = 'transform-cache'
+
+"""
+get_cache_settings: return the cache settings, or None if the cache is disabled
+"""
+def get_cache_settings(topology: Box) -> typing.Optional[Box]:
+  settings = topology.defaults.netlab.create.cache
+  if not isinstance(settings,Box) or not settings.get('enabled',False):
+    return None
+
+  return settings
+
+def get_cache_dir(settings: Box) -> pathlib.Path:
+  if settings.get('dir',None):
+    return pathlib.Path(os.path.expanduser(settings.dir))
+
+  return _files.get_userdir() / CACHE_DIR
+
+"""
+get_cache_key: compute the cache key from the topology before the transformation
+"""
+def get_cache_key(topology: Box) -> str:
+  topo_data = topology.to_dict()
+  topo_data.get('defaults',{}).get('_cache',{}).pop('timestamp',None)   # Remove the unique topology timestamp
+
+  return manifest.data_hash({
+    'version': __version__,
+    'python':  sys.version,
+    'code':    _files.get_glob_mtime('package:','**/*.py'),
+    'topology': topo_data
+  })
+
+"""
+get_plugin_sources: find the Python and YAML files of all plugins used by the transformed
+topology and return a dictionary of file hashes (mirrors the plugin search in augment.plugin)
+"""
+def file_hash(fname: pathlib.Path) -> str:
+  return hashlib.sha256(fname.read_bytes()).hexdigest()
+
+def get_plugin_sources(topology: Box) -> dict:
+  sources: dict = {}
+  for p_name in topology.get('plugin',[]):
+    for path in topology.defaults.paths.get('plugin',[]):
+      p_path = pathlib.Path(path) / p_name
+      if p_path.is_dir():
+        for p_file in sorted(p_path.rglob('*')):
+          if p_file.suffix in ('.py','.yml') and '__pycache__' not in p_file.parts:
+            sources[str(p_file)] = file_hash(p_file)
+        break
+      if not p_path.exists():
+        p_path = pathlib.Path(path) / f'{p_name}.py'
+      if p_path.is_file():
+        sources[str(p_path)] = file_hash(p_path)
+        break
+
+  return sources
+
+"""
+prune_cache: remove the least-recently-used cache entries
+"""
+def prune_cache(cache_dir: pathlib.Path, max_entries: int) -> None:
+  entries = sorted(cache_dir.glob('*.pickle'),key=lambda f: f.stat().st_mtime,reverse=True)
+  for c_file in entries[max_entries:]:
+    try:
+      c_file.unlink()
+    except Exception:                                       # Concurrent runs could remove the same file
+      pass
+
+"""
+load_cached_topology: try to load the transformed topology and the transformation warnings
+(structured warning records) from the cache
+"""
+def load_cached_topology(c_file: pathlib.Path) -> typing.Optional[typing.Tuple[Box,list]]:
+  if not c_file.exists():
+    if log.debug_active('cache'):
+      print(f'CACHE: no cache entry {c_file}')
+    return None
+
+  try:
+    with c_file.open(mode='rb') as pfile:
+      c_data = pickle.load(pfile)
+  except Exception as ex:                                   # Corrupted cache entry, ignore it
+    if log.VERBOSE or log.debug_active('cache'):
+      log.warning(text=f'Cannot load cached topology {c_file}: {str(ex)}',module='cache')
+    return None
+
+  if not isinstance(c_data,dict) or c_data.get('version',None) != __version__:
+    return None
+
+  topo_data = c_data.get('topology',None)
+  if not isinstance(topo_data,dict):
+    return None
+
+  topology = get_box(topo_data)
+
+  if get_plugin_sources(topology) != c_data.get('plugins',{}):
+    if log.debug_active('cache'):
+      print(f'CACHE: plugin sources changed since {c_file} was created')
+    return None
+
+  try:
+    os.utime(c_file)                                        # Mark the cache entry as recently used
+  except Exception:
+    pass
+
+  return (topology,c_data.get('warnings',[]))
+
+"""
+replay_warnings: repeat the warnings generated during the transformation with the
+original module, hints and extra data. Static hints are printed only once and cleared
+in the topology defaults; restore them from the warning records before the replay.
+"""
+def replay_warnings(topology: Box, warnings: list) -> None:
+  for w_record in warnings:
+    module = w_record['module'] or '-'
+    if w_record.get('hint_text',None):
+      topology.defaults.hints[w_record['module']][w_record['hint']] = w_record['hint_text']
+    log.error(
+      w_record['text'],
+      category=Warning,
+      module=module,
+      hint=w_record.get('hint',None),
+      more_hints=w_record.get('more_hints',None),
+      more_data=w_record.get('more_data',None))
+
+"""
+save_cached_topology: save the transformed topology and transformation warnings (structured
+warning records, see log.get_warning_log)
+"""
+def save_cached_topology(c_file: pathlib.Path, topology: Box, warnings: list, settings: Box) -> None:
+  c_data = {
+    'version':  __version__,
+    'plugins':  get_plugin_sources(topology),
+    'warnings': warnings,
+    'topology': topology.to_dict()
+  }
+  try:
+    c_file.parent.mkdir(parents=True,exist_ok=True)
+    t_file = c_file.with_suffix(f'.{os.getpid()}.tmp')     # Write a temporary file and rename it to make
+    with t_file.open(mode='wb') as pfile:                   # concurrent netlab runs safe
+      pickle.dump(c_data,pfile)
+    t_file.replace(c_file)
+    prune_cache(c_file.parent,settings.get('max_entries',100))
+    if log.debug_active('cache'):
+      print(f'CACHE: saved transformed topology into {c_file}')
+  except Exception as ex:
+    if log.VERBOSE or log.debug_active('cache'):
+      log.warning(
+        text=f'Cannot save transformed topology into {c_file}',
+        more_data=[ str(ex) ],
+        module='cache')
+
+"""
+transform: transform the topology or get the transformation results from the cache.
+
+Returns the transformed topology, which is not necessarily the topology passed to the function
+"""
+def transform(topology: Box) -> Box:
+  settings = get_cache_settings(topology)
+  if settings is None:
+    main.transform(topology)
+    return topology
+
+  c_file = get_cache_dir(settings) / f'{get_cache_key(topology)}.pickle'
+  c_entry = load_cached_topology(c_file)
+  if c_entry is not None:
+    c_topology,warnings = c_entry
+    if log.VERBOSE or log.debug_active('cache'):
+      print(f'Using cached transformation results from {c_file}')
+    c_topology.defaults._cache.timestamp = time.time()
+    global_vars.init(c_topology)
+    replay_warnings(c_topology,warnings)
+    return c_topology
+
+  w_start = len(log.get_warning_log(records=True))
+  main.transform(topology)
+  if not log.pending_errors():
+    save_cached_topology(c_file,topology,log.get_warning_log(records=True)[w_start:],settings)
+
+  return topology
@@ -16,45 +16,82 @@ Get node provider -- return node-specific provider or the default provider
 def get_provider(node: Box, defaults: Box) -> str:
   return node.get('provider',defaults.provider)
 
+"""
+Resolved device data cache
+
+The consolidated device data (device data merged with the provider-specific device data) is
+computed once per (device, provider) combination and reused by get_device_attribute,
+get_device_features, get_consolidated_device_data and get_node_group_var.
+
+The cache is kept in the 'device_cache' global variable of the topology being transformed.
+It's created after the device settings have been set up (augment_device_settings) and removed
+at the end of the transformation (cleanup); the device data is merged on every call outside
+of the topology transformation.
+
+Anything that changes defaults.devices during the transformation (for example, plugin hooks
+or device quirks) must call clear_device_cache() to invalidate the cached data.
+
+The cached data is shared between the nodes using the same device and provider. The callers
+must not modify it; reading a nonexistent attribute does not create an empty dictionary.
+"""
+class DeviceCache:
+  def __init__(self) -> None:
+    self.entries: typing.Dict[typing.Tuple[str,str],Box] = {}
+
+def clear_device_cache(topology: Box) -> None:
+  d_cache = topology.defaults.get('_globals',{}).get('device_cache',None)
+  if d_cache is not None:
+    d_cache.entries.clear()
+
+def cleanup(topology: Box) -> None:
+  topology.defaults._globals.pop('device_cache',None)
+
+def get_resolved_device_data(devtype: str, provider: str, defaults: Box) -> Box:
+  d_cache = defaults.get('_globals',{}).get('device_cache',None)
+  d_key = (devtype,provider)
+  if d_cache is not None and d_key in d_cache.entries:
+    return d_cache.entries[d_key]
+
+  devdata = defaults.devices[devtype]
+  d_data = devdata + devdata.get(provider,{})     # Merge device and provider data
+  for p in defaults.providers.keys():             # ... and remove provider-specific data
+    d_data.pop(p,None)
+  d_data = Box(
+             d_data,
+             default_box=True,
+             default_box_none_transform=False,
+             default_box_create_on_get=False,
+             box_dots=True)
+  if d_cache is not None:
+    d_cache.entries[d_key] = d_data
+
+  return d_data
+
 """
 Get generic device attribute:
 
 * Use node.device to find device used by the current node
-* Use defaults.provider (future: node data) to find the provider
+* Use node provider or defaults.provider to find the provider
 * Fetch required data using the following inheritance rules:
 
   * If the provider data is not a dictionary, return that (no merge)
   * If the provider data is a dictionary, but the device data is not, return provider data (override)
   * Return a merge of both dictionaries
+
+The merged values come from the resolved device data cache and must not be modified
 """
 def get_device_attribute(node: Box, attr: str, defaults: Box) -> typing.Optional[typing.Any]:
   devtype  = node.device
-  provider = get_provider(node,defaults)
-
   if not devtype in defaults.devices:    # pragma: no cover
     log.fatal(f'Internal error: call to get_device_attribute with unknown device {devtype}')
     return None
 
-  pvalue = None
-  devdata = defaults.devices[devtype]
-
-  if provider in devdata:                # Does this device have attributes for current provider?
-    if attr in devdata[provider]:        # Including the attribute we're looking for?
-      pvalue = devdata[provider][attr]   # Get the provider value
-      if not isinstance(pvalue,dict):    # Provider-specific value is not a dictionary
-        return pvalue                    # No chance of merging, return it
-
-  value = devdata.get(attr,None)         # Non-specific device data
-  if isinstance(value,Box) and isinstance(pvalue,Box):
-    return value+pvalue                  # Return merged dictionaries
-
-  if attr in devdata[provider]:          # Do we have a provider-specific value?
-    return pvalue                        # Provider-specific dictionary overriding non-dictionary device value
-
-  return value                           # Return whatever the device value is
+  return get_resolved_device_data(devtype,get_provider(node,defaults),defaults).get(attr,None)
 
 """
 Get device feature flags -- uses get_device_attribute but returns a Box to keep mypy happy
+
+The device features are not copied unless they have to be merged with node features
 """
 def get_device_features(node: Box, defaults: Box) -> Box:
   n_features = node.get('_features',{})
@@ -69,7 +106,7 @@ def get_device_features(node: Box, defaults: Box) -> Box:
     log.fatal('Device features for device type {node.device} should be a dictionary')
     return data.get_empty_box()
 
-  return features + n_features
+  return features + n_features if n_features else features
 
 """
 Get all device data for current provider
@@ -84,20 +121,14 @@ def get_provider_data(node: Box, defaults: Box) -> Box:
   return defaults.devices[devtype].get(provider,{})
 
 """
-Get consolidated device data
+Get consolidated device data (from the resolved device data cache, do not modify it)
 """
 def get_consolidated_device_data(node: Box, defaults: Box) -> Box:
   devtype  = node.device
-  provider = get_provider(node,defaults)
-
   if not devtype in defaults.devices:
     log.fatal(f'Internal error: call to get_consolidated_device_data with unknown device {devtype}')
 
-  data = defaults.devices[devtype] + defaults.devices[devtype].get(provider,{})
-  for p in defaults.providers.keys():
-    data.pop(p,None)
-
-  return data
+  return get_resolved_device_data(devtype,get_provider(node,defaults),defaults)
 
 """
 Get group variable from node or device data
@@ -348,3 +379,4 @@ def augment_device_settings(topology: Box) -> None:
           'devices')
 
   log.exit_on_error()
+  topology.defaults._globals.device_cache = DeviceCache()
@@ -9,6 +9,7 @@ import netaddr
 from box import Box
 
 from .. import data
+from ..data import global_vars
 from ..data.global_vars import get_const
 from ..data.types import must_be_dict, must_be_id, must_be_list, must_be_string
 from ..data.validate import get_object_attributes, validate_attributes
@@ -218,6 +219,64 @@ def get_link_propagate_attributes(defaults: Box) -> set:
   return set(defaults.attributes.link).union(set(defaults.attributes.link_internal)) - \
          set(defaults.attributes.link_no_propagate)
 
+"""
+Interface index allocator
+
+The allocator tracks the ifindex values used by every interface type on a node (the
+None type covers all non-virtual interfaces) and the lowest candidate ifindex for every
+(type, start) combination. Interfaces are only ever appended to the node interface list
+during the transformation, so the allocator has to inspect only the interfaces added
+since the previous call, and the lowest unused ifindex can only grow.
+
+The allocators are kept in the 'ifindex_allocator' global variable (indexed by node name),
+and removed during the final node cleanup. An allocator is rebuilt on the next call when
+the node interface list is replaced (for example, when a module removes interfaces) or
+when it gets shorter.
+"""
+class IfindexAllocator:
+
+  def __init__(self, intf_list: list) -> None:
+    self.intf_list = intf_list
+    self.seen = 0
+    self.used: typing.Dict[typing.Optional[str],set] = {}
+    self.next: typing.Dict[typing.Tuple[typing.Optional[str],int],int] = {}
+
+  def update(self, intf_list: list) -> None:
+    for intf in intf_list[self.seen:]:            # Process the interfaces added since the last call
+      intf_type = intf.type
+      ifindex = intf.ifindex
+      for key in [ intf_type ] if intf_type in VIRTUAL_INTERFACE_TYPES else [ intf_type, None ]:
+        try:
+          self.used.setdefault(key,set()).add(ifindex)
+        except TypeError:                         # Non-hashable type or ifindex cannot match the requested values
+          pass
+    self.seen = len(intf_list)
+
+  def allocate(self, iftype: typing.Optional[str], start: int, stop: int) -> typing.Optional[int]:
+    used = self.used.get(iftype,set())
+    ifindex = max(start,self.next.get((iftype,start),start))
+    while ifindex < stop:                         # Skip the used ifindex values
+      if ifindex not in used:                     # ... and return the first one that is not used
+        self.next[(iftype,start)] = ifindex       # Remember it (the caller might not use it)
+        return ifindex
+      ifindex = ifindex + 1
+
+    return None
+
+def get_ifindex_allocator(node: Box) -> IfindexAllocator:
+  intf_list: list = node.interfaces
+  alloc_dict = global_vars.get('ifindex_allocator')
+  alloc = alloc_dict.get(node.name,None)
+  if alloc is None or alloc.seen > len(intf_list) or alloc.intf_list is not intf_list:
+    alloc = IfindexAllocator(intf_list)
+    alloc_dict[node.name] = alloc
+
+  alloc.update(intf_list)
+  return alloc
+
+def cleanup_ifindex_allocators(topology: Box) -> None:
+  topology.defaults._globals.pop('ifindex_allocator',None)
+
 """
 get_unique_ifindex: given interface type, and a start and stop value, find a unique ifindex
 """
@@ -228,14 +287,9 @@ def get_unique_ifindex(
   if stop is None:                                # Assume we can have at most 1000 interfaces of a given type
     stop = start + 1000
 
-  idx_list = [                                    # Build a list of already-used ifindex values
-    intf.ifindex for intf in node.interfaces 
-      if iftype == intf.type or (iftype is None and intf.type not in VIRTUAL_INTERFACE_TYPES) ]
-  ifindex = start
-  while ifindex < stop:                           # Iterate through ifindex values
-    if ifindex not in idx_list:                   # ... returning the first one that is not used
-      return ifindex
-    ifindex = ifindex + 1
+  ifindex = get_ifindex_allocator(node).allocate(iftype,start,stop)
+  if ifindex is not None:
+    return ifindex
 
   log.error(                                      # Ouch, ran out of values :(
     'Cannot get a unique interface index between {start} and {stop} for node {node.name}',
@@ -4,7 +4,7 @@
 
 from box import Box
 
-from .. import augment, modules, providers, roles
+from .. import augment, data, modules, providers, roles
 from .. import devices as quirks
 from ..data import global_vars, validate
 from ..utils import log, versioning
@@ -24,6 +24,7 @@ Note that the plugins have to be loaded before the device settings are
 inherited, or we cannot specify the new features for generic devices.
 """
 def topology_init(topology: Box) -> None:
+  data.set_fast_box(topology.defaults.netlab.create.get('fast_box',True))
   global_vars.init(topology)
   augment.config.attributes(topology)
   augment.config.paths(topology)
@@ -120,10 +121,14 @@ def post_transform(topology: Box) -> None:
   augment.groups.cleanup(topology)
   modules.cleanup(topology)
   augment.plugin.execute('cleanup',topology)
+  augment.devices.cleanup(topology)
   for remove_attr in ['Plugin','pools','_Providers']:
     topology.pop(remove_attr,None)
 
 def transform(topology: Box) -> None:
-  transform_setup(topology)
-  transform_data(topology)
-  post_transform(topology)
+  try:
+    transform_setup(topology)
+    transform_data(topology)
+    post_transform(topology)
+  finally:                                                  # The topology fast_box setting must not leak
+    data.set_fast_box(data.get_fast_box_default())          # ... into subsequent transformations
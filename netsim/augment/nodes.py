@@ -647,6 +647,7 @@ def cleanup(topology: Box) -> None:
                  [ cfg for cfg in n.config if cfg not in plugin_config ]
 
   topology.pop('_plugin_config',None)
+  links.cleanup_ifindex_allocators(topology)
 
 '''
 Return a copy of the topology (leaving original topology unchanged) with unmanaged devices removed
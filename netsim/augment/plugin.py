@@ -14,7 +14,7 @@ from .. import data
 from ..utils import log, strings
 from ..utils import read as _read
 from ..utils import sort as _sort
-from . import config
+from . import config, devices
 
 '''
 merge_plugin_defaults: Merge plugin defaults with topology defaults
@@ -276,6 +276,7 @@ def execute_plugin_hook(action: str, plugin: object, topology: Box) -> None:
     if log.debug_active('plugin'):                          # ... do some logging to help the poor debugging souls
       print(f'plug {action}: {plugin}')
     func(topology)                                          # ... and execute the plugin function
+    devices.clear_device_cache(topology)                    # Plugins might change device defaults
 
 '''
 Execute a plugin action:
@@ -29,9 +29,9 @@ NETLAB_COMMAND: str = ''
 def parser_add_debug(parser: argparse.ArgumentParser, add_test: bool = True) -> None:
   parser.add_argument('--debug', dest='debug', action='store',nargs='*',
                   choices=sorted([
-                    'all','addr','cli','links','libvirt','clab','modules','plugin','template',
+                    'all','addr','cache','cli','links','libvirt','clab','modules','plugin','template',
                     'vlan','vrf','quirks','validate','addressing','groups','status','paths',
-                    'external','defaults','loadable','lag']),
+                    'external','defaults','loadable','lag','ssh']),
                   help=argparse.SUPPRESS)
   if add_test:
     parser.add_argument('--test', dest='test', action='store',nargs='*',
@@ -242,10 +242,17 @@ def change_lab_instance(instance: typing.Union[int,str], quiet: bool = False) ->
 #
 # Snapshot loading code -- loads the specified snapshot file and checks its modification date
 #
+# The default pickled snapshot is replaced with the indexed snapshot when it's available. Commands
+# that need only a few nodes can specify them in the 'nodes' argument; the indexed snapshot
+# loader then skips the other nodes and the links they're not attached to
+#
 def load_snapshot(
       args: typing.Union[argparse.Namespace,Box],
       ghosts: bool = True,
-      warn_modified: bool = True) -> Box:
+      warn_modified: bool = True,
+      nodes: typing.Optional[list] = None) -> Box:
+  from ..utils import snapshot as _snapshot
+
   if 'instance' in args and args.instance:
     change_lab_instance(args.instance,args.quiet if 'quiet' in args else False)
   
@@ -254,6 +261,8 @@ def load_snapshot(
     snapshot = args.snapshot
     if 'quiet' not in args or not args.quiet:
       log.info(f'Using lab snapshot file {args.snapshot}')
+  else:
+    snapshot = _snapshot.get_snapshot_file(snapshot)
 
   if not os.path.isfile(snapshot):
     error_and_exit(
@@ -262,7 +271,9 @@ def load_snapshot(
           "Looks like no lab was started from this directory",
           "Use 'netlab status --all' to display labs running on this system"])
 
-  if '.pickle' in snapshot:
+  if _snapshot.is_snapshot(snapshot):
+    topology = _snapshot.read_snapshot(snapshot,nodes=nodes)
+  elif '.pickle' in snapshot:
     topology = _read.load_pickled_data(snapshot)
   else:
     yaml_topology = _read.read_yaml(filename=snapshot)
@@ -289,8 +300,10 @@ Load data for a reporting/graphing command. The data source could be specified a
 * A lab instance -- unconditionally change directory and load the snapshot file
 * A snapshot file -- used when exist
 * A topology file
+
+The optional list of nodes is passed to load_snapshot (the topology file is always transformed in full)
 """
-def load_data_source(args: argparse.Namespace, ghosts: bool = True) -> Box:
+def load_data_source(args: argparse.Namespace, ghosts: bool = True, nodes: typing.Optional[list] = None) -> Box:
   from . import create
 
   global NETLAB_COMMAND
@@ -300,7 +313,7 @@ def load_data_source(args: argparse.Namespace, ghosts: bool = True) -> Box:
     # but only if the instance is specified or the snapshot file exists
     #
     if args.instance or os.path.isfile(args.snapshot):
-      return load_snapshot(args)
+      return load_snapshot(args,nodes=nodes)
     
     args.topology = 'topology.yml'                # no instance/valid snapshot, try default topology
   else:                                           # topology file was specified, so we must use it
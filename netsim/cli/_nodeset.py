@@ -8,10 +8,11 @@ node name or a glob.
 '''
 
 import fnmatch
+import re
+import typing
 
-from box import Box
+from box import Box, BoxList
 
-from .. import data
 from ..augment import groups
 from ..utils import log
 
@@ -21,15 +22,17 @@ from ..utils import log
 def is_glob(pattern: str) -> bool:
   return any([c in pattern for c in ['*','?','[']])
 
-# Find all names matching a glob expression and append them to the node name list
+# Find all names matching a glob expression and add them to the node name set
 #
-def add_glob(glob: str, names: list, results: list) -> int:
+# The node name set is a dictionary (with None values) to get ordered set semantics
+#
+def add_glob(glob: str, names: list, results: dict) -> int:
+  g_match = re.compile(fnmatch.translate(glob)).match    # Compile the glob expression only once
   g_count = 0
   for name in names:
-    if fnmatch.fnmatch(name,glob):
+    if g_match(name):
       g_count += 1
-      if name not in results:
-        results.append(name)
+      results[name] = None
 
   return g_count
 
@@ -49,41 +52,76 @@ were specified.
 """
 def parse_nodeset(ns: str, topology: Box) -> list:
   n_names = list(topology.nodes.keys())
-  d_names = list(topology.defaults.devices.keys())
-  n_list: list = []
+  n_keys = set(n_names)
+  d_names = set(topology.defaults.devices.keys())
+  n_set: typing.Dict[str,None] = {}                       # Ordered set of node names
+  d_index: typing.Optional[typing.Dict[str,list]] = None  # Device-to-nodes index, built on first use
   for n_element in ns.split(','):
-    if n_element in n_list:
+    if n_element in n_set:
       continue
 
     if is_glob(n_element):
-      if not add_glob(n_element,n_names,n_list):
+      if not add_glob(n_element,n_names,n_set):
         log.error(f'Wildcard node specification {n_element} does not match any nodes',module='-',skip_header=True)
     elif n_element in topology.groups:
-      node_list = groups.group_members(topology,n_element)
-      n_list = n_list + [ n for n in node_list if n not in n_list ]
-    elif n_element in n_names:
-      n_list.append(n_element)
+      n_set.update(dict.fromkeys(groups.group_members(topology,n_element)))
+    elif n_element in n_keys:
+      n_set[n_element] = None
     elif n_element.lower() == 'all':
-      add_glob('*',n_names,n_list)
+      n_set.update(dict.fromkeys(n_names))
     elif n_element in d_names:
-      d_list = [ n_name for n_name,n_data in topology.nodes.items() if n_data.device == n_element ]
-      if d_list:
-        n_list = n_list + [ n_name for n_name in d_list if n_name not in n_list ]
+      if d_index is None:
+        d_index = {}
+        for n_name,n_data in topology.nodes.items():
+          d_index.setdefault(n_data.device,[]).append(n_name)
+      if n_element in d_index:
+        n_set.update(dict.fromkeys(d_index[n_element]))
       else:
         log.error(f'The current lab topology has no {n_element} devices',module='-',skip_header=True)
     else:
       log.error(f'{n_element} is not a glob or a valid node, group, or device name',module='-',skip_header=True)
 
   log.exit_on_error()
-  return n_list
+  return list(n_set)
+
+"""
+Return the list of names in a nodeset that could be loaded from an indexed snapshot
+before the nodeset is parsed, or None if the nodeset contains globs or 'all' (which
+need the names of all nodes in the lab topology)
+"""
+def get_nodeset_names(ns: str) -> typing.Optional[list]:
+  names = ns.split(',')
+  if any(is_glob(n) or n.lower() == 'all' for n in names):
+    return None
+
+  return names
 
 """
 Given a lab topology and a list of nodes, create a subset of the topology (to make our life easier)
+
+The subset is a view of the original topology: it has its own top-level dictionary and its
+own 'nodes' dictionary, but all other data (including the selected nodes) is shared with the
+original topology. Modify the nodes or other topology data in place only if you want to
+change the original topology.
 """
+def get_view_box() -> Box:                                # Get a box that stores Box/BoxList values as-is
+  return Box(
+           {},
+           default_box=True,
+           default_box_none_transform=False,
+           box_dots=True,
+           box_intact_types=(Box,BoxList))
+
 def get_nodeset(topology: Box, node_list: list) -> Box:
-  pruned_box = data.get_box(topology)
-  for node in list(pruned_box.nodes.keys()):
-    if node not in node_list:
-      pruned_box.nodes.pop(node,None)
+  pruned_box = get_view_box()
+  for k,v in topology.items():
+    if k != 'nodes':
+      pruned_box[k] = v
+
+  n_set = set(node_list)
+  pruned_box.nodes = get_view_box()
+  for n_name,n_data in topology.nodes.items():            # Keep nodes in the original order
+    if n_name in n_set:
+      pruned_box.nodes[n_name] = n_data
 
   return pruned_box
@@ -0,0 +1,158 @@
+#
+# Persistent (multiplexed) SSH sessions
+#
+# When enabled with netlab.ssh.multiplex, the netlab commands that execute several
+# commands on the same lab device (validate, the SSH readiness check in initial) start
+# an OpenSSH master session (ControlMaster) for that device, and execute all subsequent
+# commands over the master session, avoiding the TCP handshake, key exchange and
+# authentication. One-shot commands (netlab connect) never use a master session.
+#
+# The master sessions are started when needed and closed when the netlab command
+# exits. The control sockets are stored in a temporary directory; the master sessions
+# also exit after they have been idle for defaults.netlab.ssh.persist seconds in case
+# netlab could not close them.
+#
+import atexit
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import typing
+
+from box import Box
+
+from ..utils import log
+from . import external_commands
+
+CONTROL_DIR: typing.Optional[str] = None
+MASTER_ARGS: typing.Dict[str,list] = {}                 # Control path => SSH arguments for the master session
+MASTER_STARTED: typing.Set[str] = set()                 # Control paths of master sessions netlab started
+MASTER_LOCKS: typing.Dict[str,threading.Lock] = {}
+REGISTRY_LOCK = threading.Lock()
+
+"""
+use_multiplexing: should we use a persistent SSH session for a lab device? The value
+of the netlab_ssh_multiplex device/node variable (n_setting) overrides the global setting
+"""
+def use_multiplexing(n_setting: typing.Any, defaults: Box) -> bool:
+  if not shutil.which('ssh'):
+    return False
+  if n_setting is not None:
+    return bool(n_setting)
+
+  return bool(defaults.netlab.ssh.get('multiplex',False))
+
+def get_control_dir() -> str:
+  global CONTROL_DIR
+  if CONTROL_DIR is None:
+    CONTROL_DIR = tempfile.mkdtemp(prefix='netlab-ssh-')
+    atexit.register(close_masters)
+
+  return CONTROL_DIR
+
+def ssh_position(ssh_args: list) -> int:                # Skip 'sshpass -p password' in front of the 'ssh' command
+  return 3 if ssh_args[0] == 'sshpass' else 0
+
+"""
+ssh_command: add multiplexing parameters to the SSH command
+
+The 'ssh_args' parameter is the SSH command (including sshpass) up to the destination. The
+control path is derived from the SSH arguments, so every combination of destination, user
+and SSH parameters gets its own master session.
+"""
+def ssh_command(ssh_args: list, rest: list, persist: int) -> list:
+  c_hash = hashlib.sha256(' '.join(ssh_args).encode('utf-8')).hexdigest()[:16]
+  c_path = os.path.join(get_control_dir(),c_hash)
+  with REGISTRY_LOCK:
+    if c_path not in MASTER_ARGS:
+      s_pos = ssh_position(ssh_args) + 1
+      MASTER_ARGS[c_path] = ssh_args[:s_pos] + \
+        ['-o','ControlMaster=yes','-o',f'ControlPersist={persist}','-o',f'ControlPath={c_path}','-f','-N'] + \
+        ssh_args[s_pos:]
+      MASTER_LOCKS[c_path] = threading.Lock()
+
+  s_pos = ssh_position(ssh_args) + 1
+  return ssh_args[:s_pos] + ['-o','ControlMaster=no','-o',f'ControlPath={c_path}'] + ssh_args[s_pos:] + rest
+
+def get_control_path(c_args: list) -> typing.Optional[str]:
+  for arg in c_args:
+    if isinstance(arg,str) and arg.startswith('ControlPath=') and arg[12:] in MASTER_ARGS:
+      return arg[12:]
+
+  return None
+
+"""
+master_command: return the command that starts the master session needed by the SSH
+command, or None if the command does not use multiplexing or the master session is running
+"""
+def master_command(c_args: list) -> typing.Optional[list]:
+  c_path = get_control_path(c_args)
+  if c_path is None or (c_path in MASTER_STARTED and os.path.exists(c_path)):
+    return None
+
+  return MASTER_ARGS[c_path]
+
+def set_master_started(c_args: list) -> None:
+  c_path = get_control_path(c_args)
+  if c_path is not None:
+    MASTER_STARTED.add(c_path)
+
+"""
+start_master: start the master session needed by the SSH command. Safe to call from
+multiple threads; the SSH command falls back to a regular SSH session if the master
+session cannot be started.
+
+The master session is started with all its file descriptors redirected to /dev/null
+as it keeps running in the background.
+"""
+def start_master(c_args: list, timeout: int = 30) -> bool:
+  c_path = get_control_path(c_args)
+  if c_path is None or external_commands.is_dry_run():
+    return False
+
+  with MASTER_LOCKS[c_path]:
+    m_cmd = master_command(c_args)
+    if m_cmd is None:
+      return True
+    if log.debug_active('ssh'):
+      print(f'SSH: starting master session {m_cmd}')
+    try:
+      result = subprocess.run(
+                  m_cmd,
+                  stdin=subprocess.DEVNULL,
+                  stdout=subprocess.DEVNULL,
+                  stderr=subprocess.DEVNULL,
+                  timeout=timeout)
+      if result.returncode == 0:
+        MASTER_STARTED.add(c_path)
+        return True
+    except Exception as ex:
+      if log.debug_active('ssh'):
+        print(f'SSH: cannot start master session {c_path}: {ex}')
+
+  return False
+
+"""
+close_masters: close all master sessions started by netlab, remove the control directory
+"""
+def close_masters() -> None:
+  global CONTROL_DIR
+  for c_path in list(MASTER_STARTED):
+    try:
+      subprocess.run(
+        [ 'ssh','-o',f'ControlPath={c_path}','-O','exit','netlab' ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        timeout=5)
+    except Exception:
+      pass
+
+  MASTER_STARTED.clear()
+  MASTER_ARGS.clear()
+  MASTER_LOCKS.clear()
+  if CONTROL_DIR is not None:
+    shutil.rmtree(CONTROL_DIR,ignore_errors=True)
+    CONTROL_DIR = None
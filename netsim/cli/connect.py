@@ -20,8 +20,16 @@ class LogLevel(IntEnum):
 from box import Box
 
 from ..outputs import common as outputs_common
-from ..utils import log, strings, templates
-from . import error_and_exit, external_commands, load_snapshot, parser_add_verbose, parser_lab_location, set_dry_run
+from ..utils import log, strings
+from . import (
+  _sshmux,
+  error_and_exit,
+  external_commands,
+  load_snapshot,
+  parser_add_verbose,
+  parser_lab_location,
+  set_dry_run,
+)
 
 
 #
@@ -51,11 +59,7 @@ def connect_parse(args: typing.List[str]) -> typing.Tuple[argparse.Namespace, ty
 
   return parser.parse_known_args(args)
 
-def docker_connect(
-      data: Box,
-      p_args: argparse.Namespace,
-      rest: typing.List[str],
-      log_level: LogLevel = LogLevel.INFO) -> typing.Union[bool,int,str]:
+def docker_command(data: Box, rest: typing.List[str], tty: bool = True) -> list:
   host = data.ansible_host or data.host
 
   shell = data.get('docker_shell','bash' if rest else 'bash -il')
@@ -63,13 +67,23 @@ def docker_connect(
     shell = str(shell).split(' ')
 
   c_args = [ 'docker','exec' ]
-  if sys.__stdin__ is not None and sys.__stdin__.isatty():
+  if tty and sys.__stdin__ is not None and sys.__stdin__.isatty():
     c_args += [ '-it']
   c_args += [ host ] + shell
 
   if rest:
     c_args.extend(['-c',' '.join(rest)])
 
+  return c_args
+
+def docker_connect(
+      data: Box,
+      p_args: argparse.Namespace,
+      rest: typing.List[str],
+      log_level: LogLevel = LogLevel.INFO) -> typing.Union[bool,int,str]:
+  host = data.ansible_host or data.host
+  c_args = docker_command(data,rest)
+
   if log_level == LogLevel.DRY_RUN:
     print(f"DRY RUN: {c_args}")
     return True
@@ -88,11 +102,11 @@ def docker_connect(
   need_output = 'output' in p_args and p_args.output
   return run_command(c_args,check_result=need_output,return_stdout=need_output,ignore_errors=True)
 
-def ssh_connect(
+def ssh_command(
       data: Box,
-      p_args: argparse.Namespace,
       rest: typing.List[str],
-      log_level: LogLevel = LogLevel.INFO) -> typing.Union[bool,int,str]:
+      defaults: typing.Optional[Box] = None,
+      multiplex: bool = False) -> list:
   host = data.ansible_host or data.host
   ssh_log_level = 'ERROR' if log.VERBOSE < 2 else 'INFO'
   c_args = ['ssh','-o','UserKnownHostsFile=/dev/null','-o','StrictHostKeyChecking=no','-o',f'LogLevel={ssh_log_level}']
@@ -106,6 +120,8 @@ def ssh_connect(
     c_args = ['sshpass','-p',data.ansible_ssh_pass ] + c_args
 
   if data.ansible_ssh_private_key_file:
+    from ..utils import templates
+
     data.inventory_hostname = data.host
     c_args.extend(['-i', templates.render_template(data,j2_text=data.ansible_ssh_private_key_file)])
 
@@ -117,7 +133,22 @@ def ssh_connect(
   else:
     c_args.extend([host])
 
+  if multiplex and defaults is not None and \
+      _sshmux.use_multiplexing(data.get('netlab_ssh_multiplex',None),defaults):
+    return _sshmux.ssh_command(c_args,rest,defaults.netlab.ssh.get('persist',60))
+
   c_args.extend(rest)
+  return c_args
+
+def ssh_connect(
+      data: Box,
+      p_args: argparse.Namespace,
+      rest: typing.List[str],
+      log_level: LogLevel = LogLevel.INFO,
+      defaults: typing.Optional[Box] = None,
+      multiplex: bool = False) -> typing.Union[bool,int,str]:
+  host = data.ansible_host or data.host
+  c_args = ssh_command(data,rest,defaults,multiplex)
   if log_level == LogLevel.DRY_RUN:
     print(f"DRY RUN: {c_args}")
     return True
@@ -130,6 +161,7 @@ def ssh_connect(
     sys.stderr.write(f'Executing: {" ".join(c_args)}\n')
 
   sys.stderr.flush()
+  _sshmux.start_master(c_args)
   need_output = 'output' in p_args and p_args.output
   return run_command(c_args,check_result=need_output,return_stdout=need_output,ignore_errors=True)
 
@@ -166,18 +198,53 @@ def create_command_list(host: Box, args: argparse.Namespace, rest: list) -> list
   else:
     return rest
 
+def get_host_data(node: str, topology: Box) -> Box:
+  host_data = outputs_common.adjust_inventory_host(
+                node=topology.nodes[node],
+                defaults=topology.defaults,
+                group_vars=True)
+  host_data.host = node
+  return host_data
+
+"""
+get_node_command: build the command that 'connect_to_node' would execute to run
+a (show) command on a lab node without printing anything. Returns None for connection
+methods that need extra handling.
+
+The 'multiplex' parameter (also used by 'connect_to_node') should be set by the callers
+that execute several commands on the same node; they can use a persistent SSH session
+(see cli._sshmux) when it's enabled with the netlab.ssh.multiplex setting.
+
+The callers that execute the command without a terminal (for example, in a worker thread)
+should set the 'tty' parameter to False to get a 'docker exec' command without the '-it' flags.
+"""
+def get_node_command(
+      node: str,
+      args: argparse.Namespace,
+      rest: list,
+      topology: Box,
+      multiplex: bool = False,
+      tty: bool = True) -> typing.Optional[list]:
+  host_data = get_host_data(node,topology)
+  connection = host_data.netlab_console_connection or host_data.ansible_connection
+  rest = create_command_list(host_data,args,rest)
+
+  if connection == 'docker':
+    return docker_command(host_data,rest,tty)
+  elif connection in ['paramiko','ssh','network_cli'] or not connection:
+    return ssh_command(host_data,rest,topology.defaults,multiplex)
+
+  return None
+
 def connect_to_node(      
       node: str, 
       args: argparse.Namespace,
       rest: list,
       topology: Box,
-      log_level: LogLevel = LogLevel.INFO) -> typing.Union[bool,int,str]:
+      log_level: LogLevel = LogLevel.INFO,
+      multiplex: bool = False) -> typing.Union[bool,int,str]:
   
-  host_data = outputs_common.adjust_inventory_host(
-                node=topology.nodes[node],
-                defaults=topology.defaults,
-                group_vars=True)
-  host_data.host = node
+  host_data = get_host_data(node,topology)
   connection = host_data.netlab_console_connection or host_data.ansible_connection
 
   rest = create_command_list(host_data,args,rest)
@@ -187,7 +254,7 @@ def connect_to_node(
   elif connection in ['paramiko','ssh','network_cli','netconf','httpapi'] or not connection:
     if connection in ['netconf','httpapi']:
       print(f"Using SSH to connect to a device configured with {connection} connection")
-    return ssh_connect(host_data,args,rest,log_level)
+    return ssh_connect(host_data,args,rest,log_level,topology.defaults,multiplex)
   else:
     log.fatal(f'Unknown connection method {connection} for host {node}',module='connect')
 
@@ -241,8 +308,8 @@ def run(cli_args: typing.List[str]) -> None:
   set_dry_run(args)
 
   rest = quote_list(rest)     # Quote arguments with whitespaces
-  topology = load_snapshot(args)
   host = args.host
+  topology = load_snapshot(args,nodes=[host])
 
   try:
     if host in topology.nodes:
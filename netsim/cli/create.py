@@ -35,6 +35,7 @@ def create_topology_parse(
       output files created when no output is specified:
 
         * Pickled transformed data in netlab.snapshot.pickle
+        * Indexed snapshot of transformed data in netlab.snapshot.idx
         * Device configuration files
         * Virtualization provider file with provider-specific filename
           (Vagrantfile or clab.yml)
@@ -53,6 +54,8 @@ def create_topology_parse(
     epilog=epilog)
   parser.add_argument('--unlock', dest='unlock', action='store_true',
                   help=argparse.SUPPRESS)
+  parser.add_argument('-j','--jobs', dest='jobs', action='store', type=int,
+                  help='Number of processes used to render device configurations (0: all CPUs)')
 
   parser.add_argument(
     dest='topology', action='store', nargs='?',
@@ -163,9 +166,12 @@ def run(cli_args: typing.List[str],
     log.fatal(f'The specified lab topology ({args.topology}) is not a file',module='create')
 
   topology = load_topology(args)
-  augment.main.transform(topology)
+  topology = augment.cache.transform(topology)
   log.exit_on_error()
 
+  if args.jobs is not None:
+    topology.defaults.netlab.create.jobs = args.jobs
+
   if args.unlock and os.path.exists('netlab.lock'):
     strings.print_colored_text("WARNING: ","bright_red",stderr=True)
     print("removing netlab.lock file, you're on your own",file=sys.stderr,flush=True)
@@ -79,6 +79,10 @@ def down_cleanup(topology: Box, verbose: bool = False) -> None:
 
   cleanup_list.append('netlab.snapshot.yml')
   cleanup_list.append('netlab.snapshot.pickle')
+  cleanup_list.append('netlab.snapshot.idx')
+  ready_report = topology.defaults.netlab.initial.ssh.report
+  if ready_report:
+    cleanup_list.append(ready_report)
   fs_cleanup(cleanup_list,verbose)
 
 #
@@ -1,9 +1,12 @@
 #
 # Run external commands from netlab CLI
 #
+import collections
+import locale
 import os
 import subprocess
 import sys
+import threading
 import typing
 
 from box import Box
@@ -50,6 +53,196 @@ has_command: figures out whether a command is available
 def has_command(cmd: str) -> bool:
   return bool(run_command(['bash','-c',f'command -v {cmd}'],check_result=True,ignore_errors=True))
 
+"""
+CommandResult: the results of an external command executed with run_command_capture,
+run_command_async or run_command_result
+
+* returncode -- command exit code (None if the command could not be started or timed out)
+* error -- the reason the command could not be started or completed
+* timed_out -- the command was killed because it did not complete in time
+* stdout/stderr -- captured output. With max_lines set, only the last max_lines lines
+  of each stream are kept (the number of discarded lines is in 'dropped')
+
+Every command gets its own result object, making the results safe to use when the
+commands are executed from multiple threads.
+"""
+class CommandResult:
+  def __init__(self, cmd: typing.Union[str,list], max_lines: int = 0) -> None:
+    self.cmd = cmd
+    self.returncode: typing.Optional[int] = None
+    self.error: typing.Optional[str] = None
+    self.timed_out = False
+    self.lines: typing.Dict[int,typing.Deque[str]] = {
+      1: collections.deque(maxlen=max_lines or None),
+      2: collections.deque(maxlen=max_lines or None) }
+    self.dropped = { 1: 0, 2: 0 }
+
+  def add_line(self, stream: int, line: str) -> None:
+    s_lines = self.lines[stream]
+    if s_lines.maxlen and len(s_lines) == s_lines.maxlen:
+      self.dropped[stream] += 1
+    s_lines.append(line)
+
+  @property
+  def stdout(self) -> str:
+    return ''.join(self.lines[1])
+
+  @property
+  def stderr(self) -> str:
+    return ''.join(self.lines[2])
+
+  @property
+  def OK(self) -> bool:
+    return self.returncode == 0
+
+"""
+run_command_async: execute an external command (a list of CLI parameters) in an asyncio
+event loop, capturing its output into a CommandResult.
+
+Output lines (stream: 1 = stdout, 2 = stderr) are passed to the 'output' callback while the
+command is running. Use this function to run many commands concurrently without a thread
+per command.
+"""
+OutputCallback = typing.Callable[[int,str],None]
+
+async def run_command_async(
+      cmd: list,
+      output: typing.Optional[OutputCallback] = None,
+      max_lines: int = 0,
+      timeout: typing.Optional[float] = None,
+      stdin: typing.Optional[int] = None) -> CommandResult:
+  import asyncio
+
+  result = CommandResult(cmd,max_lines)
+  try:
+    proc = await asyncio.create_subprocess_exec(
+              *cmd,
+              stdin=stdin,
+              stdout=asyncio.subprocess.PIPE,
+              stderr=asyncio.subprocess.PIPE)
+  except Exception as ex:
+    result.error = str(ex)
+    return result
+
+  encoding = locale.getpreferredencoding(False)             # Decode output like subprocess.run(text=True)
+
+  def add_line(stream: int, line: bytes) -> None:
+    text = line.decode(encoding,errors='replace').replace('\r\n','\n').replace('\r','\n')
+    result.add_line(stream,text)
+    if output is not None:
+      output(stream,text)
+
+  async def read_stream(reader: typing.Any, stream: int) -> None:
+    buffer = b''
+    while True:                                             # Read output in chunks to avoid line length limits
+      chunk = await reader.read(65536)
+      if not chunk:
+        break
+      buffer += chunk
+      *lines, buffer = buffer.split(b'\n')
+      for line in lines:
+        add_line(stream,line + b'\n')
+    if buffer:                                              # Last line without a newline
+      add_line(stream,buffer)
+
+  try:
+    await asyncio.wait_for(
+      asyncio.gather(read_stream(proc.stdout,1),read_stream(proc.stderr,2),proc.wait()),
+      timeout)
+    result.returncode = proc.returncode
+  except asyncio.TimeoutError:                              # The command got stuck, kill it
+    proc.kill()
+    await proc.wait()
+    result.timed_out = True
+    result.error = f'Timeout: command did not complete within {timeout} seconds'
+
+  return result
+
+"""
+run_command_capture: execute an external command (a list of CLI parameters) and capture
+its output into a CommandResult. This is the synchronous counterpart of run_command_async
+(same parameters and results): the output streams are read by helper threads, so the function
+is safe to use from multiple threads and from code running in an asyncio event loop.
+"""
+def run_command_capture(
+      cmd: typing.Union[str,list],
+      output: typing.Optional[OutputCallback] = None,
+      max_lines: int = 0,
+      timeout: typing.Optional[float] = None) -> CommandResult:
+  if isinstance(cmd,str):
+    cmd = [ arg for arg in cmd.split(" ") if arg not in (""," ") ]
+
+  result = CommandResult(cmd,max_lines)
+  try:
+    proc = subprocess.Popen(
+              cmd,
+              stdout=subprocess.PIPE,
+              stderr=subprocess.PIPE,
+              text=True,errors='replace')
+  except Exception as ex:
+    result.error = str(ex)
+    return result
+
+  r_lock = threading.Lock()                                 # Output lines are added from two threads
+
+  def read_stream(pipe: typing.IO[str], stream: int) -> None:
+    for line in pipe:
+      with r_lock:
+        result.add_line(stream,line)
+        if output is not None:
+          output(stream,line)
+
+  readers = [
+    threading.Thread(target=read_stream,args=(pipe,stream),daemon=True)
+      for pipe,stream in ((proc.stdout,1),(proc.stderr,2)) ]
+  for reader in readers:
+    reader.start()
+
+  try:
+    result.returncode = proc.wait(timeout)
+  except subprocess.TimeoutExpired:                         # The command got stuck, kill it
+    proc.kill()
+    proc.wait()
+    result.timed_out = True
+    result.error = f'Timeout: command did not complete within {timeout} seconds'
+
+  for reader in readers:                                    # Collect the rest of the output. Do not wait forever
+    reader.join(1 if result.timed_out else None)            # ... if the killed command left children behind
+
+  return result
+
+"""
+run_command_result: execute an external command like run_command with check_result and
+return_exitcode set, but return the CommandResult instead of using the CAPTURED_STDOUT
+and CAPTURED_STDERR global variables
+"""
+def run_command_result(
+      cmd: typing.Union[str,list],
+      output: typing.Optional[OutputCallback] = None,
+      max_lines: int = 0,
+      timeout: typing.Optional[float] = None) -> CommandResult:
+  result = CommandResult(cmd,max_lines)
+  if log.debug_active('cli'):
+    print(f"Not running: {cmd}")
+    result.returncode = 0
+    return result
+
+  if is_dry_run():
+    print(f"DRY RUN: {cmd}")
+    result.returncode = 0
+    return result
+
+  if log.VERBOSE or log.debug_active('external'):
+    print(f"run_command executing: {cmd}",flush=True)
+
+  add_netlab_path()
+  result = run_command_capture(cmd,output=output,max_lines=max_lines,timeout=timeout)
+  if log.debug_active('external') or log.VERBOSE >= 3:
+    print(f'... run result: {result.returncode} error: {result.error}',flush=True)
+
+  log_command(result.cmd,'ERROR' if result.returncode is None else f'FAIL({result.returncode})' if result.returncode else 'OK')
+  return result
+
 """
 run_command: Execute an external command specified as a string or a list of CLI parameters
 
@@ -73,6 +266,10 @@ def log_command(cmd: typing.Union[str,list], status: str) -> None:
   cmd_text = cmd if isinstance(cmd,str) else ' '.join(cmd)
   lab_status_log(topology,f'{status}: {cmd_text}')
 
+"""
+Output of the last run_command executed with check_result set. These variables are kept for
+backwards compatibility; they are not thread-safe, use run_command_result instead.
+"""
 CAPTURED_STDOUT: str = ''
 CAPTURED_STDERR: str = ''
 
@@ -82,7 +279,8 @@ def run_command(
     ignore_errors: bool = False,
     return_stdout: bool = False,
     return_exitcode: bool = False,
-    run_always: bool = False) -> typing.Union[bool,int,str]:
+    run_always: bool = False,
+    stdin: typing.Optional[int] = None) -> typing.Union[bool,int,str]:
 
   global CAPTURED_STDOUT, CAPTURED_STDERR
   CAPTURED_STDOUT = ''
@@ -114,6 +312,7 @@ def run_command(
                 cmd,
                 capture_output=check_result,
                 check=not return_exitcode,
+                stdin=stdin,
                 text=True)
     if log.debug_active('external') or log.VERBOSE >= 3:
       print(f'... run result: {result}',flush=True)
@@ -121,7 +320,7 @@ def run_command(
       CAPTURED_STDOUT = result.stdout
       CAPTURED_STDERR = result.stderr
     if return_exitcode:
-      log_command(cmd,f'FAIL(result.returncode)' if result.returncode else 'OK')
+      log_command(cmd,f'FAIL({result.returncode})' if result.returncode else 'OK')
       return result.returncode
     if not check_result:
       log_command(cmd,'OK')
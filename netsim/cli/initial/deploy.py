@@ -124,6 +124,15 @@ def run(topology: Box, args: argparse.Namespace, rest: list) -> None:
 
   log.exit_on_error()
 
+  unchanged: list = []
+  if args.changed:
+    changed = utils.changed_nodeset(nodeset,topology,args)
+    if not changed:
+      log.info('Device configurations did not change since the last deployment')
+      return
+    unchanged = [ n_name for n_name in nodeset if n_name not in changed ]
+    nodeset = changed
+
   ready.run(topology,args,rest)
   log.exit_on_error()
 
@@ -135,7 +144,7 @@ def run(topology: Box, args: argparse.Namespace, rest: list) -> None:
   ansible_skip_list = utils.nodeset_ansible_skip(nodeset, topology, args)
   used_ansible = False
   if len(ansible_skip_list) != len(nodeset):
-    utils.ansible_skip_group(ansible_skip_list)
+    utils.ansible_skip_group(ansible_skip_list + unchanged)
     if used_internal:
       log.info("Starting Ansible playbook to deploy the rest of the configurations")
     status_ansible = deploy_ansible_playbook(topology,rest + utils.ansible_args(args))
@@ -149,6 +158,9 @@ def run(topology: Box, args: argparse.Namespace, rest: list) -> None:
   if not status_internal or not status_ansible:
     error_and_exit("Configuration deployment failed")
 
+  if not args.generate:
+    utils.record_deployed_configs(nodeset,topology,args)
+
   message = get_message(topology, "initial", True)
   if message and not args.no_message:
     print(f"\n{message}")
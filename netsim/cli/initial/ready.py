@@ -2,8 +2,8 @@
 # netlab initial -- implement standard device readiness checks
 #
 import argparse
-import concurrent.futures
-import subprocess
+import asyncio
+import json
 import time
 import typing
 
@@ -12,7 +12,7 @@ from box import Box
 from ...augment import devices as a_devices
 from ...data import append_to_list, get_empty_box
 from ...utils import log, strings
-from .. import ansible, error_and_exit, external_commands, lab_status_change
+from .. import _sshmux, ansible, error_and_exit, external_commands, lab_status_change
 from . import utils
 
 """
@@ -46,7 +46,11 @@ def setup_ssh_ready_parameters(nodeset: list, topology: Box) -> None:
     ssh_dest = a_devices.get_node_group_var(n_data,'ansible_user',defaults) + "@" + str(ssh_host)
     ssh_exec.append(ssh_dest)
     ssh_cmd = a_devices.get_node_group_var(n_data,'netlab_check_command',defaults) or "show version"
-    ssh_exec.append(ssh_cmd)
+    ssh_mux = a_devices.get_node_group_var(n_data,'netlab_ssh_multiplex',defaults)
+    if _sshmux.use_multiplexing(ssh_mux,defaults):          # Use a persistent SSH session?
+      ssh_exec = _sshmux.ssh_command(ssh_exec,[ssh_cmd],defaults.netlab.ssh.get('persist',60))
+    else:
+      ssh_exec.append(ssh_cmd)
     if log.debug_active('ssh'):
       print(f'SSH cmd for {n_data.name}: {" ".join(ssh_exec)}')
     return ssh_exec
@@ -62,9 +66,179 @@ def setup_ssh_ready_parameters(nodeset: list, topology: Box) -> None:
     if log.debug_active('ssh'):
       print(f'SSH wait times for {n_data.name}: delay={r_data.delay}, retries={r_data.retries}')
     r_data.ssh_exec = build_ssh_command(n_data)             # Get the SSH command to execute
+    if r_data.ssh_exec:                                     # ... and the SSH server address for the banner check
+      ssh_args = (a_devices.get_node_group_var(n_data,'netlab_ssh_args',defaults) or '').split(' ')
+      r_data.ssh_host = str(n_data.get('mgmt.ipv4',None) or n_data.get('mgmt.ipv6',None))
+      r_data.ssh_port = get_ssh_port(ssh_args)
+      r_data.ssh_proxy = uses_ssh_proxy(ssh_args)           # Banner check cannot reach devices behind a proxy
     r_data.ssh_ready = False                                # ... and assume the device is not ready
     r_data.ssh_failed = False                               # ... but also hasn't failed yet
 
+"""
+SSH readiness check scheduler
+
+Every node has its own retry timer: a node is checked again RETRY_INTERVAL seconds after
+its previous check failed, regardless of how long the checks of other nodes take. Each
+check starts with a cheap TCP session to the SSH server that waits for the SSH banner;
+the (expensive) SSH login is attempted only after the SSH server sent its banner. The
+number of concurrent checks is limited by the defaults.netlab.initial.ssh.jobs setting.
+
+The banner check connects directly to the management address of the device. It is skipped
+for devices reached through an SSH proxy specified in netlab_ssh_args, and every
+BANNER_LOGIN_INTERVAL-th failed banner check is followed by an SSH login attempt, in case
+the device is reachable only with the settings from the SSH configuration file.
+"""
+RETRY_INTERVAL: typing.Final[float] = 1.0
+BANNER_LOGIN_INTERVAL: typing.Final[int] = 3
+
+"""
+get_ssh_option: get the value of an SSH option specified as '-x value', '-xvalue',
+'-o Option=value' or '-oOption=value' from a list of SSH arguments. Returns the last value
+(or None if the option is not specified)
+"""
+def get_ssh_option(ssh_args: list, flag: typing.Optional[str], option: str) -> typing.Optional[str]:
+  value = None
+  for idx,arg in enumerate(ssh_args):
+    n_arg = ssh_args[idx+1] if idx + 1 < len(ssh_args) else ''
+    if arg in (flag,'-o'):                                  # Option value in the next argument
+      arg = arg + n_arg
+    if arg.startswith('-o'):
+      o_name,_,o_value = arg[2:].partition('=')
+      if o_name.lower() == option.lower() and o_value:
+        value = o_value
+    elif flag and arg.startswith(flag) and len(arg) > len(flag):
+      value = arg[len(flag):]
+
+  return value
+
+"""
+get_ssh_port: find the SSH port in the SSH arguments (-p, -pNNNN or -o Port=)
+"""
+def get_ssh_port(ssh_args: list) -> int:
+  try:
+    return int(get_ssh_option(ssh_args,'-p','Port') or 22)
+  except ValueError:
+    return 22
+
+"""
+uses_ssh_proxy: do the SSH arguments specify a jump host or a proxy command?
+"""
+def uses_ssh_proxy(ssh_args: list) -> bool:
+  for flag,option in (('-J','ProxyJump'),(None,'ProxyCommand')):
+    value = get_ssh_option(ssh_args,flag,option)
+    if value is not None and value.lower() != 'none':     # 'none' disables the proxy
+      return True
+
+  return False
+
+"""
+check_ssh_banner: open a TCP session to the SSH server and wait for the SSH banner
+"""
+async def check_ssh_banner(host: str, port: int, timeout: float) -> str:
+  writer = None
+
+  async def read_banner() -> str:
+    nonlocal writer
+    reader, writer = await asyncio.open_connection(host,port)
+    while True:                                             # The server might send other lines before the banner
+      line = await reader.readline()
+      if not line:
+        return 'SSH server closed the session before sending the banner'
+      if line.startswith(b'SSH-'):
+        return ''
+
+  try:
+    return await asyncio.wait_for(read_banner(),timeout)
+  except asyncio.TimeoutError:
+    return f'Timeout: SSH banner not received within {timeout} seconds'
+  except Exception as ex:
+    return f'Cannot connect to SSH server on {host}:{port}: {str(ex)}'
+  finally:
+    if writer is not None:
+      writer.close()
+
+"""
+run_ssh_command: execute the SSH command, return an empty string on success or the error message
+"""
+SSH_ERROR_LINES: typing.Final[int] = 20
+
+async def run_ssh_command(ssh_exec: list, timeout: float) -> str:
+  result = await external_commands.run_command_async(
+              ssh_exec,
+              max_lines=SSH_ERROR_LINES,                    # We need just the last few lines of SSH errors
+              timeout=timeout,
+              stdin=asyncio.subprocess.DEVNULL)
+  if result.timed_out:                                      # SSH got stuck (and was killed)
+    return f'Timeout: SSH command did not complete within {timeout} seconds'
+  if result.error:
+    return result.error
+
+  if result.returncode:
+    return f'SSH command failed with exit code {result.returncode}: {result.stderr.strip()}'
+
+  return ''
+
+"""
+start_ssh_master: start the persistent SSH session (see cli._sshmux) used by the SSH command
+"""
+async def start_ssh_master(m_cmd: list, timeout: float) -> str:
+  try:
+    proc = await asyncio.create_subprocess_exec(
+              *m_cmd,
+              stdin=asyncio.subprocess.DEVNULL,
+              stdout=asyncio.subprocess.DEVNULL,
+              stderr=asyncio.subprocess.DEVNULL)
+  except Exception as ex:
+    return str(ex)
+
+  try:
+    await asyncio.wait_for(proc.wait(),timeout)
+  except asyncio.TimeoutError:
+    proc.kill()
+    await proc.wait()
+    return f'Timeout: SSH login did not complete within {timeout} seconds'
+
+  return f'SSH login failed with exit code {proc.returncode}' if proc.returncode else ''
+
+"""
+get_ssh_ready_jobs: the maximum number of concurrent SSH checks (zero means 'no limit')
+"""
+def get_ssh_ready_jobs(topology: Box) -> int:
+  jobs = topology.defaults.netlab.initial.ssh.get('jobs',32)
+  if not isinstance(jobs,int) or isinstance(jobs,bool) or jobs < 0:
+    log.error(
+      f'defaults.netlab.initial.ssh.jobs must be a non-negative integer (found {jobs})',
+      category=log.IncorrectValue,
+      module='initial')
+    return 32
+
+  return jobs
+
+"""
+save_ssh_ready_report: save per-node SSH readiness timing into a JSON file
+"""
+def save_ssh_ready_report(waitset: list, topology: Box, start_time: float) -> None:
+  r_file = topology.defaults.netlab.initial.ssh.get('report',None)
+  if not r_file:
+    return
+
+  report: dict = {
+    'start': start_time,
+    'jobs': get_ssh_ready_jobs(topology),
+    'nodes': {} }
+  for n_name in waitset:
+    n_data = topology.nodes[n_name]
+    report['nodes'][n_name] = dict(n_data._ready.get('timing',{}),device=n_data.device)
+
+  try:
+    with open(r_file,mode='w') as output:
+      output.write(json.dumps(report,indent=2))
+  except Exception as ex:
+    log.warning(
+      text=f'Cannot save SSH readiness timing into {r_file}',
+      more_data=[ str(ex) ],
+      module='initial')
+
 def device_ssh_ready(waitset: list, topology: Box) -> None:
 
   def devices_not_ready() -> list:                          # Get the list of devices that are still not ready
@@ -73,9 +247,9 @@ def device_ssh_ready(waitset: list, topology: Box) -> None:
       n_data = topology.nodes[n_name]
       if n_data._ready.ssh_exec and not n_data._ready.ssh_ready and not n_data._ready.ssh_failed:
         wait_list.append(n_name)                            # Device is still not ready (but has not failed yet)
-    return wait_list  
+    return wait_list
 
-  def status_display() -> None:                             # Display status every second
+  async def status_display() -> None:                       # Display status every second
     while True:                                             # Iterate until everything is done
       wait_list = devices_not_ready()                       # Get the list of not-ready devices
       if not wait_list:                                     # All done?
@@ -86,45 +260,75 @@ def device_ssh_ready(waitset: list, topology: Box) -> None:
       print(
         f'Waiting for {len(wait_list)} devices ({w_time} seconds)',
         end='\n' if log.debug_active('ssh') else '\r',flush=True)
-      time.sleep(1)
+      await asyncio.sleep(1)
+
+  async def check_ssh(n_name: str) -> str:                  # Try out SSH server on the device
+    r_data = topology.nodes[n_name]._ready
+    timing = r_data.timing
+    if banner_check and not r_data.ssh_proxy:               # Is the SSH server sending its banner?
+      timing.banner_checks += 1
+      result = await check_ssh_banner(r_data.ssh_host,r_data.ssh_port,r_data.delay)
+      if result and timing.banner_checks % BANNER_LOGIN_INTERVAL:
+        return result                                       # Banner check failed, no login attempt this time
+      if not result and 'banner' not in timing:
+        timing.banner = round(time.time() - start_time,2)
+
+    if log.debug_active('ssh'):
+      print(f'SSH: starting check on {n_name}, timeout={r_data.delay}',flush=True)
+    timing.logins += 1
+    m_cmd = _sshmux.master_command(r_data.ssh_exec)
+    if m_cmd:                                               # Log into the device with a persistent SSH session
+      result = await start_ssh_master(m_cmd,r_data.delay)
+      if result:
+        return result
+      _sshmux.set_master_started(r_data.ssh_exec)
 
-  def wait_for_ssh(n_name: str) -> bool:                    # Try out SSH server on the device
+    return await run_ssh_command(r_data.ssh_exec,r_data.delay)
+
+  async def wait_for_ssh(n_name: str, limit: asyncio.Semaphore) -> None:
     n_data = topology.nodes[n_name]
     r_data = n_data._ready                                  # Get device ready data
-    result = ''
-    try:                                                    # Try the SSH command
-      if log.debug_active('ssh'):
-        print(f'SSH: starting check on {n_name}, timeout={r_data.delay}',flush=True)
-      subprocess.run(args=r_data.ssh_exec,capture_output=True,check=True,timeout=r_data.delay)
-      r_data.ssh_ready = True                               # No errors, we're ready to roll
-      now = time.time()
-      if now > start_time + 5 or log.VERBOSE:               # Report progress only if it's worth reporting
-        strings.print_colored_text('[SSH]     ','green')
-        print(f'SSH server on node {n_name} (device {n_data.device}) ' +\
-              f'is ready after {round(now - start_time,1)} seconds',flush=True)
-      return True
-    except subprocess.CalledProcessError as ex:             # SSH reported an error
-      result = str(ex)
-    except subprocess.TimeoutExpired as ex:                 # SSH got stuck
-      result = f'Timeout: '+str(ex)
-    except Exception as ex:                                 # Or it could be anything else
-      result = str(ex)
-
-    try:
+    r_data.timing = { 'banner_checks': 0, 'logins': 0 }
+    while True:
+      async with limit:                                     # Wait for a free check slot
+        try:
+          result = await check_ssh(n_name)
+        except Exception as ex:                             # Or it could be anything else
+          result = str(ex)
+
       now = time.time()
+      if not result:
+        r_data.ssh_ready = True                             # No errors, we're ready to roll
+        r_data.timing.ready = round(now - start_time,2)
+        if now > start_time + 5 or log.VERBOSE:             # Report progress only if it's worth reporting
+          strings.print_colored_text('[SSH]     ','green')
+          print(f'SSH server on node {n_name} (device {n_data.device}) ' +\
+                f'is ready after {round(now - start_time,1)} seconds',flush=True)
+        return
+
       if now > start_time + r_data.wait:                    # Have we exceeded the wait period?
         r_data.ssh_failed = True
+        r_data.timing.failed = round(now - start_time,2)
+        r_data.timing.error = result
         strings.print_colored_text('[SSH]     ','red')
         print(f'SSH server on node {n_name} (device {n_data.device}) ' +\
               f'is not ready after {round(now - start_time,1)} seconds',flush=True)
-      if log.debug_active('ssh'):                         # Do we need to report SSH status periodically?
+        return
+
+      if log.debug_active('ssh'):                           # Do we need to report SSH status periodically?
         if now > r_data.get('debug_time',start_time) + 5:   # Report errors only every five seconds
           print(f'SSH: Error on {n_data.name} ({n_data.device}): {result}')
           r_data.debug_time = now                           # Remember the last time we reported an error
-    except Exception as ex:
-      print(f'ERROR in wait_for_ssh: {str(ex)}')
 
-    return False
+      await asyncio.sleep(RETRY_INTERVAL)                   # Retry timer for this node
+
+  async def check_all_nodes() -> None:
+    check_list = devices_not_ready()
+    limit = asyncio.Semaphore(jobs or len(check_list) or 1)
+    display = asyncio.ensure_future(status_display()) if strings.rich_color else None
+    await asyncio.gather(*[ wait_for_ssh(n_name,limit) for n_name in check_list ])
+    if display is not None:
+      display.cancel()
 
   # Start of device_ssh_ready main code
   if not external_commands.has_command('sshpass'):
@@ -134,20 +338,14 @@ def device_ssh_ready(waitset: list, topology: Box) -> None:
       category=log.MissingDependency)
 
   setup_ssh_ready_parameters(waitset,topology)
+  jobs = get_ssh_ready_jobs(topology)
+  banner_check = bool(topology.defaults.netlab.initial.ssh.get('banner',True))
   log.exit_on_error()
   start_time = time.time()
   log.info(text=f'Checking SSH server(s) on {",".join(waitset)}')
 
-  with concurrent.futures.ThreadPoolExecutor() as executor:
-    if strings.rich_color:
-      executor.submit(status_display)
-    while True:
-      check_list = devices_not_ready()
-      if not check_list:
-        break
-      for result in executor.map(wait_for_ssh, check_list):
-        pass
-      time.sleep(1)                               # Wait a bit before running another iteration
+  asyncio.run(check_all_nodes())
+  save_ssh_ready_report(waitset,topology,start_time)
 
   failed_list = [ n_name for n_name in waitset if topology.nodes[n_name]._ready.ssh_failed ]
   if failed_list:
@@ -5,6 +5,7 @@ Common functions for the "netlab initial" actions
 import argparse
 import os
 import typing
+from pathlib import Path
 
 from box import Box
 
@@ -12,7 +13,7 @@ from ...augment import devices as a_devices
 from ...augment import groups
 from ...data import global_vars
 from ...utils import files as _files
-from ...utils import log, strings
+from ...utils import log, manifest, strings
 from .. import _nodeset, common_parse_args, parser_lab_location
 
 
@@ -50,6 +51,10 @@ def initial_config_parse(args: typing.List[str]) -> typing.Tuple[argparse.Namesp
     '--fast',
     dest='fast', action='store_true',
     help='Use "free" strategy in Ansible playbook for faster configuration deployment')
+  parser.add_argument(
+    '--changed',
+    dest='changed', action='store_true',
+    help='Deploy only the configurations that changed since the last deployment')
   parser.add_argument(
     '-o','--output',
     dest='output', action='store',nargs='?',const='config',
@@ -169,8 +174,61 @@ def node_deploy_list(node: Box, args: argparse.Namespace) -> list:
   if args.custom or all_config:
     node_configs += [ cfg for cfg in node.get('config',[]) if cfg not in skip_config ]
 
+  if '_changed_configs' in node:                  # Deploying only changed configurations?
+    node_configs = [ cfg for cfg in node_configs if cfg in node._changed_configs ]
+
   return node_configs
 
+"""
+changed_nodeset: Compare the configuration snippets in node_files with the hashes of the
+last deployed configurations (recorded in node_files manifest). Sets the _changed_configs
+node attribute to the list of changed configurations and returns the list of nodes that
+have at least one changed configuration.
+
+Configuration snippets that do not exist or have never been deployed are considered changed.
+"""
+def changed_nodeset(nodeset: list, topology: Box, args: argparse.Namespace) -> list:
+  node_files = Path('node_files')
+  m_files = manifest.load_manifest(node_files)['files']
+  changed = []
+  for n_name in nodeset:
+    n_data = topology.nodes[n_name]
+    n_data.pop('_changed_configs',None)
+    n_changed = []
+    for cfg in node_deploy_list(n_data,args):
+      f_name = f'{n_name}/{cfg}'
+      f_hash = manifest.file_hash(node_files / f_name)
+      m_entry = m_files.get(f_name,None)
+      if f_hash is None or not isinstance(m_entry,dict) or m_entry.get('deployed',None) != f_hash:
+        n_changed.append(cfg)
+
+    n_data._changed_configs = n_changed
+    if n_changed:
+      changed.append(n_name)
+      if log.VERBOSE:
+        log.info(f'Changed configurations on {n_name}: {",".join(n_changed)}')
+
+  return changed
+
+"""
+record_deployed_configs: Store the hashes of deployed configuration snippets in
+the node_files manifest
+"""
+def record_deployed_configs(nodeset: list, topology: Box, args: argparse.Namespace) -> None:
+  node_files = Path('node_files')
+  m_data = manifest.load_manifest(node_files)
+  for n_name in nodeset:
+    for cfg in node_deploy_list(topology.nodes[n_name],args):
+      f_name = f'{n_name}/{cfg}'
+      f_hash = manifest.file_hash(node_files / f_name)
+      if f_hash is None:
+        continue
+      if not isinstance(m_data['files'].get(f_name,None),dict):
+        m_data['files'][f_name] = { 'node': n_name, 'module': cfg }
+      m_data['files'][f_name]['deployed'] = f_hash
+
+  manifest.save_manifest(node_files,m_data)
+
 """
 node_requires_ansible: Figure out whether the node needs deployment through
 an Ansible playbook based on what the user wants configured
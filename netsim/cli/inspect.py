@@ -85,7 +85,8 @@ def inspect_node(topology: Box, node_list: list, args: argparse.Namespace) -> No
 
 def run(cli_args: typing.List[str]) -> None:
   args = inspect_parse(cli_args)
-  topology = load_data_source(args)
+  node_names = _nodeset.get_nodeset_names(args.node) if args.node and not args.all else None
+  topology = load_data_source(args,nodes=node_names)
   log.init_log_system(False)
 
   if args.node:
@@ -74,13 +74,16 @@ def run(cli_args: typing.List[str]) -> None:
   cnt = 0
   start_time = _status.lock_timestamp() or time.time()
   log.init_log_system(header=False)
+  prefetch_end = 0
 
-  for v_entry in topology.validate:
+  for v_idx,v_entry in enumerate(topology.validate):
     tests.extend_device_wait_time(v_entry,topology)
     if cnt and not ERROR_ONLY:
       print()
 
     try:
+      if args.jobs > 1 and v_idx >= prefetch_end:
+        prefetch_end = tests.prefetch_test_group(v_idx,topology,args)
       result = tests.execute_validation_test(v_entry,topology,start_time,args)
     except KeyboardInterrupt:
       print("")
@@ -4,16 +4,94 @@
 # Execute a command or deploy a custom config on the specified node
 #
 import argparse
+import concurrent.futures
+import subprocess
 import typing
 
 from box import Box
 
 from ... import data
 from ...utils import log
-from .. import external_commands
-from ..connect import LogLevel, connect_to_node
+from .. import _sshmux, external_commands
+from ..connect import LogLevel, connect_to_node, get_node_command
 from . import report, utils
 
+'''
+Concurrent execution of device commands ('netlab validate --jobs')
+
+The show/exec commands of a validation test (or a group of independent validation tests)
+are executed on all nodes in a pool of worker threads before the test results are evaluated.
+The command printouts are stored in PREFETCH_RESULTS and used by get_parsed_result and
+get_result_string, so the results are still evaluated (and reported) one node at a time in
+the usual order.
+'''
+PREFETCH_RESULTS: dict = {}
+
+def connect_args(action: str, v_cmd: list) -> typing.Tuple[argparse.Namespace,list]:
+  if action == 'show':
+    return (argparse.Namespace(quiet=True,output=True,show=v_cmd,verbose=False),[])
+  else:
+    return (argparse.Namespace(quiet=True,output=True,show=None,verbose=False),v_cmd)
+
+'''
+run_node_command: execute a show/exec command on a node (or use the prefetched result)
+'''
+def run_node_command(v_entry: Box, n_name: str, action: str, v_cmd: list, topology: Box) -> typing.Union[bool,int,str]:
+  p_key = (v_entry.name,n_name,action,tuple(v_cmd))
+  if p_key in PREFETCH_RESULTS:
+    return PREFETCH_RESULTS.pop(p_key)
+
+  args, rest = connect_args(action,v_cmd)
+  return connect_to_node(
+            node=n_name,args=args,rest=rest,topology=topology,
+            log_level=LogLevel.NONE,multiplex=True)
+
+'''
+prefetch_results: execute the device commands of validation tests in parallel
+
+The 'v_list' parameter is a list of (validation entry, list of nodes) tuples. The commands
+that would print something (errors, skipped tests) while being prepared are not prefetched;
+they are executed when the test results are evaluated.
+'''
+def prefetch_results(v_list: list, topology: Box, jobs: int) -> None:
+  work = []
+  for v_entry,n_list in v_list:
+    for n_name in n_list:
+      node = topology.nodes[n_name]
+      action = utils.find_test_action(v_entry,node,quiet=True)
+      if action not in ('show','exec'):
+        continue
+      v_cmd = utils.get_exec_list(v_entry,action,node,topology,quiet=True)
+      if not v_cmd:
+        continue
+      p_key = (v_entry.name,n_name,action,tuple(v_cmd))
+      if p_key in PREFETCH_RESULTS:
+        continue
+      args, rest = connect_args(action,v_cmd)
+      c_args = get_node_command(n_name,args,rest,topology,multiplex=True,tty=False)
+      if c_args is not None:
+        work.append((p_key,c_args))
+
+  if len(work) < 2:                                         # Nothing to do in parallel
+    return
+
+  def run_worker(c_args: list) -> typing.Union[bool,int,str]:
+    _sshmux.start_master(c_args)                            # Start the persistent SSH session if needed
+    return external_commands.run_command(
+              c_args,check_result=True,return_stdout=True,ignore_errors=True,
+              stdin=subprocess.DEVNULL)                     # Worker threads must not read the terminal
+
+  with concurrent.futures.ThreadPoolExecutor(max_workers=min(jobs,len(work))) as executor:
+    for (p_key,_),result in zip(work,executor.map(run_worker,[ c_args for _,c_args in work ])):
+      PREFETCH_RESULTS[p_key] = result
+
+'''
+discard_prefetched_results: remove unused results of a validation test
+'''
+def discard_prefetched_results(v_entry: Box) -> None:
+  for p_key in [ k for k in PREFETCH_RESULTS.keys() if k[0] == v_entry.name ]:
+    PREFETCH_RESULTS.pop(p_key)
+
 '''
 Execute a 'show' command. The return value is expected to be parseable JSON
 '''
@@ -34,10 +112,9 @@ def get_parsed_result(v_entry: Box, n_name: str, topology: Box, verbosity: int)
   if verbosity >= 3:                                        # Extra-verbose: print command to execute
     print(f'Preparing to execute {v_cmd}')
 
-  # Set up arguments for the 'netlab connect' command and execute it
+  # Execute the 'netlab connect' command (or get the prefetched result)
   #
-  args = argparse.Namespace(quiet=True,output=True,show=v_cmd,verbose=False)
-  result = connect_to_node(node=n_name,args=args,rest=[],topology=topology,log_level=LogLevel.NONE)
+  result = run_node_command(v_entry,n_name,'show',v_cmd,topology)
 
   if verbosity >= 3:                                        # Extra-verbose: print the results we got
     print(f'Executed {v_cmd} got {result}')
@@ -83,10 +160,9 @@ def get_result_string(
       indent=indent)
     return False
 
-  # Set up arguments for the 'netlab connect' command and execute it
+  # Execute the 'netlab connect' command (or get the prefetched result)
   #
-  args = argparse.Namespace(quiet=True,output=True,show=None,verbose=False)
-  result = connect_to_node(node=n_name,args=args,rest=v_cmd,topology=topology,log_level=LogLevel.NONE)
+  result = run_node_command(v_entry,n_name,'exec',v_cmd,topology)
 
   if result is False:                                       # Report an error if 'netlab connect' failed
     if report_error:
@@ -45,6 +45,10 @@ def validate_parse(args: typing.List[str]) -> argparse.Namespace:
     '--skip-missing',
     dest='skip_missing', action='store_true',
     help=argparse.SUPPRESS)
+  parser.add_argument(
+    '-j','--jobs',
+    dest='jobs', action='store', type=int, default=1,
+    help='Execute device commands on up to JOBS nodes in parallel')
   parser.add_argument(
     '--dump',
     action='store',
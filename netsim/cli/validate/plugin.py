@@ -71,7 +71,7 @@ find_plugin_action -- find the action (show/exec) from the plugin
 Figure out whether the validation plugin for the device under test provides the
 desired functionality (show_ or exec_ function). If not, the test is skipped.
 '''
-def find_plugin_action(v_entry: Box, node: Box) -> typing.Optional[str]:
+def find_plugin_action(v_entry: Box, node: Box, quiet: bool = False) -> typing.Optional[str]:
   global PLUGIN_ERROR
 
   if 'plugin' not in v_entry:
@@ -88,7 +88,7 @@ def find_plugin_action(v_entry: Box, node: Box) -> typing.Optional[str]:
 
   err_key = f'action_{node.device}_{func_name}'
 
-  if err_key not in PLUGIN_ERROR:
+  if err_key not in PLUGIN_ERROR and not quiet:
     topology = global_vars.get_topology()
     indent = (topology._v_len + 3) if topology else 10
     log.error(
@@ -123,8 +123,15 @@ Finally, the validation expression is executed and the exceptions are handled:
 
 Please note that custom exception raised in the plugin functions get re-raised as
 PluginEvalError exceptions, resulting in custom error messages.
+
+The 'quiet' parameter turns off the reporting of skipped tests (used when prefetching results)
 '''
-def exec_plugin_function(action: str, v_entry: Box, node: Box, result: typing.Optional[Box] = None) -> typing.Any:
+def exec_plugin_function(
+      action: str,
+      v_entry: Box,
+      node: Box,
+      result: typing.Optional[Box] = None,
+      quiet: bool = False) -> typing.Any:
   from . import TEST_COUNT
 
   p_name = f'validate_{node.device}'
@@ -144,6 +151,8 @@ def exec_plugin_function(action: str, v_entry: Box, node: Box, result: typing.Op
   except log.Result as wn:
     return str(wn)
   except log.Skipped as wn:                       # The requested test is not implemented in the validation function
+    if quiet:
+      return None
     topology = global_vars.get_topology()
     if topology is not None:
       report.log_info(
@@ -109,6 +109,41 @@ def wait_before_testing(
     time.sleep(wait_time if wait_time < 5 else 5)     # Wait no more than five seconds
     wait_time = wait_time - 5
 
+'''
+prefetch_test_group: execute the device commands of a group of independent validation
+tests in parallel (see devices.prefetch_results). The group starts with the current test
+and ends before the next test that waits for something or changes device configuration
+(those tests depend on the tests executed before them), or after a test that could stop
+the validation process.
+
+Returns the index of the first test after the group
+'''
+def prefetch_test_group(v_idx: int, topology: Box, args: argparse.Namespace) -> int:
+  v_list = topology.validate
+  p_list = []
+  for v_entry in v_list[v_idx:]:
+    if not is_independent_test(v_entry,topology):
+      break
+    p_list.append((v_entry,v_entry.nodes))
+    if v_entry.get('stop_on_error',False):
+      break
+
+  if not p_list:
+    return v_idx + 1
+
+  devices.prefetch_results(p_list,topology,args.jobs)
+  return v_idx + len(p_list)
+
+def is_independent_test(v_entry: Box, topology: Box) -> bool:
+  if 'wait' in v_entry or 'config' in v_entry or not v_entry.nodes:
+    return False
+
+  for ndata in topology.nodes.values():         # Device settings could add a wait time to the test
+    if 'wait' in topology.get(f'defaults.devices.{ndata.device}.netlab_validate.{v_entry.name}',{}):
+      return False
+
+  return True
+
 '''
 Execute node validation
 '''
@@ -235,6 +270,8 @@ def execute_validation_test(
   n_remaining: list = v_entry.nodes               # Start with all nodes specified in the validation entry
 
   while n_remaining:                              # Keep retrying 
+    if args.jobs > 1:                             # Execute device commands on remaining nodes in parallel
+      devices.prefetch_results([(v_entry,n_remaining)],topology,args.jobs)
     for n_name in n_remaining:                    # Iterate over remaining nodes
       (proc,OK) = execute_node_validation(v_entry,topology,n_name,time.time() >= stop_time,args)
       if proc:                                    # Have we processed this node? Remove node from remaining list
@@ -260,6 +297,7 @@ def execute_validation_test(
         wait_time += 15                           # ... and it will happen after 15 seconds
       time.sleep(1)
 
+  devices.discard_prefetched_results(v_entry)     # Remove results of nodes we did not need
   if ret_value:                                   # If we got to 'True'
     report.log_info(
       f'Test succeeded in { round(time.time() - start_time,1) } seconds',
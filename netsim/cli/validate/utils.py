@@ -23,14 +23,16 @@ plugin evaluation errors indicate something is badly broken, so we log the
 error with as much data as feasible... and if the end-user ever sees that
 error message, the author of the validation plugin did a lousy job.
 '''
-def get_entry_value(v_entry: Box, action: str, node: Box, topology: Box) -> typing.Any:
+def get_entry_value(v_entry: Box, action: str, node: Box, topology: Box, quiet: bool = False) -> typing.Any:
   n_device = node.device
   if action in v_entry:
     value = v_entry[action][n_device] if isinstance(v_entry[action],dict) else v_entry[action]
   elif 'plugin' in v_entry:
     try:
-      value = plugin.exec_plugin_function(action,v_entry,node)
+      value = plugin.exec_plugin_function(action,v_entry,node,quiet=quiet)
     except plugin.PluginEvalError as ex:
+      if quiet:
+        return None
       indent = (topology._v_len + 3) if topology else 10
       log.error(
         text=str(ex),
@@ -60,8 +62,8 @@ Get the command to execute on the device in list format
 * Use 'get_entry_value' to get the action string or list
 * If we got a string, transform it into a list
 '''
-def get_exec_list(v_entry: Box, action: str, node: Box, topology: Box) -> list:
-  v_cmd = get_entry_value(v_entry,action,node,topology)
+def get_exec_list(v_entry: Box, action: str, node: Box, topology: Box, quiet: bool = False) -> list:
+  v_cmd = get_entry_value(v_entry,action,node,topology,quiet)
   if isinstance(v_cmd,list):
     return v_cmd
   elif isinstance(v_cmd,str):
@@ -80,8 +82,10 @@ find_test_action -- find something that can be executed on current node
 * If there's no relevant 'show' or 'exec' action, try the plugin
 * If there's no plugin, but we have 'wait' action, return 'wait'
 * If everything fails, return None (nothing usable for the current node)
+
+The 'quiet' parameter turns off the error messages (used when prefetching results)
 '''
-def find_test_action(v_entry: Box, node: Box) -> typing.Optional[str]:
+def find_test_action(v_entry: Box, node: Box, quiet: bool = False) -> typing.Optional[str]:
   action_kw_found = False
   for kw in ('show','exec','config','suzieq'):
     if kw not in v_entry:
@@ -94,7 +98,7 @@ def find_test_action(v_entry: Box, node: Box) -> typing.Optional[str]:
       return kw
 
   if 'plugin' in v_entry:
-    return plugin.find_plugin_action(v_entry,node)
+    return plugin.find_plugin_action(v_entry,node,quiet)
 
   if 'wait' in v_entry and not action_kw_found:
     return 'wait'
@@ -2,24 +2,94 @@
 # Generic data model manipulation outines
 #
 
+import os
 import typing
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
 
 import typing_extensions
 from box import Box
 
+from . import fastbox
+
+"""
+Build netlab boxes with data.fastbox unless:
+
+* The fastbox self-check failed (the installed python-box version builds different boxes)
+* The NETLAB_NETLAB_CREATE_FAST__BOX environment variable is set to false/no/off/0
+
+The environment variable is a plain switch checked when this module is imported (before the
+first box is built), so it also covers reading the lab topology and the snapshots. It is not
+read through the topology defaults, but as its name follows the netlab naming convention, it
+also sets the defaults.netlab.create.fast_box topology default that augment.main.transform
+applies for the duration of the data model transformation.
+"""
+def get_fast_box_default() -> bool:
+  return os.environ.get('NETLAB_NETLAB_CREATE_FAST__BOX','').strip().lower() not in ('false','no','off','0')
+
+FAST_BOX: bool = get_fast_box_default() and fastbox.COMPATIBLE
+
+def set_fast_box(enabled: bool) -> None:
+  global FAST_BOX
+  FAST_BOX = bool(enabled) and fastbox.COMPATIBLE
+
 #
 # I had enough -- here's a function that returns a box with proper default settings
 
 def get_box(init: dict) -> Box:
+  if FAST_BOX and isinstance(init,dict):
+    return fastbox.build_box(init)
   return Box(init,default_box=True,default_box_none_transform=False,box_dots=True)
 
 def get_empty_box() -> Box:
   return get_box({})
 
+"""
+merge_box: deep merge of two boxes, the equivalent of 'left + right'. Use it in
+code that merges lots of boxes (for example, for every node or every interface)
+"""
+def merge_box(left: Box, right: dict) -> Box:
+  return fastbox.merge_boxes(left,right) if FAST_BOX else left + right
+
 def get_new_box(b: Box) -> Box:
   return get_box(b.to_dict())
 
+"""
+BoxView: a read-only view of a Box (for example, topology.nodes) that converts its values
+into dictionaries only when they are accessed. Use it to give Jinja2 templates access to
+a large data structure without converting all of it into a dictionary.
+
+A BoxView is pickled as a regular dictionary.
+"""
+class BoxView(Mapping):
+
+  def __init__(self, source: Box) -> None:
+    self.source = source
+    self.cache: typing.Dict[typing.Any,typing.Any] = {}
+
+  def __getitem__(self, key: typing.Any) -> typing.Any:
+    if key not in self.cache:
+      if key not in self.source:                      # Don't let the default_box create a new value
+        raise KeyError(key)
+      value = self.source[key]
+      self.cache[key] = value.to_dict() if isinstance(value,Box) else value
+
+    return self.cache[key]
+
+  def __contains__(self, key: typing.Any) -> bool:
+    return key in self.source
+
+  def __iter__(self) -> typing.Iterator:
+    return iter(self.source)
+
+  def __len__(self) -> int:
+    return len(self.source)
+
+  def __reduce__(self) -> typing.Tuple[typing.Any,...]:
+    return (dict,(dict(self.items()),))
+
+  def __repr__(self) -> str:
+    return f'BoxView({list(self.source.keys())})'
+
 #
 # Another thingy we need all the time: make something a list
 
@@ -0,0 +1,180 @@
+#
+# Fast construction and merging of netlab boxes
+#
+# A netlab box is a Box with default_box, default_box_none_transform=False and box_dots
+# settings (see data.get_box). python-box converts dictionaries into boxes one key at a
+# time: it recomputes the box settings for every nested dictionary and list, and re-creates
+# every nested box when copying or merging boxes. The functions in this module build the same
+# data structures (the same box settings, the same 'safe attribute' mappings, and BoxList
+# objects shared with the source where python-box shares them) in a single pass.
+#
+# The results have to be indistinguishable from the boxes created by python-box; whenever
+# the source data contains something that needs python-box magic (dotted keys), we let
+# python-box handle it.
+#
+# The module relies on python-box internals that are not part of its API. The self-check
+# executed when the module is imported compares the boxes built by this module with the
+# boxes built by python-box; netlab uses python-box (data.FAST_BOX is False) if they differ.
+#
+import typing
+from collections.abc import Mapping
+from keyword import iskeyword
+
+from box import Box, BoxList
+
+BOX_SETTINGS: typing.Final[dict] = {
+  'default_box': True,
+  'default_box_none_transform': False,
+  'box_dots': True }
+
+_template = Box(**BOX_SETTINGS)._box_config                 # Box settings as created by python-box
+_public = { k: v for k,v in _template.items() if not k.startswith('__') }
+_list_options = dict(_public,box_class=Box)                 # BoxList options (without the namespace)
+
+"""
+Dotted keys ('a.b' or 'a[0]') are expanded into nested boxes or list elements by python-box
+"""
+def _is_dotted(key: typing.Any) -> bool:
+  return isinstance(key,str) and ('.' in key or '[' in key)
+
+def _new_box(namespace: tuple) -> Box:
+  box = dict.__new__(Box)                                   # Box.__new__ would create box settings we'd throw away
+  config = dict(_template)
+  config['box_namespace'] = namespace
+  config['__safe_keys'] = {}
+  object.__setattr__(box,'_box_config',config)
+  return box
+
+def _convert_value(value: typing.Any, namespace: tuple) -> typing.Any:
+  if isinstance(value,dict):                                # Dictionaries (including boxes) are always re-created
+    return _build(value,namespace)
+  if isinstance(value,BoxList):                             # Existing BoxLists are shared with the source
+    value.box_options.update(_public,box_namespace=namespace)
+    return value
+  if isinstance(value,list):
+    return _build_list(value,namespace)
+  return value
+
+def _convert_list_item(value: typing.Any, namespace: tuple) -> typing.Any:
+  if isinstance(value,dict):
+    return _build(value,namespace)
+  if isinstance(value,list):                                # BoxList re-creates all nested lists
+    return _build_list(value,namespace)
+  return value
+
+def _build_list(source: list, namespace: tuple) -> BoxList:
+  blist = BoxList.__new__(BoxList)
+  blist.box_options = dict(_list_options,box_namespace=namespace)
+  blist.box_org_ref = None
+  list.extend(blist,[ _convert_list_item(item,namespace) for item in source ])
+  return blist
+
+"""
+Build a box from a mapping. python-box records a 'safe attribute' name for every key stored
+in a box; most netlab keys are identifiers mapped into themselves, the rest go through
+Box._safe_attr
+"""
+def _build(source: Mapping, namespace: tuple) -> Box:
+  box = _new_box(namespace)
+  safe_keys = box._box_config['__safe_keys']
+  for k,v in source.items():
+    if v is source or _is_dotted(k):
+      Box.__setitem__(box,k,box if v is source else v)
+      continue
+
+    if isinstance(v,dict):
+      v = _build(v,namespace + (k,))
+    elif isinstance(v,list):
+      v = _convert_value(v,namespace + (k,))
+    dict.__setitem__(box,k,v)
+    if isinstance(k,str) and k.isidentifier() and not iskeyword(k):
+      safe_keys[k] = k
+    else:
+      safe_keys[box._safe_attr(k)] = k
+
+  box._box_config['__created'] = True
+  return box
+
+def _merge(target: Box, source: Mapping) -> None:
+  namespace = target._box_config['box_namespace']
+  safe_keys = target._box_config['__safe_keys']
+  for k,v in source.items():
+    if _is_dotted(k):
+      target.merge_update({ k: v })
+      continue
+
+    if isinstance(v,dict):
+      v = _build(v,namespace + (k,))
+      if dict.__contains__(target,k) and isinstance(dict.__getitem__(target,k),dict):
+        _merge(dict.__getitem__(target,k),v)
+        continue
+    elif isinstance(v,list):                                # Merged lists are always re-created
+      v = _build_list(v,namespace + (k,))
+
+    dict.__setitem__(target,k,v)
+    safe_keys[k if isinstance(k,str) and k.isidentifier() and not iskeyword(k) else target._safe_attr(k)] = k
+
+"""
+is_netlab_box: is the value a Box with netlab box settings (and nothing else)?
+"""
+def is_netlab_box(value: typing.Any) -> bool:
+  if type(value) is not Box:
+    return False
+
+  config = value._box_config
+  return all(config.get(k,None) == v for k,v in _public.items() if k != 'box_namespace')
+
+"""
+build_box: create a netlab box from a dictionary. The equivalent of:
+
+  Box(init,default_box=True,default_box_none_transform=False,box_dots=True)
+"""
+def build_box(init: Mapping) -> Box:
+  return _build(init,())
+
+"""
+merge_boxes: the equivalent of 'left + right' when the left-hand side is a netlab box
+"""
+def merge_boxes(left: Box, right: Mapping) -> Box:
+  if not is_netlab_box(left) or not isinstance(right,dict):
+    return left + right
+
+  result = _build(left,())
+  _merge(result,right)
+  return result
+
+"""
+Self-check: build and merge sample data with python-box and with this module and compare
+the results (types, keys, box settings including the safe attribute names, BoxList options,
+and the python-box behavior netlab relies on: dotted keys and default boxes)
+"""
+_CHECK_DATA: typing.Final[dict] = {
+  'a': 1, 'n': None, 'class': { 'x-y': 1 }, 42: 'int', 'd.e': 2,
+  'b': { 'c': [ 1, { 'd': 2 }, [ 3, { 'e': 4 } ] ] } }
+_CHECK_MERGE: typing.Final[dict] = { 'b': { 'f': 5 }, 'g': [ { 'h': 6 } ], 'class': { 'z': 0 } }
+
+def _same(ref: typing.Any, new: typing.Any) -> bool:
+  if type(ref) is not type(new):
+    return False
+  if isinstance(ref,Box):
+    return ref._box_config == new._box_config and \
+           vars(ref).keys() == vars(new).keys() and \
+           list(dict.keys(ref)) == list(dict.keys(new)) and \
+           all(_same(dict.__getitem__(ref,k),dict.__getitem__(new,k)) for k in dict.keys(ref))
+  if isinstance(ref,BoxList):
+    return ref.box_options == new.box_options and \
+           vars(ref).keys() == vars(new).keys() and \
+           len(ref) == len(new) and all(_same(r,n) for r,n in zip(ref,new))
+  return bool(ref == new)
+
+def self_check() -> bool:
+  try:
+    ref = Box(_CHECK_DATA,**BOX_SETTINGS)
+    new = build_box(_CHECK_DATA)
+    if not _same(ref,new) or not _same(ref + _CHECK_MERGE,merge_boxes(new,_CHECK_MERGE)):
+      return False
+    return new['b.c[1].d'] == 2 and new.d.e == 2 and not new.missing.value
+  except Exception:
+    return False
+
+COMPATIBLE: typing.Final[bool] = self_check()
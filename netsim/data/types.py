@@ -8,7 +8,6 @@ import re
 import textwrap
 import typing
 
-import netaddr
 import typing_extensions
 from box import Box
 
@@ -889,6 +888,8 @@ def must_be_mac(value: typing.Any) -> dict:
   if not isinstance(value,str):
     return {'_type': 'MAC address' }
 
+  import netaddr
+
   try:
     parse = netaddr.EUI(value)                                        # now let's check if we have a MAC address
 
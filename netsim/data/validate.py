@@ -117,6 +117,49 @@ def get_valid_attributes(
 
   return valid
 
+"""
+Compiled validation data
+
+The attribute definitions do not change once the validation has been initialized, so the
+data derived from them is computed once and reused:
+
+* Merged attribute definitions (attributes + extra attributes)
+* Attribute namespaces and valid attributes for a list of attribute categories
+* Compiled data types (see CompiledType)
+
+The cache keys are object identities; every cache entry keeps references to the objects it
+was computed from so their identities cannot be reused. init_validation clears the cache.
+"""
+_merged_attributes: typing.Dict[tuple,tuple] = {}
+_valid_attributes: typing.Dict[tuple,tuple] = {}
+_compiled_types: typing.Dict[typing.Any,'CompiledType'] = {}
+
+def clear_validation_cache() -> None:
+  _merged_attributes.clear()
+  _valid_attributes.clear()
+  _compiled_types.clear()
+
+def merge_attributes(attributes: Box, extra_attributes: Box) -> Box:
+  c_key = (id(attributes),id(extra_attributes))
+  if c_key not in _merged_attributes:
+    _merged_attributes[c_key] = (attributes,extra_attributes,attributes + extra_attributes)
+
+  return _merged_attributes[c_key][2]
+
+"""
+get_compiled_attributes: return the attribute namespaces and the valid attributes (or data type)
+for a list of attribute categories
+"""
+def get_compiled_attributes(
+      attributes: Box,
+      attr_list: typing.List[str]) -> typing.Tuple[list,typing.Union[str,Box]]:
+  c_key = (id(attributes),tuple(attr_list))
+  if c_key not in _valid_attributes:
+    ns_list = get_attribute_namespaces(attributes,attr_list)
+    _valid_attributes[c_key] = (attributes,ns_list,get_valid_attributes(attributes,ns_list))
+
+  return _valid_attributes[c_key][1:]
+
 """
 validate_module_can_be_false: Check whether module attributes for an object can be 'false'
 """
@@ -482,6 +525,44 @@ def check_valid_with(
           category=log.IncorrectAttr,
           module=module)
 
+"""
+CompiledType -- data type definition preprocessed for validate_item
+
+Validation shortcuts are expanded, and the validation function and the attributes
+passed to it are computed once per data type definition
+"""
+
+PASS_ATTRIBUTES: typing.Final[list] = ['_hint','_help']
+
+class CompiledType:
+  def __init__(self, source: typing.Any) -> None:
+    self.source = source                                              # Keep the source object to keep its id() unique
+    self.data_type = transform_validation_shortcuts(source)
+
+    rq_module = self.data_type.get('_requires',None)                  # The list of required modules
+    self.requires = [] if rq_module is None else rq_module if isinstance(rq_module,list) else [ rq_module ]
+    self.list_to_dict = '_list_to_dict' in self.data_type
+    self.alt_types = '_alt_types' in self.data_type
+
+    self.name = self.data_type['type']
+    self.validation_function = getattr(_tv,f'must_be_{self.name}',None)
+
+    # Copy data type into validation attributes, skipping validation attributes and data type name
+    self.validation_attr = {
+      k:v for k,v in self.data_type.items()
+        if (not k.startswith('_') and k != 'type') or k in PASS_ATTRIBUTES }
+    if self.name in ('dict','list') and not 'create_empty' in self.validation_attr:
+      self.validation_attr['create_empty'] = False                    # Do not create empty dictionaries/lists unless told otherwise
+
+def compile_data_type(data_type: typing.Any) -> CompiledType:
+  c_key = ('str',data_type) if isinstance(data_type,str) else id(data_type)
+  c_type = _compiled_types.get(c_key,None)
+  if c_type is None:
+    c_type = CompiledType(data_type)
+    _compiled_types[c_key] = c_type
+
+  return c_type
+
 """
 validate_item -- validate a single item from an object:
 
@@ -499,8 +580,6 @@ subtype_validation: dict = {
   'list': validate_list
 }
 
-PASS_ATTRIBUTES: typing.Final[list] = ['_hint','_help']
-
 def validate_item(
       parent: typing.Optional[Box],
       key: typing.Any,
@@ -514,24 +593,23 @@ def validate_item(
       attributes: Box,
       enabled_modules: list) -> typing.Any:
 
-  global _bi,_tv,subtype_validation,PASS_ATTRIBUTES
+  global _bi,_tv,subtype_validation
 
   data = key if parent is None else parent[key]
   if data_type is None:                                               # Trivial case - data type not specified
     return True                                                       # ==> anything goes
 
-  data_type = transform_validation_shortcuts(data_type)
+  c_type = compile_data_type(data_type)
+  data_type = c_type.data_type
 
   if log.debug_active('validate'):
     print(f'validate_item {parent_path}.{key} as {data_type}')
     print(f'attribute namespaces: {list(attributes.keys())}')
 
   # First check the required module(s)
-  if '_requires' in data_type:
-    rq_module = data_type['_requires']                                # The the list of required modules
-    rq_module = rq_module if isinstance(rq_module,list) else [ rq_module ]
+  if c_type.requires:
     rq_fail = False
-    for m in rq_module:
+    for m in c_type.requires:
       if not enabled_modules or not m in enabled_modules:
         rq_fail = True                                                # We could exit the loop on first error, but it's nicer
         log.error(                                                    # ... to log all dependency errors
@@ -539,50 +617,39 @@ def validate_item(
           f"which is not enabled in {module_source.replace('(R)','')}",
           log.IncorrectAttr,
           module)
-        
+
     if rq_fail:                                                       # Attribute failed a dependency test, get out of here
       return False
 
   # We have to handle a weird corner case: AF (or similar) list that is really meant to be a dictionary
   #
-  if isinstance(data,list) and '_list_to_dict' in data_type and parent is not None:
+  if isinstance(data,list) and c_type.list_to_dict and parent is not None:
     parent[key] = { k: data_type._list_to_dict for k in data }        # Transform lists into a dictionary (updating parent will make it into a Box)
     data = parent[key]
     data_type = Box(data_type)                                        # and fix datatype definition
 
-  alt_context = {}                                                    # Alt-type context passed to validation functions
-  if '_alt_types' in data_type:                                       # Deal with alternate types first
-    alt_context = { '_alt_types': data_type._alt_types }
-    if type(data).__name__ != data_type.get('type',''):               # Does it make sense to check alternate types?
+  validation_attr = c_type.validation_attr                            # Precomputed validation attributes
+  if c_type.alt_types:                                                # Deal with alternate types first
+    alt_types = data_type._alt_types
+    if type(data).__name__ != c_type.name:                            # Does it make sense to check alternate types?
       alt_result = validate_alt_type(data,data_type)                  # Do we have alt data type (potentially returning modified value)
       if alt_result.get('_valid',False):                              # Did we get a valid alt-type?
         if alt_result.get('value',None):                              # Did it rewrite value?
-          if parent is not None:       
+          if parent is not None:
             parent[key] = alt_result.get('value')                     # ... it did, don't lose it ;)
           return alt_result.get('value')                              # And return rewritten value
         else:
           return True                                                 # Value not rewritten, return true
       elif alt_result.get('_alt_types',[]):                           # ... alt type check failed, copy expected types
-        alt_context['_alt_types'] = alt_result['_alt_types']
-
-  # Copy data type into validation attributes, skipping validation attributes and data type name
-  validation_attr = { 
-    k:v for k,v in data_type.items() 
-      if (not k.startswith('_') and k != 'type') or k in PASS_ATTRIBUTES }
-  if '_alt_types' in alt_context:
-    validation_attr['_alt_types'] = alt_context['_alt_types']
+        alt_types = alt_result['_alt_types']
+    validation_attr = dict(validation_attr,_alt_types=alt_types)      # Pass alt-type context to the validation function
 
-  dt_name = data_type['type']
-  validation_function = getattr(_tv,f'must_be_{dt_name}',None)        # Try to get validation function
+  dt_name = c_type.name
+  validation_function = c_type.validation_function
 
   if not validation_function:                                         # No validation function
     log.fatal(f'No validation function for {data_type}')
 
-  # We have to validate an item with a validation function
-  #
-  if dt_name in ('dict','list') and not 'create_empty' in validation_attr:
-    validation_attr['create_empty'] = False                           # Do not create empty dictionaries/lists unless told otherwise
-
   # Now call the validation function and hope for the best ;)
   #
   OK = validation_function(
@@ -654,7 +721,7 @@ def validate_attributes(
     attributes = topology.defaults.attributes
 
   if extra_attributes:
-    attributes = attributes + extra_attributes
+    attributes = merge_attributes(attributes,extra_attributes)
 
   if not ignored:
     ignored = ['_']
@@ -675,8 +742,7 @@ def validate_attributes(
   # It could be that the list of attributes tells us data should be of certain type
   # Deal with that as well (although in an awkward way that should be improved)
   #
-  attr_list = get_attribute_namespaces(attributes,attr_list)
-  valid = get_valid_attributes(attributes,attr_list)
+  attr_list, valid = get_compiled_attributes(attributes,attr_list)
   if isinstance(valid,str):                   # Validate data that is not a dictionary
     validate_value(                           # Use standalone value validator
       value=data,
@@ -771,6 +837,7 @@ def init_validation(topology: Box) -> None:
   global list_of_devices
   global topo_pointer
 
+  clear_validation_cache()
   topo_pointer = topology
   topo_attributes = topology.defaults.attributes
   list_of_modules = [ m for m in topology.defaults.keys()
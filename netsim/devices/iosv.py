@@ -5,6 +5,7 @@ import typing
 
 from box import Box
 
+from ..augment import devices
 from ..modules import _routing
 from ..utils import log
 from . import _Quirks, report_quirk
@@ -69,6 +70,7 @@ def use_paramiko(node: Box, topology: Box) -> None:
     dev_vars = topology.defaults.devices[device].group_vars
     if 'ansible_network_cli_ssh_type' not in dev_vars:
       dev_vars.ansible_network_cli_ssh_type = 'paramiko'    # Force Paramiko connection
+      devices.clear_device_cache(topology)                  # ... and make sure everyone sees the change
       report_quirk(
         f"Changing Ansible network_cli connection SSH type to 'paramiko'",
         node,
@@ -234,12 +234,12 @@ def merge_node_module_params(topology: Box) -> None:
 
         dev_settings = devices.get_device_attribute(n,m,topology.defaults)
         if dev_settings:
-          n[m] = get_propagated_global_module_params(m,dev_settings,topology.defaults[m]) + n[m]
+          n[m] = data.merge_box(get_propagated_global_module_params(m,dev_settings,topology.defaults[m]),n[m])
 
         if isinstance(topology.defaults[m],dict):
           default_settings = get_propagated_global_module_params(m,topology.defaults[m],topology.defaults[m])
           if default_settings:
-            n[m] = default_settings + n[m]
+            n[m] = data.merge_box(default_settings,n[m])
 
 # Get propagated global parameters from settings (top-level or device-level)
 #
@@ -444,7 +444,7 @@ def copy_node_data_into_interfaces(topology: Box) -> None:
                 if k in mod_attr.vrf_aware })                    # Build a Box of VRF attributes that could be copied to interfaces
 
         if copy_attr or vrf_attr:                                # ... modify interface data only if we have something to merge
-          intf[m] = copy_attr + vrf_attr + intf[m]
+          intf[m] = data.merge_box(data.merge_box(copy_attr,vrf_attr),intf[m])
 
 """
 get_effective_module_attribute:
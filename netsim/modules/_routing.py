@@ -16,7 +16,7 @@ from ..augment import addressing, devices
 from ..data import global_vars
 from ..utils import log
 from ..utils import routing as _rp_utils
-from . import get_effective_module_attribute
+from . import _dataplane, get_effective_module_attribute
 from .routing.policy import check_routing_policy, import_routing_policy
 
 """
@@ -274,6 +274,7 @@ def router_id(node: Box, proto: str, pools: Box) -> None:
   if 'router_id' in node.get(proto,{}):       # User-configured per-protocol router ID, get out of here
     try:
       node[proto].router_id = _rp_utils.get_address(node[proto].router_id)
+      register_router_id(proto,node[proto].router_id)
     except Exception as ex:
       log.error(
         f'{proto} router_id "{node[proto].router_id}" specified for {proto} on node {node.name} is not an IPv4 address',
@@ -286,6 +287,7 @@ def router_id(node: Box, proto: str, pools: Box) -> None:
     try:
       node.router_id = _rp_utils.get_address(node.router_id)
       node[proto].router_id = node.router_id
+      register_router_id(proto,node.router_id)
     except Exception as ex:
       log.error(
         f'router_id "{node.router_id}" specified on node {node.name} is not an IPv4 address',
@@ -296,6 +298,7 @@ def router_id(node: Box, proto: str, pools: Box) -> None:
 
   if 'ipv4' in node.get('loopback',{}):       # Do we have IPv4 address on the loopback? If so, use it as router ID
     node[proto].router_id = _rp_utils.get_intf_address(node.loopback.ipv4)
+    register_router_id(proto,node[proto].router_id)
     return
 
   pfx = get_router_id_prefix(node,proto,pools)
@@ -304,6 +307,7 @@ def router_id(node: Box, proto: str, pools: Box) -> None:
 
   node.router_id = _rp_utils.get_intf_address(pfx['ipv4'])
   node[proto].router_id = node.router_id
+  register_router_id(proto,node.router_id)
 
 #
 # remove_vrf_interfaces -- remove interfaces in a VRF from a routing process that is not VRF-aware
@@ -536,19 +540,31 @@ def get_remote_cp_endpoint(n: Box) -> Box:
   return data.get_empty_box()                               # Otherwise return an empty box
 
 """
-get_router_id_blacklist: As we generate router IDs in various ways, we have no way of
-figuring out which ones were already used. The only bruteforce method is thus to build
-a list of router ID per protocol
+The router ID registry: a per-protocol ID set of router IDs used in the topology
+
+* register_router_id -- add a router ID to the registry (called whenever router_id assigns one)
+* get_router_id_blacklist -- get the set of used router IDs. As we generate router IDs in
+  various ways (including copying them into VRF instances), the registry is completed with
+  a walk over all nodes and VRFs the first time it's needed
 """
-def get_router_id_blacklist(topology: Box, proto: str) -> list:
-  blist = []
+def register_router_id(proto: str, rid: typing.Any) -> None:
+  if rid is not None:
+    _dataplane.get_id_set(f'router_id_{proto}').add(rid)
+
+def get_router_id_blacklist(topology: Box, proto: str) -> set:
+  rid_set = _dataplane.get_id_set(f'router_id_{proto}')
+  rid_var = global_vars.get(f'router_id_{proto}_id')
+  if rid_var.get('complete',False):                         # Have we already walked the topology?
+    return rid_set
+
   for ndata in topology.nodes.values():                     # Iterate over all nodes
-    blist.append(ndata.get(f'{proto}.router_id',None))      # Blindly add router ID from global proto instance
+    rid_set.add(ndata.get(f'{proto}.router_id',None))       # Blindly add router ID from global proto instance
     for vdata in ndata.get('vrfs',{}).values():
-      blist.append(vdata.get(f'{proto}.router_id',None))    # ... and from all VRFs
+      rid_set.add(vdata.get(f'{proto}.router_id',None))     # ... and from all VRFs
 
-  return [ x for x in blist if x is not None ]              # Obviously some of those values do not exist
-                                                            # ... so we have to filter them out
+  rid_set.discard(None)                                     # Obviously some of those values do not exist
+  rid_var.complete = True
+  return rid_set
 
 """
 get_unique_router_ids: change router IDs in VRF routing protocols for devices that want
@@ -562,7 +578,7 @@ def get_unique_router_ids(node: Box, proto: str, topology: Box) -> None:
     return
 
   rid_list: list = []                                       # Keep track of on-device RIDs
-  rid_blacklist: list = []                                  # ... and a global list of already-used RIDs
+  rid_blacklist: typing.Optional[set] = None                # ... and a global set of already-used RIDs
   if proto in node:
     rid_list.append(node.get(f'{proto}.router_id'))         # The node is running a global copy of the protocol
 
@@ -574,7 +590,7 @@ def get_unique_router_ids(node: Box, proto: str, topology: Box) -> None:
       rid_list.append(rid)
       continue
 
-    if not rid_blacklist:                                   # Get the global black lisf if needed
+    if rid_blacklist is None:                               # Get the global black list if needed
       rid_blacklist = get_router_id_blacklist(topology,proto)
 
     while True:                                             # Try to get the next router ID from the pool
@@ -586,7 +602,8 @@ def get_unique_router_ids(node: Box, proto: str, topology: Box) -> None:
         break
 
     if rid_pfx:                                             # If we have a prefix, we also have a RID
-      vdata[proto].router_id = router_id                    # ... so set it and report the change
+      vdata[proto].router_id = router_id                    # ... so set it, register it, and report the change
+      rid_blacklist.add(router_id)
       log.warning(
         text=f'router ID for VRF {vname} on node {node.name} was changed from {rid} to {vdata[proto].router_id}',
         module=proto,
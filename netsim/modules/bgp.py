@@ -108,15 +108,55 @@ def validate_bgp_sessions(node: Box, sessions: Box, attribute: str) -> bool:
 
   return OK
 
+"""
+AS index: a dictionary of autonomous systems used in the lab. For every AS, the index
+contains:
+
+* members -- nodes in that AS (in the topology order)
+* rr -- route reflectors in that AS
+* mesh -- members that want IBGP sessions with route reflectors that do not want a
+  RR mesh (clients and route reflectors with rr_mesh set to True)
+
+The index is built in module_post_transform (after the route reflectors have been
+set up) and used to build IBGP sessions and RR clusters without scanning all nodes.
+It's kept in the 'bgp_as_index' global variable and removed in module_cleanup. The
+ASIndex wrapper keeps Box from converting (and copying) the indexed nodes.
+"""
+class ASIndex:
+  def __init__(self, topology: Box) -> None:
+    self.as_data: typing.Dict[typing.Any,dict] = {}
+    for n in topology.nodes.values():
+      n_as = n.get('bgp.as',None)
+      if n_as is None:
+        continue
+      as_data = self.as_data.setdefault(n_as,{ 'members': [], 'rr': [], 'mesh': [] })
+      as_data['members'].append(n)
+      is_rr = n.bgp.get('rr',None)
+      if is_rr:
+        as_data['rr'].append(n)
+      if not is_rr or n.bgp.get('rr_mesh',True):
+        as_data['mesh'].append(n)
+
+def build_as_index(topology: Box) -> typing.Dict[typing.Any,dict]:
+  as_index = ASIndex(topology)
+  topology.defaults._globals.bgp_as_index = as_index
+  return as_index.as_data
+
+def get_as_index(topology: Box) -> typing.Dict[typing.Any,dict]:
+  as_index = topology.defaults._globals.get('bgp_as_index',None)
+  if as_index is None:                            # Called before module_post_transform?
+    return build_as_index(topology)
+
+  return as_index.as_data
+
 """
 find_bgp_rr: find route reflectors in the specified autonomous system
 
 Given an autonomous system and lab topology, return a list of node names that are route reflectors in that AS
 """
 def find_bgp_rr(bgp_as: int, topology: Box) -> typing.List[Box]:
-  return [ n 
-    for n in topology.nodes.values() 
-      if 'bgp' in n and n.bgp["as"] == bgp_as and n.bgp.get("rr",None) ]
+  as_data = get_as_index(topology).get(bgp_as,None)
+  return list(as_data['rr']) if as_data else []
 
 """
 bgp_neighbor: Create BGP neighbor data structure
@@ -185,15 +225,13 @@ def build_ibgp_sessions(node: Box, sessions: Box, topology: Box) -> None:
   rrlist = [] if is_rr else find_bgp_rr(node_as,topology)
   rr_mesh  = node.bgp.get("rr_mesh",True)         # Do we want to have a mesh between RRs (default: Yes)?
   if is_rr or not rrlist:                         # If the current node is RR or we have a full mesh
-    ibgp_ngb_list = [                             # ... we need IBGP sessions to all nodes in the AS
-      ngb for ngb in topology.nodes.values()      # ... but while building the node list
-        if ngb.name != node.name and              # ... skip current node
-           ngb.get('bgp.as',None) == node_as]     # ... and everyone not in the current AS (or not running BGP)
+    as_data = get_as_index(topology).get(node_as,{})
     if is_rr and not rr_mesh:                     # Are we a RR and the user hates inter-RR sessions?
-      ibgp_ngb_list = [                           # ... Let's exclude other RRs from neighbor list
-        ngb for ngb in ibgp_ngb_list              # Iterate over IBGP neighbors we found so far
-          if not ngb.get('bgp.rr',False)          # ... and keep the neighbor if it's not an RR
-            or ngb.get('bgp.rr_mesh',True) ]      # ... or if its rr_mesh is True (to keep symmetric sessions)
+      ibgp_ngb_list = as_data.get('mesh',[])      # ... then we need sessions with non-RRs and RRs that want a mesh
+    else:
+      ibgp_ngb_list = as_data.get('members',[])   # ... otherwise we need IBGP sessions to all nodes in the AS
+    ibgp_ngb_list = [                             # In any case, skip the current node
+      ngb for ngb in ibgp_ngb_list if ngb.name != node.name ]
   else:
     ibgp_ngb_list = rrlist
 
@@ -458,11 +496,8 @@ defined, find an AS-wide cluster ID: the lowest BGP router ID of all route refle
 (members of rr_list) that don't have rr_cluster_id set (because those obviously want to be left alone)
 """
 def build_bgp_rr_clusters(topology: Box) -> None:
-  # Build a list of autonomous systems in the lab
-  as_list = set( n.bgp['as'] for n in topology.nodes.values() if 'bgp' in n and 'as' in n.bgp )
-
-  for asn in as_list:
-    rrlist = find_bgp_rr(asn,topology)
+  for as_data in get_as_index(topology).values():
+    rrlist = as_data['rr']
     if not rrlist:                        # No BGP route reflectors in this ASN
       continue
 
@@ -910,6 +945,7 @@ class BGP(_Module):
       if 'bgp' in n:
         _routing.router_id(n,'bgp',topology.pools)
 
+    build_as_index(topology)
     build_bgp_rr_clusters(topology)
     check_confederation_data(topology)
 
@@ -928,3 +964,6 @@ class BGP(_Module):
     _routing.check_vrf_protocol_support(node,'bgp',None,'bgp',topology)
     _routing.process_imports(node,'bgp',topology,global_vars.get_const('vrf_igp_protocols',['connected']))
     sanitize_bgp_data(node)
+
+  def module_cleanup(self, topology: Box) -> None:
+    topology.defaults._globals.pop('bgp_as_index',None)
@@ -3,7 +3,7 @@
 #
 import typing
 
-from box import Box
+from box import Box, BoxList
 
 from .. import data
 from ..augment import addressing, devices, groups, links
@@ -497,7 +497,7 @@ def populate_node_vlan(vlan: str, node: Box, topology: Box) -> Box:
                 topology.get('vlan.mode',None) or 'irb'
   n_vlan._global_merge = True
 
-  node.vlans[vlan] = g_vlan + n_vlan
+  node.vlans[vlan] = data.merge_box(g_vlan,n_vlan)
 
   for m in list(node.vlans[vlan].keys()):                         # Remove irrelevant module parameters
     if not m in node.module and m in topology.module:             # ... it's safe to use direct references, everyone is using VLAN module
@@ -763,17 +763,29 @@ def create_loopback_vlan_links(topology: Box) -> None:
         link_data.interfaces.append(intf_data)
         topology.links.append(link_data)
 
+"""
+get_vlan_owner: Find where the VLAN data structure is defined: topology (empty string),
+node, or interface neighbor (node name). Returns None if there's no VLAN data
+"""
+def get_vlan_owner(vlan: str, node: Box, topology: Box, intf: Box) -> typing.Optional[str]:
+  if topology.get(f'vlans.{vlan}',None):
+    return ''
+  if node.get(f'vlans.{vlan}',None):
+    return node.name
+  for n in intf.get('neighbors',[]):  # Look for local vlan in neighbor
+    if topology.nodes[n.node].get(f'vlans.{vlan}',None):
+      return n.node
+  return None
+
 """
 get_vlan_data: Get VLAN data structure (node or topology or interface neighbors)
 """
 def get_vlan_data(vlan: str, node: Box, topology: Box, intf: Box) -> typing.Optional[Box]:
-  vlan_data = topology.get(f'vlans.{vlan}',None) or node.get(f'vlans.{vlan}',None)
-  if not vlan_data and 'neighbors' in intf:
-    for n in intf.neighbors:  # Look for local vlan in neighbor
-      vlan_data = topology.nodes[n.node].get(f'vlans.{vlan}',None)
-      if vlan_data:
-        break
-  return vlan_data
+  owner = get_vlan_owner(vlan,node,topology,intf)
+  return None if owner is None else get_owner_vlan_data(owner,vlan,topology)
+
+def get_owner_vlan_data(owner: str, vlan: str, topology: Box) -> Box:
+  return topology.vlans[vlan] if owner == '' else topology.nodes[owner].vlans[vlan]
 
 """
 get_vlan_mode: Get VLAN mode attribute (node or topology), default 'irb'
@@ -781,34 +793,84 @@ get_vlan_mode: Get VLAN mode attribute (node or topology), default 'irb'
 def get_vlan_mode(node: Box, topology: Box) -> str:
   return node.get('vlan.mode',None) or topology.get('vlan.mode',None) or 'irb'
 
+"""
+VLAN neighbor tables: the VLAN-wide lists of neighbors are built in tables indexed by
+node name while the SVI interfaces are created, copied into VLAN neighbor lists once
+all nodes have been processed (materialize_vlan_neighbors), and shared by all SVI
+interfaces attached to the VLAN (set_svi_neighbor_list)
+
+The tables are kept in the 'vlan_neighbors' global variable (indexed by VLAN owner and
+VLAN name, see get_vlan_owner) while the VLAN module processes the topology links
+"""
+class VLANNeighbors:
+  def __init__(self, owner: str, vlan: str, vlan_data: Box) -> None:
+    self.owner = owner                                                  # VLAN owner (see get_vlan_owner) and name
+    self.vlan = vlan
+    self.entries: typing.Dict[int,Box] = {}                             # Neighbor entries in VLAN neighbor list order
+    self.nodes: typing.Dict[str,list] = {}                              # Node name => keys of its neighbor entries
+    self.count = 0
+    for n_data in vlan_data.get('neighbors',None) or []:
+      self.add(n_data)
+
+  def add(self, n_data: Box) -> None:
+    self.count += 1
+    self.entries[self.count] = n_data
+    self.nodes.setdefault(n_data.node,[]).append(self.count)
+
+  def remove_node(self, name: str) -> None:
+    for key in self.nodes.pop(name,[]):
+      self.entries.pop(key)
+
+  def exclude(self, name: str) -> list:
+    return [ n_data for n_data in self.entries.values() if n_data.node != name ]
+
+def get_vlan_neighbors(
+      vlan: str, node: Box, topology: Box, intf: Box,
+      create: bool = False) -> typing.Optional[VLANNeighbors]:
+  owner = get_vlan_owner(vlan,node,topology,intf)
+  if owner is None:
+    return None
+
+  n_key = f'{owner}/{vlan}'
+  n_tables = topology.defaults._globals.vlan_neighbors
+  if n_key not in n_tables and create:
+    n_tables[n_key] = VLANNeighbors(owner,vlan,get_owner_vlan_data(owner,vlan,topology))
+
+  return n_tables.get(n_key,None)
+
 """
 update_vlan_neighbor_list: Build a VLAN-wide list of neighbors
 """
 def update_vlan_neighbor_list(vlan: str, phy_if: Box, svi_if: Box, node: Box,topology: Box) -> None:
-  vlan_data = get_vlan_data(vlan,node,topology,phy_if)                  # Try to get global or node-level VLAN data
-  if vlan_data is None:                                                 # ... and get out if there's none
+  n_table = get_vlan_neighbors(vlan,node,topology,phy_if,create=True)   # Get (or start) global or node-level VLAN neighbor table
+  if n_table is None:                                                   # ... and get out if there's no VLAN data
     return
 
-  if not 'neighbors' in vlan_data:
-    vlan_data.neighbors = []
-
-  n_map = { data.node: data for data in vlan_data.neighbors }           # Build a list of known VLAN neighbors
-  phy_n_list = phy_if.get('neighbors',[])                               # ... add interface neighbors not yet in the list
-  vlan_data.neighbors.extend([n_data for n_data in phy_n_list if n_data.node not in n_map])
+  phy_n_list = phy_if.get('neighbors',[])                               # Add interface neighbors not yet in the list
+  phy_n_new = [ get_box(n_data) for n_data in phy_n_list if n_data.node not in n_table.nodes ]
+  node_known = node.name in n_table.nodes
+  for n_data in phy_n_new:
+    n_table.add(n_data)
 
   svi_info = node.get('module',[]) + list(log.AF_LIST)                  # Include SVI module and address information
   svi_ifdata = get_box({ 'ifname': svi_if.ifname, 'node': node.name })  # Prepare SVI interface data for neighbor list
   svi_ifdata += { k:v for k,v in svi_if.items() if k in svi_info }      # Copy relevant SVI info into neighbor entry
 
-  if node.name in n_map:
+  if node_known:
     # The current node data must be based on physical interfaces
     # Remove the current node from the neighbor list and add the SVI information
     #
-    vlan_data.neighbors = [ n for n in vlan_data.neighbors if n.node != node.name ] + [ svi_ifdata ]
-  else:
-    # The current node is not yet in the VLAN neighbor list, add the SVI information
-    #
-    vlan_data.neighbors.append(svi_ifdata)
+    n_table.remove_node(node.name)
+
+  n_table.add(svi_ifdata)
+
+"""
+materialize_vlan_neighbors: Copy the VLAN neighbor tables into VLAN neighbor lists
+"""
+def materialize_vlan_neighbors(topology: Box) -> None:
+  for n_table in topology.defaults._globals.vlan_neighbors.values():   # Node VLAN data could have been replaced
+    vlan_data = get_owner_vlan_data(n_table.owner,n_table.vlan,topology)  # ... since the table was created
+    vlan_data.neighbors = list(n_table.entries.values())
 
 """
 create_node_vlan: Create a local (node) copy of a VLAN used on an interface
@@ -925,10 +987,10 @@ def create_svi_interfaces(node: Box, topology: Box) -> dict:
       vlan_ifdata.virtual_interface = True                                  # Mark interface as virtual
       vlan_ifdata.neighbors = []                                            # No neighbors so far
                                                                             # Overwrite interface settings with VLAN settings
-      vlan_ifdata = vlan_ifdata + {
+      vlan_ifdata = data.merge_box(vlan_ifdata,{
                       k:v for k,v in vlan_data.items()
                         if k not in svi_skipattr and k not in copy_attr and
-                           (v is not True or k not in vlan_ifdata) }
+                           (v is not True or k not in vlan_ifdata) })
       fix_vlan_mode_attribute(vlan_ifdata)
       if 'mtu' in node and 'mtu' not in vlan_ifdata and vlan_mode != 'bridge':
         if not features.get('initial.system_mtu',False):                    # If we have node MTU on a device without system MTU
@@ -971,7 +1033,13 @@ def set_svi_neighbor_list(node: Box, topology: Box) -> None:
         if len(vlan_data.neighbors) == vlan_data.host_count +1:             # ... and there's exactly one non-host attached to the VLAN
           ifdata.role = 'stub'                                              # ... then we have a stub link, mark it for IGP modules
 
-      ifdata.neighbors = [ n for n in vlan_data.neighbors if n.node != node.name ]
+      n_table = get_vlan_neighbors(ifdata.vlan_name,node,topology,ifdata)
+      if n_table is None:
+        ifdata.neighbors = [ n for n in vlan_data.neighbors if n.node != node.name ]
+      else:                                                                 # Reference the shared neighbor entries
+        ifdata.neighbors = BoxList(                                         # ... without copying them into every SVI
+                              n_table.exclude(node.name),
+                              box_intact_types=(Box,),default_box=True,default_box_none_transform=False,box_dots=True)
       if ifdata.neighbors:
         if ' -> ' in ifdata.name:
           ifdata.name = ifdata.name.split(' -> ')[0]
@@ -1448,6 +1516,7 @@ class VLAN(_Module):
   * Fix VLAN-wide default gateway
   """
   def module_post_link_transform(self, topology: Box) -> None:
+    topology.defaults._globals.vlan_neighbors = {}
     for n in topology.nodes.values():
       if 'vlan' in n.get('module',[]):
         populate_node_vlan_data(n,topology)
@@ -1458,12 +1527,14 @@ class VLAN(_Module):
         check_mixed_trunks(n,topology)
         check_mixed_native_trunk(n,topology)
 
+    materialize_vlan_neighbors(topology)
     if topology.defaults.warnings.duplicate_address:
       check_vlan_duplicate_address(topology,topology)
 
     for n in topology.nodes.values():
       set_svi_neighbor_list(n,topology)
 
+    topology.defaults._globals.pop('vlan_neighbors',None)
     topology.links = [ link for link in topology.links if link.type != 'vlan_member' ]
 
     cleanup_vlan_flags(topology)
@@ -2,102 +2,303 @@
 # Create device configuration files
 #
 
-import shutil
+import concurrent.futures
+import os
+import typing
 from pathlib import Path
 
 from box import Box
 
+from .. import __version__
 from ..augment import devices, groups, nodes
 from ..providers import SHARED_PREFIX, SHARED_SUFFIX, get_provider_module
-from ..utils import log, strings, templates
+from ..utils import files, log, manifest, strings, templates
 from . import _TopologyOutput, check_writeable
 from . import common as output_common
 
+"""
+The configuration files are created in three steps:
+
+* The render plan for each node is created in the main process. It contains the
+  node data (without the data shared by all nodes) and the list of configuration
+  templates to render (including template paths found in the search path).
+* Node configuration templates are rendered into text, either in the main process
+  or in a pool of worker processes. The rendering step does not log errors or write
+  files, it returns a list of results.
+* The results are processed (files written, errors reported) in the main process
+  in the same order regardless of where the templates have been rendered.
+
+The node_files directory is updated incrementally: a file is written only when its
+contents changed, and the files that were not created in this run are removed. The
+node_files manifest (see utils.manifest) contains the hash of all template inputs
+(template source, node data, shared data) for every file; the templates with unchanged
+inputs are not rendered if the file created in the previous run is still intact.
+"""
+
+"""
+render_item: create a single configuration template item for the render plan
+"""
+def render_item(
+      cfg_name: str,
+      f_name: str,
+      cfg_mode: str,
+      n_data: Box,
+      topology: Box,
+      provider_path: str) -> dict:
+  t_path = templates.find_provider_template(
+              node=n_data,
+              fname=cfg_name,
+              topology=topology,
+              provider_path=provider_path)
+  item: dict = { 'id': cfg_name, 'file': f_name, 'mode': cfg_mode, 'path': t_path }
+  if t_path:
+    item['search'] = templates.config_template_paths(
+                        node=n_data,
+                        fname=cfg_name,
+                        topology=topology,
+                        provider_path=provider_path)
+  return item
+
+"""
+node_render_plan: build the list of configuration templates that have to be rendered for a node
+"""
+def node_render_plan(n_name: str, n_data: Box, topology: Box, shared_list: list, provisioned: bool) -> dict:
+  n_provider = devices.get_provider(n_data,topology.defaults)
+  p = get_provider_module(topology,n_provider)
+  provider_path = p.get_full_template_path()
+  skip_config = n_data.get('skip_config',[])
+
+  plan: dict = {
+    'node': n_name,
+    'node_dict': templates.template_node_data(n_data,topology,shared=False),
+    'templates': [],
+    'modules': [] }
+
+  for cfg_item in n_data.get(f'{n_provider}.config_templates',[]):
+    cfg_source = cfg_item.source
+    cfg_mode = cfg_item.get('mode','')
+    if cfg_source in skip_config:
+      continue
+    if cfg_mode == SHARED_SUFFIX:
+      if cfg_source in shared_list:
+        plan['templates'].append({ 'id': cfg_source, 'shared': True })
+        continue
+
+      shared_list.append(cfg_source)
+      f_name = SHARED_PREFIX+cfg_source
+    else:
+      f_name = f'{n_name}/{cfg_source}'
+    plan['templates'].append(render_item(cfg_source,f_name,cfg_mode,n_data,topology,provider_path))
+
+  if not provisioned:
+    return plan
+
+  mod_list = ['initial']
+  if devices.get_device_attribute(n_data,'features.initial.normalize',topology.defaults):
+    mod_list = ['normalize'] + mod_list
+
+  mod_list += n_data.get('module',[]) + n_data.get('config',[])
+  for module in mod_list:
+    if module in skip_config:
+      continue
+    plan['modules'].append(render_item(module,f'{n_name}/{module}','cfg',n_data,topology,provider_path))
+
+  return plan
+
+"""
+set_input_hashes: add the hash of all template inputs to the render plan items, and
+mark the items that do not have to be rendered because their inputs did not change
+and the file created from them is still intact
+"""
+def set_input_hashes(plan: dict, run_hash: str, shared_hash: str, old_files: dict, node_files: Path) -> None:
+  node_hash = manifest.data_hash(plan['node_dict'])
+  for item in plan['templates'] + plan['modules']:
+    if not item.get('path',None):
+      continue
+    t_hash = templates.template_source_hash(item['path'],tuple(item['search']))
+    if t_hash is None:                                    # Cannot figure out template dependencies
+      continue                                            # ... render the template every time
+    item['input'] = manifest.data_hash({
+      'run': run_hash,
+      'template': t_hash,
+      'search': item['search'],
+      'mode': item['mode'],
+      'node': node_hash,
+      'shared': shared_hash })
+    old_entry = old_files.get(item['file'],None)
+    if not isinstance(old_entry,dict) or old_entry.get('input',None) != item['input']:
+      continue
+    if manifest.file_hash(node_files / item['file']) == old_entry.get('output',None):
+      item['unchanged'] = True
+
+"""
+render_plan_item: render a single configuration template, return the text or the error data
+"""
+def render_plan_item(item: dict, node_dict: dict) -> dict:
+  result = { 'id': item['id'], 'file': item['file'], 'mode': item['mode'], 'input': item.get('input',None) }
+  if not item['path']:
+    result['missing'] = True
+    return result
+
+  if item.get('unchanged',False):
+    result['unchanged'] = True
+    return result
+
+  node_dict['netlab_config_mode'] = item['mode']
+  try:
+    result['text'] = templates.render_config_text(
+                        in_folder=os.path.dirname(item['path']),
+                        j2=os.path.basename(item['path']),
+                        data=node_dict,
+                        extra_path=item['search'])
+  except Exception as ex:
+    result['error'] = templates.template_error_data(item['path'],ex)
+
+  node_dict.pop('netlab_config_mode',None)
+  return result
+
+"""
+render_node_configs: render all configuration templates from a node render plan
+
+Modules that have already been created as config_templates are skipped
+"""
+def render_node_configs(plan: dict, shared_data: dict) -> dict:
+  node_dict = dict(plan['node_dict'],**shared_data)
+  create_list = []
+  results = []
+
+  for item in plan['templates']:
+    if item.get('shared',False):
+      create_list.append(f'{item["id"]} (shared)')
+      continue
+    result = render_plan_item(item,node_dict)
+    results.append(result)
+    if 'text' in result or 'unchanged' in result:
+      create_list.append(item['id'])
+
+  for item in plan['modules']:
+    if item['id'] in create_list:
+      continue
+    result = render_plan_item(item,node_dict)
+    results.append(result)
+    if 'text' in result or 'unchanged' in result:
+      create_list.append(item['id'])
+
+  return { 'results': results, 'created': create_list }
+
+"""
+Worker process support: the shared template data and logging flags are sent to each
+worker process once (in the pool initializer), not with every rendering task
+"""
+WORKER_SHARED_DATA: dict = {}
+
+def init_worker(shared_data: dict, log_flags: dict) -> None:
+  global WORKER_SHARED_DATA
+  WORKER_SHARED_DATA = shared_data
+  log.set_flag(
+    debug=log_flags['debug'],
+    quiet=log_flags['quiet'],
+    verbose=log_flags['verbose'],
+    logging=log_flags['logging'],
+    warning=log_flags['warning'],
+    raise_error=log_flags['raise_on_error'])
+
+def render_worker_task(plan: dict) -> dict:
+  return render_node_configs(plan,WORKER_SHARED_DATA)
+
+"""
+get_render_jobs: the number of rendering processes (zero means 'use all CPUs')
+"""
+def get_render_jobs(topology: Box) -> int:
+  jobs = topology.defaults.netlab.create.get('jobs',1)
+  if not isinstance(jobs,int) or isinstance(jobs,bool) or jobs < 0:
+    log.error(
+      f'defaults.netlab.create.jobs must be a non-negative integer (found {jobs})',
+      category=log.IncorrectValue,
+      module='config')
+    return 1
+
+  return jobs or os.cpu_count() or 1
+
+def render_all_configs(plans: list, shared_data: dict, jobs: int) -> typing.Iterator[dict]:
+  if jobs <= 1 or len(plans) <= 1:
+    for plan in plans:
+      yield render_node_configs(plan,shared_data)
+    return
+
+  with concurrent.futures.ProcessPoolExecutor(
+          max_workers=min(jobs,len(plans)),
+          initializer=init_worker,
+          initargs=(shared_data,log.set_flag())) as executor:
+    yield from executor.map(render_worker_task,plans)     # map() returns the results in the order of plans
 
 class ConfigurationFiles(_TopologyOutput):
 
   DESCRIPTION :str = 'Create device configuration files'
 
   def write(self, topology: Box) -> None:
-
-    def do_config(t_name: str, f_name: str, cfg_mode: str) -> bool:
-      return templates.create_config_file(
-        node=n_data,
-        node_dict=node_dict,
-        topology=topology,
-        module=t_name,
-        provider_path=provider_path,
-        output_path=node_files,
-        output_file=f_name,
-        config_mode=cfg_mode)
-
     check_writeable('device configuration files')
-
-    # Clean up the node_files directory to remove any old configuration files
+    jobs = get_render_jobs(topology)
     node_files = Path('node_files')
-    if node_files.exists():
-      try:
-        shutil.rmtree(node_files)
-      except Exception as ex:
-        log.error(
-          "Failed to remove directory 'node_files'",
-          more_data=[str(ex)],
-          module='config')
+    old_files = manifest.load_manifest(node_files)['files']
+    new_files: dict = {}
 
     # Creates a "ghost clean" topology after transformation
     # (AKA, remove unmanaged devices)
     topology = output_common.create_adjusted_topology(nodes.ghost_buster(topology),ignore=[],template_vars=True)
-    shared_list = []
+    shared_list: list = []
     if 'unprovisioned' in topology.groups:
       unprovisioned = groups.group_members(topology,'unprovisioned')
     else:
       unprovisioned = []
 
-    for n_name,n_data in topology.nodes.items():
-      n_provider = devices.get_provider(n_data,topology.defaults)
-      p = get_provider_module(topology,n_provider)
-      provider_path = p.get_full_template_path()
-      node_dict = templates.template_node_data(n_data,topology)       # The dictionary used in templates
-
-      create_list = []
-      skip_config = n_data.get('skip_config',[])
-      for cfg_item in n_data.get(f'{n_provider}.config_templates',[]):
-        cfg_source = cfg_item.source
-        cfg_mode = cfg_item.get('mode','')
-        if cfg_source in skip_config:
-          continue
-        if cfg_mode == SHARED_SUFFIX:
-          if cfg_source in shared_list:
-            create_list.append(f'{cfg_source} (shared)')
-            continue
-
-          shared_list.append(cfg_source)
-          if do_config(cfg_source,SHARED_PREFIX+cfg_source,cfg_mode):
-            create_list.append(cfg_source)
-        else:
-          cfg_path = f'{n_name}/{cfg_source}'
-          if not do_config(cfg_source,cfg_path,cfg_mode):
-            continue
-          create_list.append(cfg_source)
-          if cfg_mode in ('sh','cp_sh'):
-            (node_files / cfg_path).chmod(0o755)
-
-      if n_name in unprovisioned:
-        continue
+    plans = [ node_render_plan(n_name,n_data,topology,shared_list,n_name not in unprovisioned)
+                for n_name,n_data in topology.nodes.items() ]
+    shared_data = templates.template_shared_data(topology)
 
-      mod_list = ['initial']
-      if devices.get_device_attribute(n_data,'features.initial.normalize',topology.defaults):
-        mod_list = ['normalize'] + mod_list
+    run_hash = manifest.data_hash([ __version__, files.get_glob_mtime('package:','**/*.py') ])
+    shared_hash = manifest.data_hash({ k:v for k,v in shared_data.items() if k != '_timestamp' })
+    for plan in plans:
+      set_input_hashes(plan,run_hash,shared_hash,old_files,node_files)
 
-      mod_list += n_data.get('module',[]) + n_data.get('config',[])
-      for module in mod_list:
-        if module in skip_config:
+    for plan,n_result in zip(plans,render_all_configs(plans,shared_data,jobs)):
+      n_data = topology.nodes[plan['node']]
+      for result in n_result['results']:
+        if result.get('missing',False):
+          templates.report_missing_template(n_data,result['id'])
           continue
-        if module in create_list:
+        if 'error' in result:
+          templates.report_template_error(n_data,result['id'],result['error'])
           continue
-        if do_config(module,f'{n_name}/{module}','cfg'):
-          create_list.append(module)
 
-      if not log.VERBOSE and create_list:
+        f_name = result['file']
+        out_file = node_files / f_name
+        if result.get('unchanged',False):
+          new_files[f_name] = old_files[f_name]
+          if log.VERBOSE:
+            log.info(f"Inputs of {result['id']} template for {plan['node']} did not change, reusing {f_name}")
+        else:
+          if manifest.write_if_changed(out_file,result['text']) and log.debug_active('cache'):
+            log.info(f'Updated {out_file}',module='config')
+          if log.VERBOSE:
+            log.info(f"Rendered {result['id']} template for {plan['node']} into {f_name}")
+          new_files[f_name] = {
+            'node': plan['node'],
+            'module': result['id'],
+            'input': result['input'],
+            'output': manifest.text_hash(result['text']) }
+          old_entry = old_files.get(f_name,None)
+          if isinstance(old_entry,dict) and old_entry.get('deployed',None):
+            new_files[f_name]['deployed'] = old_entry['deployed']
+
+        if result['mode'] in ('sh','cp_sh') and not f_name.startswith(SHARED_PREFIX):
+          out_file.chmod(0o755)
+
+      if not log.VERBOSE and n_result['created'] and plan['node'] not in unprovisioned:
         strings.print_colored_text(strings.pad_err_code('CONFIG',10),'green')
-        print(f"{n_name}: {','.join(create_list)}")
+        print(f"{plan['node']}: {','.join(n_result['created'])}")
+
+    # Remove the files created in previous runs that were not created in this run
+    manifest.remove_stale_files(node_files,set(new_files.keys()))
+    if new_files or old_files:
+      manifest.save_manifest(node_files,{ 'version': __version__, 'files': new_files })
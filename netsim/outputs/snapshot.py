@@ -0,0 +1,33 @@
+#
+# Create indexed (memory-mappable) snapshot of transformed topology
+#
+from box import Box
+
+from .. import __version__
+from ..augment import topology
+from ..utils import log
+from ..utils import snapshot as _snapshot
+from . import _TopologyOutput
+
+
+class Snapshot(_TopologyOutput):
+
+  DESCRIPTION :str = 'Create indexed snapshot of transformed topology (supports partial loading)'
+
+  def write(self, topo: Box) -> None:
+    outfile = self.select_output_file(_snapshot.SNAPSHOT_FILE,writeable=True)
+    if outfile is None:
+      return
+
+    if outfile == '-':
+      log.fatal('Cannot write indexed snapshot to stdout',module='snapshot')
+
+    topodict = topology.cleanup_topology(topo).to_dict()
+    topodict['_netlab_version'] = __version__
+    try:
+      _snapshot.write_snapshot(topodict,outfile)
+    except Exception as ex:
+      log.fatal(f'Cannot write indexed snapshot to {outfile}: {str(ex)}',module='snapshot')
+
+    log.status_created()
+    print(f"indexed snapshot of transformed topology data in {outfile}")
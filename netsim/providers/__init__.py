@@ -14,11 +14,10 @@ import typing
 # Related modules
 from box import Box
 
-from ..augment import devices, links
+from ..augment import devices
 from ..data import append_to_list, filemaps, get_box, get_empty_box
-from ..outputs.ansible import get_host_addresses
 from ..utils import files as _files
-from ..utils import log, strings, templates
+from ..utils import log, strings
 from ..utils.callback import Callback
 
 """
@@ -108,6 +107,8 @@ class _Provider(Callback):
     self.transform(topology)
     fname = self.get_output_name(fname,topology)
     tname = self.get_root_template()
+    from ..utils import templates
+
     try:
       search_path = _files.get_search_path(self.provider,pkg_path_component=self.get_template_path())
       r_text = templates.render_template(
@@ -181,6 +182,8 @@ class _Provider(Callback):
   Generic provider pre-output transform: remove loopback links
   """
   def pre_output_transform(self, topology: Box) -> None:
+    from ..augment import links
+
     if not 'links' in topology:
       return
 
@@ -13,7 +13,7 @@ from ..augment import devices
 from ..cli import external_commands, is_dry_run
 from ..data import append_to_list, filemaps, get_empty_box
 from ..data.types import must_be_dict
-from ..utils import linuxbridge, log, strings
+from ..utils import dockerapi, linuxbridge, log, strings
 from . import (
   READ_ONLY_SUFFIX,
   SHARED_PREFIX,
@@ -341,8 +341,21 @@ def generate_startup_config(n: Box) -> None:
     log.status_created()
     print(f"startup configuration for {n.name}",flush=True)
 
+'''
+Print the output of configuration scripts as it's received (used with '--debug clab'). Only
+the last CAPTURED_LINES lines of script output are kept for error messages
+'''
+CAPTURED_LINES: typing.Final[int] = 200
+
+def print_output_line(stream: int, line: str) -> None:
+  print(line,end='',flush=True)
+
 class Containerlab(_Provider):
-  
+
+  def __init__(self, provider: str, data: Box) -> None:
+    super().__init__(provider,data)
+    self.docker_api = bool(data.get('docker_api',False))
+
   def augment_node_data(self, node: Box, topology: Box) -> None:
     node.hostname = self.get_node_name(node.name,topology)
     node_fp = get_provider_forwarded_ports(node,topology)
@@ -385,7 +398,30 @@ class Containerlab(_Provider):
       else:
         destroy_linux_bridge(brname)
 
+  """
+  docker_client: returns the Docker Engine API client if we're allowed to use it (and it's
+  available), or None if we have to use the docker CLI. We never use the API in dry-run mode
+  unless the caller needs read-only access
+  """
+  def docker_client(self, read_only: bool = False) -> typing.Optional[dockerapi.DockerAPI]:
+    if not self.docker_api or (is_dry_run() and not read_only):
+      return None
+
+    return dockerapi.get_client()
+
   def get_lab_status(self) -> Box:
+    client = self.docker_client(read_only=True)
+    if client is not None:
+      try:
+        stat_box = get_empty_box()
+        for docker_stats in client.containers():
+          c_name = docker_stats['Names'][0].lstrip('/')
+          stat_box[c_name].status = docker_stats['Status']
+          stat_box[c_name].image = docker_stats['Image']
+        return stat_box
+      except (dockerapi.DockerAPIError,KeyError,IndexError) as ex:
+        log.print_verbose(f'clab: cannot get container status with Docker API, using docker CLI: {ex}')
+
     try:
       status = external_commands.run_command(
                   'docker ps --format json',
@@ -467,18 +503,72 @@ class Containerlab(_Provider):
       module='clab',
       more_hints=hints)
 
+  """
+  upload_node_files: copy all container-side configuration scripts we need into a container
+  with a single Docker API call. Returns False if the caller should use 'docker cp' instead.
+  """
+  def upload_node_files(
+        self,
+        client: dockerapi.DockerAPI,
+        node: Box,
+        node_name: str,
+        cfg_files: list,
+        deploy_list: list) -> bool:
+    file_list = [ (f'node_files/{node.name}/{cfg_item.source}',cfg_item.target)
+                    for cfg_item in cfg_files
+                      if cfg_item.source in deploy_list and cfg_item.get('mode',None) == 'cp_sh' and cfg_item.target ]
+    if not file_list:
+      return True
+
+    try:
+      client.put_files(node_name,file_list)
+    except dockerapi.DockerAPIError as ex:
+      log.print_verbose(f'clab: cannot copy configuration files into {node_name} with Docker API: {ex}')
+      return False
+
+    external_commands.log_command(f'docker cp (API) {" ".join([ f[0] for f in file_list ])} {node_name}','OK')
+    return True
+
+  """
+  exec_config_script: execute a container-side configuration script with a Docker API call,
+  printing its output as we get it when debugging clab provider.
+
+  Returns (exit code, stdout, stderr) or None if the caller should use 'docker exec' instead
+  """
+  def exec_config_script(
+        self,
+        client: dockerapi.DockerAPI,
+        node_name: str,
+        config_cmd: str,
+        script: str) -> typing.Optional[typing.Tuple[int,str,str]]:
+    def print_output(stream: int, data: bytes) -> None:
+      print(data.decode('utf-8',errors='replace'),end='',flush=True)
+
+    try:
+      result = client.exec(
+                  node_name,[ script ],
+                  output=print_output if log.debug_active('clab') else None)
+    except dockerapi.DockerAPIError as ex:
+      log.print_verbose(f'clab: cannot execute {script} in {node_name} with Docker API: {ex}')
+      return None
+
+    external_commands.log_command(config_cmd,f'FAIL({result[0]})' if result[0] else 'OK')
+    return result
+
   def deploy_node_config(self, node: Box, topology: Box, deploy_list: list) -> None:
     cfg_files = node.get('clab.config_templates',[])
     if not cfg_files:                                          # No node files => no config to deploy here
       return
     node_name = self.get_node_name(node.name,topology)          # ... get container/namespace name
+    client = self.docker_client()                               # Use Docker API if we can
+    uploaded = client is not None and self.upload_node_files(client,node,node_name,cfg_files,deploy_list)
     for cfg_item in cfg_files:                                  # Go through configuration files
       mod_name = cfg_item.source                                # Get module name
       f_type = cfg_item.get('mode',None)
       if mod_name not in deploy_list:                           # ... and skip it if we're not deploying it
         continue
       if f_type == 'cp_sh' and cfg_item.target:                 # Note: checking for non-existent attribute is OK
-        cp_status = external_commands.run_command(
+        cp_status = uploaded or external_commands.run_command(
                       cmd=['docker','cp','-q',
                            f'node_files/{node.name}/{cfg_item.source}',
                            f'{node_name}:{cfg_item.target}'],
@@ -513,20 +603,29 @@ class Containerlab(_Provider):
       if not config_cmd:                                        # Not an executable file?
         continue
 
-      status = external_commands.run_command(
-                  config_cmd,                                   # Execute config command
-                  ignore_errors=True,
-                  check_result=True,                            # Capture stdout
-                  return_exitcode=True)                         # and return exit code
+      api_result = None                                         # Try to use Docker API for container-side scripts
+      if client is not None and f_type != 'ns':
+        api_result = self.exec_config_script(client,node_name,config_cmd,cfg_item.target)
+      if api_result is not None:
+        status: typing.Union[bool,int,str] = api_result[0]
+        stdout, stderr = api_result[1:]
+      else:
+        cmd_result = external_commands.run_command_result(
+                        config_cmd,                             # Execute config command, capturing the
+                        output=print_output_line if log.debug_active('clab') else None,
+                        max_lines=CAPTURED_LINES)               # ... last lines of its stdout/stderr
+        status = -1 if cmd_result.returncode is None else cmd_result.returncode
+        stdout = cmd_result.stdout
+        stderr = cmd_result.stderr or cmd_result.error or ''
       if status == 0:                                           # Everything OK?
         append_to_list(node._deploy,'success',mod_name)
       else:                                                     # Otherwise we failed
         printout = ''                                           # Collect any printout we might have received
-        if external_commands.CAPTURED_STDOUT:                   # ... making sure it ends with a single newline
-          stdout = external_commands.CAPTURED_STDOUT.strip(" \n") + "\n"
+        if stdout:                                              # ... making sure it ends with a single newline
+          stdout = stdout.strip(" \n") + "\n"
           printout +='  '+strings.wrap_error_message(stdout,indent=2)
-        if external_commands.CAPTURED_STDERR:
-          stderr = external_commands.CAPTURED_STDERR.strip(" \n") + "\n"
+        if stderr:
+          stderr = stderr.strip(" \n") + "\n"
           printout +='  '+strings.wrap_error_message(stderr,indent=2)
         if printout:                                            # And print it
           strings.print_colored_text(txt=printout,color='bright_black')
@@ -0,0 +1,268 @@
+#
+# Minimal Docker Engine API client
+#
+# The client talks to the Docker daemon over its local unix socket and implements
+# the calls the containerlab provider needs: list running containers, upload files
+# into a container (a single tar archive per call), and execute a command within a
+# container (streaming its output). Idle HTTP connections are kept in a small pool
+# and reused for subsequent requests.
+#
+# get_client() returns a shared client or None if the Docker socket is not available
+# (or the Docker daemon does not respond); the callers should use the docker CLI
+# in that case.
+#
+import http.client
+import io
+import json
+import os
+import socket
+import struct
+import tarfile
+import threading
+import typing
+import urllib.parse
+
+from . import log
+
+DOCKER_SOCKET: typing.Final[str] = '/var/run/docker.sock'
+
+class DockerAPIError(Exception):
+  pass
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+
+  def __init__(self, socket_path: str, timeout: float) -> None:
+    super().__init__('localhost',timeout=timeout)
+    self.socket_path = socket_path
+
+  def connect(self) -> None:
+    sock = socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+    sock.settimeout(self.timeout)
+    sock.connect(self.socket_path)
+    self.sock = sock
+
+"""
+Output callback of the 'exec' method: called with the stream (1 = stdout, 2 = stderr)
+and the data received from the Docker daemon
+"""
+OutputCallback = typing.Callable[[int,bytes],None]
+
+class DockerAPI:
+
+  def __init__(self, socket_path: str, timeout: float = 120, pool_size: int = 8) -> None:
+    self.socket_path = socket_path
+    self.timeout = timeout
+    self.pool_size = pool_size
+    self.pool: typing.List[UnixHTTPConnection] = []
+    self.lock = threading.Lock()
+
+  def get_connection(self) -> typing.Tuple[UnixHTTPConnection,bool]:
+    with self.lock:
+      if self.pool:
+        return (self.pool.pop(),True)
+
+    return (UnixHTTPConnection(self.socket_path,self.timeout),False)
+
+  def release_connection(self, conn: UnixHTTPConnection) -> None:
+    with self.lock:
+      if len(self.pool) < self.pool_size:
+        self.pool.append(conn)
+        return
+
+    conn.close()
+
+  def close(self) -> None:
+    with self.lock:
+      for conn in self.pool:
+        conn.close()
+      self.pool = []
+
+  """
+  send: send a request to the Docker daemon, return the connection and the response
+  (the caller has to read the response and release or close the connection). A request
+  sent over a pooled connection is retried once in case the daemon closed the idle connection.
+  """
+  def send(
+        self,
+        method: str,
+        path: str,
+        body: typing.Any = None,
+        query: typing.Optional[dict] = None,
+        content_type: str = 'application/json') -> typing.Tuple[UnixHTTPConnection,http.client.HTTPResponse]:
+    url = path + ('?' + urllib.parse.urlencode(query) if query else '')
+    headers = { 'Host': 'docker' }
+    if body is not None:
+      if content_type == 'application/json':
+        body = json.dumps(body).encode('utf-8')
+      headers['Content-Type'] = content_type
+
+    while True:
+      conn, reused = self.get_connection()
+      try:
+        conn.request(method,url,body=body,headers=headers)
+        return (conn,conn.getresponse())
+      except (http.client.HTTPException,OSError) as ex:
+        conn.close()
+        if not reused:
+          raise DockerAPIError(f'{method} {path} failed: {ex}')
+
+  """
+  request: send a request, return the decoded JSON response (or None if the response is empty)
+  """
+  def request(
+        self,
+        method: str,
+        path: str,
+        body: typing.Any = None,
+        query: typing.Optional[dict] = None,
+        content_type: str = 'application/json') -> typing.Any:
+    conn, resp = self.send(method,path,body,query,content_type)
+    try:
+      payload = resp.read()
+    except (http.client.HTTPException,OSError) as ex:
+      conn.close()
+      raise DockerAPIError(f'{method} {path} failed: {ex}')
+
+    if resp.will_close:
+      conn.close()
+    else:
+      self.release_connection(conn)
+
+    if resp.status >= 400:
+      try:
+        message = json.loads(payload).get('message','')
+      except Exception:
+        message = payload.decode('utf-8',errors='replace').strip()
+      raise DockerAPIError(f'{method} {path} failed with status {resp.status}: {message}')
+
+    if not payload:
+      return None
+    if 'json' not in (resp.getheader('Content-Type') or ''):
+      return payload.decode('utf-8',errors='replace')
+
+    return json.loads(payload)
+
+  def ping(self) -> bool:
+    return self.request('GET','/_ping') == 'OK'
+
+  """
+  containers: the list of running containers (same data as 'docker ps')
+  """
+  def containers(self) -> list:
+    return self.request('GET','/containers/json') or []
+
+  """
+  put_files: copy local files into a container. The 'files' parameter is a list of
+  (local file, container path) tuples; all files are sent in a single tar archive.
+  """
+  def put_files(self, container: str, files: typing.List[typing.Tuple[str,str]]) -> None:
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive,mode='w') as tar:
+      for src, dst in files:
+        try:
+          t_info = tar.gettarinfo(src,arcname=dst.lstrip('/'))
+          t_info.uid = t_info.gid = 0
+          t_info.uname = t_info.gname = 'root'
+          with open(src,'rb') as src_file:
+            tar.addfile(t_info,src_file)
+        except OSError as ex:
+          raise DockerAPIError(f'Cannot add {src} to the archive: {ex}')
+
+    self.request(
+      'PUT',f'/containers/{container}/archive',
+      body=archive.getvalue(),
+      query={ 'path': '/' },
+      content_type='application/x-tar')
+
+  """
+  exec: execute a command within a container, return the exit code, stdout, and stderr
+
+  The command output is read from the multiplexed stream as it is produced and passed to
+  the (optional) output callback. The exec stream takes over the HTTP connection, so the
+  connection is closed afterwards.
+  """
+  def exec(
+        self,
+        container: str,
+        cmd: typing.List[str],
+        output: typing.Optional[OutputCallback] = None) -> typing.Tuple[int,str,str]:
+    exec_data = self.request(
+                  'POST',f'/containers/{container}/exec',
+                  body={ 'AttachStdout': True, 'AttachStderr': True, 'Cmd': cmd })
+    exec_id = exec_data['Id']
+
+    conn, resp = self.send('POST',f'/exec/{exec_id}/start',body={ 'Detach': False, 'Tty': False })
+    captured: typing.Dict[int,list] = { 1: [], 2: [] }
+    try:
+      if resp.status >= 400:
+        raise DockerAPIError(
+          f'Cannot start command {cmd} in container {container}: '+
+          resp.read().decode('utf-8',errors='replace').strip())
+      while True:
+        header = resp.read(8)
+        if len(header) < 8:                         # End of stream
+          break
+        stream, size = struct.unpack('>BxxxL',header)
+        data = resp.read(size)
+        captured.setdefault(stream,[]).append(data)
+        if output is not None:
+          output(stream,data)
+    except (http.client.HTTPException,OSError) as ex:
+      raise DockerAPIError(f'Error reading the output of {cmd} in container {container}: {ex}')
+    finally:
+      conn.close()
+
+    exec_status = self.request('GET',f'/exec/{exec_id}/json')
+    exit_code = exec_status.get('ExitCode',None)
+    return (
+      exit_code if isinstance(exit_code,int) else -1,
+      b''.join(captured[1]).decode('utf-8',errors='replace'),
+      b''.join(captured[2]).decode('utf-8',errors='replace'))
+
+"""
+get_socket_path: the path of the Docker unix socket (None if DOCKER_HOST points to
+a remote daemon)
+"""
+def get_socket_path() -> typing.Optional[str]:
+  docker_host = os.environ.get('DOCKER_HOST','')
+  if not docker_host:
+    return DOCKER_SOCKET
+  if docker_host.startswith('unix://'):
+    return docker_host[7:]
+  return None
+
+CLIENT: typing.Optional[DockerAPI] = None
+CLIENT_CHECKED: bool = False
+CLIENT_LOCK = threading.Lock()
+
+"""
+get_client: return the shared Docker API client (or None if we cannot use the Docker API).
+The client is created on first use, which might happen in multiple threads at the same time
+"""
+def get_client() -> typing.Optional[DockerAPI]:
+  global CLIENT,CLIENT_CHECKED
+  with CLIENT_LOCK:
+    if CLIENT_CHECKED:
+      return CLIENT
+
+    CLIENT_CHECKED = True
+    s_path = get_socket_path()
+    if not s_path or not os.path.exists(s_path):
+      return None
+
+    client = DockerAPI(s_path)
+    try:
+      if client.ping():
+        CLIENT = client
+    except DockerAPIError as ex:
+      log.print_verbose(f'Cannot use Docker API on {s_path}: {ex}')
+
+    return CLIENT
+
+def reset_client() -> None:
+  global CLIENT,CLIENT_CHECKED
+  with CLIENT_LOCK:
+    if CLIENT is not None:
+      CLIENT.close()
+    CLIENT = None
+    CLIENT_CHECKED = False
@@ -2,13 +2,13 @@
 # Common routines for create-topology script
 #
 import argparse
-import inspect
 import os
 import sys
+import time
+import types
 import typing
 import warnings
 
-import rich.table
 from box import Box
 
 from ..data import types as _types
@@ -29,6 +29,8 @@ BGP_SESSIONS = ('ibgp','ebgp')
 
 _ERROR_LOG: list = []
 _WARNING_LOG: list = []
+_DIAG_LOG: typing.List[dict] = []       # Structured error/warning records (see get_error_log)
+_DIAG_START: float = time.monotonic()
 _HINTS_CACHE: list = []
 _WARNING_CACHE: list = []
 
@@ -116,6 +118,7 @@ def fatal(text: str, module: str = 'netlab', header: bool = False, indent: int =
 
   err_line = f'Fatal error in {module}: {text}'
   _ERROR_LOG.extend(err_line.split("\n"))
+  add_diag_record('FatalError',module,text)
 
   if RAISE_ON_ERROR:                              # CI flag: raise exception instead of aborting
     raise ErrorAbort(text)
@@ -180,6 +183,18 @@ def print_more_hints(
     else:
       print(f"... {line}",file=sys.stderr,flush=True)       # Teletype/file, just print the line
 
+"""
+Find the stack frame of the code that called a logging function: the first frame
+outside of this module. Frames are walked directly (unlike inspect.stack(), which
+reads the source code context of every frame on the stack)
+"""
+def get_caller_frame() -> typing.Optional[types.FrameType]:
+  frame: typing.Optional[types.FrameType] = sys._getframe(1)
+  while frame is not None and frame.f_code.co_filename == __file__:
+    frame = frame.f_back
+
+  return frame
+
 """
 If needed, get the module name that called an error function. Return whatever the caller
 supplied if it's not none, otherwise inspect the stack.
@@ -189,11 +204,26 @@ def get_calling_module(module: typing.Optional[str]) -> str:
     return module or 'topology'
 
   try:
-    err_caller = inspect.stack()[2].filename
+    err_caller = get_caller_frame().f_code.co_filename            # type: ignore[union-attr]
     return os.path.splitext(os.path.basename(err_caller))[0]
   except:
     return 'unknown'
 
+"""
+Add a structured record of an error or a warning to the diagnostics log
+"""
+def add_diag_record(category: str, module: str, text: str, **details: typing.Any) -> dict:
+  frame = get_caller_frame()
+  record = {
+    'category': category,                                           # Error category (class name)
+    'module': module,                                               # Module generating the error
+    'text': text,
+    'path': f'{frame.f_code.co_filename}:{frame.f_lineno}' if frame is not None else '',
+    'time': round(time.monotonic() - _DIAG_START,6),                # Seconds since the logging system was initialized
+    **details }                                                     # Hints and extra data
+  _DIAG_LOG.append(record)
+  return record
+
 """
 Display an error message, including error category, calling module and optional hints
 
@@ -228,6 +258,7 @@ def error(
     _WARNING_LOG.extend(f'{module}: {text}'.split("\n"))            # Warnings are collected in a separate list
   else:
     _ERROR_LOG.extend(err_line.split("\n"))                         # Append traditional error line to the CI error log
+  record = add_diag_record(err_name,module,text,hint=hint,more_hints=more_hints,more_data=more_data)
 
   if WARNING and isinstance(category,Warning):                      # CI flag: raise warning during pytest
     warnings.warn_explicit(text,category,filename=module,lineno=len(_ERROR_LOG))
@@ -270,6 +301,7 @@ def error(
 
   mod_hints = topology.defaults.hints[module]                       # Get static hints for current module
   if mod_hints[hint]:                                               # Do we know what to do?
+    record['hint_text'] = mod_hints[hint]                           # Static hints are printed once, save the text
     hint_printout = extra_data_printout(mod_hints[hint],width=90)   # Format the hint for traditional printout
     if category is not Warning:
       _ERROR_LOG.extend(hint_printout.split("\n"))
@@ -441,6 +473,7 @@ def section_header(label: str, text: str, color: str = 'green') -> None:
     print(f'{label} {text}',flush=True)
   else:
     print()
+    import rich.table
     table = rich.table.Table(show_header=False)
     l_width = min(strings.rich_width-2,80)
     table.add_column(width=l_width)
@@ -535,15 +568,44 @@ init_log_system: initialize the logging system (used to run test cases)
 """
 def init_log_system(header: bool = True) -> None:
   global _ERROR_LOG,_HINTS_CACHE,_WARNING_CACHE,_error_header_printed
+  global _DIAG_LOG,_DIAG_START
 
   _ERROR_LOG = []                                 # Clear the error log
   _HINTS_CACHE = []                               # ... and the hints
   _WARNING_CACHE = []                             # ... and the warning cache
+  _DIAG_LOG = []                                  # ... and the structured records
+  _DIAG_START = time.monotonic()
   _error_header_printed = not header              # Mark header as printed if we don't want to have one
 
   _types.init_wrong_type()
 
-def get_error_log() -> list:
+"""
+get_error_log/get_warning_log: return the accumulated errors or warnings
+
+By default, the functions return the text lines that were printed (used in CI tests). With
+records=True, they return a list of dictionaries (one per error or warning) that can be
+consumed by other tools:
+
+* category: error category (class name, 'Warning' for warnings)
+* module: module generating the error
+* text: error text (without hints)
+* hint, more_hints, more_data: the hint name, extra hints and extra data passed to 'error'
+* hint_text: the static hint text (when the static hint was printed)
+* path: source file and line that generated the error
+* time: seconds since the logging system was initialized
+"""
+def get_error_log(records: bool = False) -> list:
   global _ERROR_LOG
 
+  if records:
+    return [ r for r in _DIAG_LOG if r['category'] != 'Warning' ]
+
   return _ERROR_LOG
+
+def get_warning_log(records: bool = False) -> list:
+  global _WARNING_LOG
+
+  if records:
+    return [ r for r in _DIAG_LOG if r['category'] == 'Warning' ]
+
+  return _WARNING_LOG
@@ -0,0 +1,131 @@
+#
+# Manifest of the files created in the node_files directory
+#
+# The manifest records, for every file created by 'netlab create', the node and the
+# module/template it belongs to, the hash of the template inputs, the hash of the
+# rendered text, and the hash of the text last deployed with 'netlab initial'.
+#
+# The data hashing functions are also used to compute the transformation cache key
+#
+import hashlib
+import json
+import os
+import typing
+from pathlib import Path
+
+from .. import __version__
+from ..data import BoxView
+from . import log
+
+MANIFEST_FILE: typing.Final[str] = '.netlab.manifest.json'
+
+"""
+canonical_data: turn a data structure into something that always gets the same JSON
+representation (dictionary keys could be in any order and could be non-strings)
+"""
+def canonical_data(data: typing.Any) -> typing.Any:
+  if isinstance(data,BoxView):                    # Use the original data, not the materialized view
+    data = data.source
+  if isinstance(data,dict):
+    return [ [ repr(k), canonical_data(data[k]) ] for k in sorted(data.keys(),key=repr) ]
+  if isinstance(data,list):
+    return [ canonical_data(v) for v in data ]
+
+  return data
+
+def data_hash(data: typing.Any) -> str:
+  return hashlib.sha256(json.dumps(canonical_data(data),default=repr).encode('utf-8')).hexdigest()
+
+def text_hash(text: str) -> str:
+  return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+"""
+file_hash: return the hash of the file contents, or None if the file cannot be read
+"""
+def file_hash(path: Path) -> typing.Optional[str]:
+  try:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+  except Exception:
+    return None
+
+"""
+load_manifest: read the manifest from the node_files directory. Returns an empty
+manifest if the file does not exist, cannot be parsed, or was created by another
+netlab version.
+"""
+def load_manifest(node_files: Path) -> dict:
+  empty: dict = { 'version': __version__, 'files': {} }
+  m_file = node_files / MANIFEST_FILE
+  if not m_file.exists():
+    return empty
+
+  try:
+    manifest = json.loads(m_file.read_text())
+  except Exception as ex:
+    if log.debug_active('cache'):
+      log.info(f'Cannot read {m_file}: {ex}',module='manifest')
+    return empty
+
+  if not isinstance(manifest,dict) or manifest.get('version',None) != __version__ \
+      or not isinstance(manifest.get('files',None),dict):
+    return empty
+
+  return manifest
+
+def save_manifest(node_files: Path, manifest: dict) -> None:
+  m_file = node_files / MANIFEST_FILE
+  try:
+    node_files.mkdir(parents=True,exist_ok=True)
+    tmp_file = m_file.with_suffix('.tmp')
+    tmp_file.write_text(json.dumps(manifest,indent=1,sort_keys=True))
+    os.replace(tmp_file,m_file)
+  except Exception as ex:
+    log.warning(
+      text=f'Cannot save the node_files manifest {m_file}',
+      more_data=[ str(ex) ],
+      module='manifest')
+
+"""
+write_if_changed: write the text into a file unless the file already has the same contents.
+Returns True if the file has been written.
+"""
+def write_if_changed(path: Path, text: str) -> bool:
+  try:
+    if path.is_file() and path.read_text() == text:
+      return False
+  except Exception:                                 # Cannot read the file (or it's not text)? Overwrite it
+    pass
+
+  path.parent.mkdir(parents=True,exist_ok=True)
+  with open(path,mode='w') as output:
+    output.write(text)
+
+  return True
+
+"""
+remove_stale_files: remove all files in the node_files directory that have not been
+created in this run (and the directories that became empty)
+"""
+def remove_stale_files(node_files: Path, keep: typing.Set[str]) -> None:
+  if not node_files.is_dir():
+    return
+
+  try:
+    for root, dirs, fnames in os.walk(node_files,topdown=False):
+      r_path = Path(root)
+      for fname in fnames:
+        f_path = r_path / fname
+        f_rel  = f_path.relative_to(node_files).as_posix()
+        if f_rel != MANIFEST_FILE and f_rel not in keep:
+          f_path.unlink()
+      for dname in dirs:
+        d_path = r_path / dname
+        if d_path.is_symlink():
+          d_path.unlink()
+        elif not any(d_path.iterdir()):
+          d_path.rmdir()
+  except Exception as ex:
+    log.error(
+      "Failed to remove old files from directory 'node_files'",
+      more_data=[str(ex)],
+      module='config')
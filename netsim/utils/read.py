@@ -15,7 +15,7 @@ from box import Box
 from ..data import get_box
 from ..data import types as _types
 from ..utils import files as _files
-from ..utils import log, versioning
+from ..utils import log
 
 USER_DEFAULTS: typing.Final[list] = ['./topology-defaults.yml','~/.netlab.yml','~/topology-defaults.yml']
 SYSTEM_DEFAULTS: typing.Final[list] = ['/etc/netlab/defaults.yml','package:topology-defaults.yml']
@@ -184,23 +184,60 @@ def save_to_pickle(path: str, data: Box) -> None:
 #
 read_cache: dict = {}
 
-class UniqueKeyLoader(yaml.SafeLoader):
-  def construct_mapping(self, node : yaml.MappingNode, deep : bool = False) -> dict:
-    mapping = []
-    for key_node, value_node in node.value:
-      key = self.construct_object(key_node, deep=deep)
-      if key in mapping:
-        log.error(f"Duplicate section in YAML file: {key}",category=log.IncorrectType,module='yaml')
+"""
+check_unique_keys: find duplicate keys in a YAML mapping and (optionally) log them.
+
+Unhashable keys are skipped, the YAML constructor reports them when building the mapping.
+"""
+def check_unique_keys(loader: typing.Any, node: yaml.MappingNode, deep: bool, report: bool = True) -> None:
+  seen_keys: set = set()
+  for key_node, value_node in node.value:
+    key = loader.construct_object(key_node, deep=deep)
+    try:
+      if key in seen_keys:
+        if report:
+          log.error(f"Duplicate section in YAML file: {key}",category=log.IncorrectType,module='yaml')
         raise yaml.constructor.ConstructorError(None, None,f"Duplicate section {key}",node.start_mark)
-      mapping.append(key)
+      seen_keys.add(key)
+    except TypeError:
+      continue
+
+class PyUniqueKeyLoader(yaml.SafeLoader):
+  def construct_mapping(self, node : yaml.MappingNode, deep : bool = False) -> dict:
+    check_unique_keys(self,node,deep)
     return super().construct_mapping(node, deep)
 
+"""
+Use the libyaml parser when it's available. The libyaml loader does not report errors,
+the YAML data is parsed again with the pure-Python loader to get the usual error messages
+(libyaml error messages are different and do not include the source snippets)
+"""
+if getattr(yaml,'__with_libyaml__',False):
+  class UniqueKeyLoader(yaml.CSafeLoader):
+    def construct_mapping(self, node : yaml.MappingNode, deep : bool = False) -> dict:
+      check_unique_keys(self,node,deep,report=False)
+      return super().construct_mapping(node, deep)
+else:                                                                           # pragma: no cover
+  UniqueKeyLoader = PyUniqueKeyLoader                                           # type: ignore[misc,assignment]
+
+"""
+parse_yaml: parse a YAML file or string into a Box
+"""
+def parse_yaml(**kwargs: typing.Any) -> Box:
+  box_args: typing.Dict[str,typing.Any] = { 'default_box': True, 'box_dots': True, 'default_box_none_transform': False }
+  try:
+    return Box().from_yaml(**kwargs,**box_args,Loader=UniqueKeyLoader)
+  except yaml.YAMLError:
+    if UniqueKeyLoader is PyUniqueKeyLoader:                                    # pragma: no cover
+      raise
+    return Box().from_yaml(**kwargs,**box_args,Loader=PyUniqueKeyLoader)
+
 def read_yaml(filename: typing.Optional[str] = None, string: typing.Optional[str] = None) -> typing.Optional[Box]:
   global read_cache
 
   if string is not None:
     try:
-      yaml_data = Box().from_yaml(yaml_string=string,default_box=True,box_dots=True,default_box_none_transform=False,Loader=UniqueKeyLoader)
+      yaml_data = parse_yaml(yaml_string=string)
       return yaml_data
     except:                                                                    # pragma: no cover -- can't get here unless there's a package error
       log.fatal("Cannot parse YAML string: %s " % (str(sys.exc_info()[1])))
@@ -234,7 +271,7 @@ def read_yaml(filename: typing.Optional[str] = None, string: typing.Optional[str
         print(f"YAML file {filename} does not exist") # pragma: no cover -- too hard to test to bother
       return None
     try:
-      yaml_data = Box().from_yaml(filename=filename,default_box=True,box_dots=True,default_box_none_transform=False,Loader=UniqueKeyLoader)
+      yaml_data = parse_yaml(filename=filename)
       include_yaml(yaml_data,filename)
       read_cache[filename] = Box(yaml_data)
     except Exception as ex:
@@ -349,6 +386,7 @@ def load(
       relative_topo_name: typing.Optional[bool] = False) -> Box:
 
   if not relative_topo_name and fname.find('package:') != 0:
+    from . import versioning
     fname = str(_files.absolute_path(fname))
     fname = versioning.get_versioned_topology(fname)
 
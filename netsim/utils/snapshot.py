@@ -0,0 +1,168 @@
+#
+# Indexed lab snapshot (netlab.snapshot.idx)
+#
+# The transformed lab topology is stored as a sequence of independently pickled sections
+# (global topology elements, individual nodes and individual links) followed by an index
+# of their offsets. The snapshot file is memory-mapped when it's read; a command that needs
+# a few nodes (for example, 'netlab connect r1') unpickles only those nodes, the links they
+# are attached to, and the global topology elements.
+#
+# File layout:
+#
+# * Header: magic string, format version, offset and length of the pickled index
+# * Pickled sections, nodes and links
+# * Pickled index:
+#   - keys: top-level topology keys (to restore the original order)
+#   - sections: top-level key => (offset,length)
+#   - nodes: node name => (offset,length)
+#   - links: list of (offset,length)
+#   - link_nodes: list of node names attached to each link
+#
+import mmap
+import os
+import pickle
+import struct
+import typing
+
+from box import Box
+
+from ..data import get_box
+from . import log
+
+SNAPSHOT_FILE: typing.Final[str] = 'netlab.snapshot.idx'
+SNAPSHOT_MAGIC: typing.Final[bytes] = b'NETLAB.SNAPSHOT\n'
+SNAPSHOT_FORMAT: typing.Final[int] = 1
+
+HEADER = struct.Struct('<16sIQQ')                 # Magic string, format version, index offset and length
+
+"""
+write_snapshot: write the transformed topology (a dictionary) into an indexed snapshot file
+
+The header is written twice: first as a placeholder, and then with the final index position
+"""
+def write_snapshot(topology: dict, fname: str) -> None:
+  index: dict = { 'keys': list(topology.keys()), 'sections': {}, 'nodes': {}, 'links': [], 'link_nodes': [] }
+
+  with open(fname,'wb') as output:
+    output.write(HEADER.pack(SNAPSHOT_MAGIC,SNAPSHOT_FORMAT,0,0))
+
+    def add_blob(value: typing.Any) -> typing.Tuple[int,int]:
+      blob = pickle.dumps(value)
+      offset = output.tell()
+      output.write(blob)
+      return (offset,len(blob))
+
+    for k,v in topology.items():
+      if k == 'nodes' and isinstance(v,dict):
+        index['nodes'] = { name: add_blob(n_data) for name,n_data in v.items() }
+      elif k == 'links' and isinstance(v,list):
+        for link in v:
+          index['links'].append(add_blob(link))
+          index['link_nodes'].append([ intf.get('node',None) for intf in link.get('interfaces',[]) ])
+      else:
+        index['sections'][k] = add_blob(v)
+
+    idx_offset,idx_length = add_blob(index)
+    output.seek(0)
+    output.write(HEADER.pack(SNAPSHOT_MAGIC,SNAPSHOT_FORMAT,idx_offset,idx_length))
+
+"""
+is_snapshot: is the file an indexed snapshot in a format this netlab release understands?
+"""
+def is_snapshot(fname: str) -> bool:
+  try:
+    with open(fname,'rb') as snap_file:
+      header = snap_file.read(HEADER.size)
+  except OSError:
+    return False
+
+  if len(header) < HEADER.size:
+    return False
+
+  magic,version,_,_ = HEADER.unpack(header)
+  return magic == SNAPSHOT_MAGIC and version == SNAPSHOT_FORMAT
+
+"""
+get_snapshot_file: select the snapshot file to read instead of the pickled snapshot
+
+Returns the indexed snapshot from the same directory if it exists and is not older than
+the pickled snapshot (for example, when 'netlab create -o pickle' refreshed only the pickle)
+"""
+def get_snapshot_file(pickle_file: str) -> str:
+  idx_file = os.path.join(os.path.dirname(pickle_file),SNAPSHOT_FILE)
+  if not is_snapshot(idx_file):
+    return pickle_file
+
+  if os.path.exists(pickle_file) and os.path.getmtime(pickle_file) > os.path.getmtime(idx_file):
+    return pickle_file
+
+  return idx_file
+
+class Snapshot():
+  """
+  Memory-mapped indexed snapshot. Use it as a context manager:
+
+  with Snapshot(fname) as snap:
+    topology = snap.load(nodes=['r1'])
+  """
+  def __init__(self, fname: str) -> None:
+    self.fname = fname
+    with open(fname,'rb') as snap_file:
+      self.data = mmap.mmap(snap_file.fileno(),0,access=mmap.ACCESS_READ)
+
+    magic,version,idx_offset,idx_length = HEADER.unpack_from(self.data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT:
+      self.close()
+      raise ValueError(f'{fname} is not a netlab indexed snapshot (format {SNAPSHOT_FORMAT})')
+
+    self.index = self.load_blob((idx_offset,idx_length))
+
+  def __enter__(self) -> 'Snapshot':
+    return self
+
+  def __exit__(self, *args: typing.Any) -> None:
+    self.close()
+
+  def close(self) -> None:
+    self.data.close()
+
+  def load_blob(self, location: typing.Tuple[int,int]) -> typing.Any:
+    offset,length = location
+    return pickle.loads(self.data[offset:offset+length])
+
+  def node_names(self) -> list:
+    return list(self.index['nodes'].keys())
+
+  """
+  Load the topology data. When given a list of nodes, load only those nodes and the links
+  they're attached to, but only if all of them are in the snapshot -- the caller might be
+  looking for something else (a group, a device type, or an external tool), in which case
+  it gets the whole topology
+  """
+  def load(self, nodes: typing.Optional[list] = None) -> dict:
+    n_index = self.index['nodes']
+    selected = set(nodes) if nodes is not None and all(n in n_index for n in nodes) else None
+
+    topology: dict = {}
+    for k in self.index['keys']:
+      if k in self.index['sections']:
+        topology[k] = self.load_blob(self.index['sections'][k])
+      elif k == 'nodes':
+        topology[k] = { name: self.load_blob(loc) for name,loc in n_index.items() if selected is None or name in selected }
+      else:
+        topology[k] = [ self.load_blob(loc) for loc,l_nodes in zip(self.index['links'],self.index['link_nodes'])
+                          if selected is None or selected.intersection(l_nodes) ]
+
+    return topology
+
+"""
+read_snapshot: read the whole indexed snapshot or the selected nodes into a Box
+"""
+def read_snapshot(fname: str, nodes: typing.Optional[list] = None) -> Box:
+  try:
+    with Snapshot(fname) as snap:
+      data = snap.load(nodes)
+  except Exception as ex:
+    log.fatal(f'Cannot read indexed snapshot {fname}: {str(ex)}')
+
+  return get_box(data)
@@ -1,13 +1,12 @@
 # Usage stats utility functions
 #
+import atexit
 import os
 import time
 import typing
 
 from box import Box
-from filelock import FileLock
 
-from ..augment import devices
 from ..data import get_box, get_empty_box
 from ..data.global_vars import get_const
 from ..utils import log
@@ -46,16 +45,26 @@ lock_stats: try to acquire the lock on the status file
 '''
 STAT_LOCK: typing.Any = None
 
-def lock_stats(fname: typing.Optional[str]) -> bool:
+def lock_stats(fname: typing.Optional[str], timeout: float = 3) -> bool:
   global STAT_LOCK
   if STAT_LOCK:
     return True
   
+  from filelock import FileLock, Timeout
+
   lock_name = f'{fname}.lock'
   try:
-    STAT_LOCK = FileLock(lock_name, timeout=3)
+    STAT_LOCK = FileLock(lock_name, timeout=timeout)
     STAT_LOCK.acquire()
     return True
+  except Timeout:                                   # Somebody else is updating the stats
+    STAT_LOCK = None
+    if timeout:                                     # ... complain unless we were told not to wait
+      log.warning(
+        text=f'Cannot lock stats file {lock_name}',
+        more_data='Timeout while waiting for the lock',
+        module='stats')
+    return False
   except Exception as ex:
     log.warning(
       text=f'Cannot lock stats file {lock_name}',
@@ -75,7 +84,7 @@ lock_and_read_stats: get a lock on the stats file and read it
 
 Used as the first step in updating statistics
 '''
-def lock_and_read_stats() -> typing.Optional[Box]:
+def lock_and_read_stats(timeout: float = 3) -> typing.Optional[Box]:
   stat_name = get_filename()
   try:
     status_dir = os.path.dirname(stat_name)
@@ -84,7 +93,7 @@ def lock_and_read_stats() -> typing.Optional[Box]:
   except:
     log.fatal(f'Cannot create lab status directory {status_dir}')
 
-  if lock_stats(stat_name):
+  if lock_stats(stat_name,timeout):
     s_data = read_stats(stat_name)
     return s_data
   else:
@@ -95,6 +104,7 @@ write_stats: recreate the stats file from in-memory data and unlock it
 '''
 def write_stats(stats: Box, force: bool = False) -> None:
   if stats.get('_disabled',False) and not force:
+    unlock_stats()
     return
 
   ts = ts_int()
@@ -163,6 +173,8 @@ def update_max_vals(stats: Box, max_vals: Box) -> None:
 The fun starts here: collect statistics from lab topology data
 '''
 def update_topo_stats(topology: Box) -> None:
+  from ..augment import devices
+
   stats = lock_and_read_stats()
   if not stats:
     return
@@ -214,20 +226,42 @@ def stats_update_error(ex: Exception,item: str = '') -> None:
     module='stats')
 
 '''
-A wrapper around a bunch of other functions that increments a single counter.
-Used for simple stuff like counting commands
+Increment a single counter. Used for simple stuff like counting commands.
+
+The counter updates are batched in memory and written into the stats file
+once when the netlab command exits (flush_stats)
 '''
+PENDING_COUNTERS: typing.Dict[str,int] = {}
+FLUSH_REGISTERED: bool = False
+
 def stats_counter_update(cnt: str, val: int = 1) -> None:
+  global FLUSH_REGISTERED
+  PENDING_COUNTERS[cnt] = PENDING_COUNTERS.get(cnt,0) + val
+  if not FLUSH_REGISTERED:
+    atexit.register(flush_stats)
+    FLUSH_REGISTERED = True
+
+'''
+Write the pending counter updates into the stats file. The stats update is not
+worth waiting for: if another netlab process holds the lock, the updates are dropped
+'''
+def flush_stats() -> None:
+  if not PENDING_COUNTERS:
+    return
+
+  counters = dict(PENDING_COUNTERS)
+  PENDING_COUNTERS.clear()
   try:
-    stats = lock_and_read_stats()
+    stats = lock_and_read_stats(timeout=0)
     if stats is None:
       unlock_stats()
       return
 
-    add_counter(stats,cnt,val)
+    for cnt,val in counters.items():
+      add_counter(stats,cnt,val)
     write_stats(stats)
   except Exception as ex:
-    stats_update_error(ex,f'counter {cnt}')
+    stats_update_error(ex,'counters')
 
 '''
 Change any data in usage statistics
@@ -7,7 +7,6 @@ import sys
 import typing
 
 from box import Box
-from filelock import FileLock
 
 from ..data import get_empty_box
 from ..utils import log, strings
@@ -46,6 +45,7 @@ def change_status(topology: Box, callback: typing.Callable[[Box,Box], None]) ->
     log.fatal(f'Cannot create lab status directory {status_dir}')
 
   try:                                                      # Try to lock the status file          
+    from filelock import FileLock
     lock = FileLock(lock_file, timeout=3)
     lock.acquire()
     if os.path.exists(status_file):                       # If the status file exists, read it
@@ -7,9 +7,6 @@ import textwrap
 import typing
 
 import rich.console
-import rich.json
-import rich.syntax
-import rich.table
 from box import Box, BoxList
 
 rich_console   = rich.console.Console()
@@ -39,6 +36,7 @@ def pretty_print(txt: str, fmt: str) -> None:
     rich_console.print_json(txt)
   else:
     try:
+      import rich.syntax
       s_markup = rich.syntax.Syntax(txt,fmt)
       rich_console.print(s_markup)
     except:
@@ -183,6 +181,7 @@ def print_table(
       markup: bool = True) -> None:
 
   global rich_console
+  import rich.table
 
   # We're dynamically building table parameters in case we want to
   # add table title sometime in the future
@@ -2,19 +2,22 @@
 # Common routines for Jinja2 templating operations
 #
 import functools
+import hashlib
 import os
 import pathlib
 import typing
 from pathlib import Path
 
 from box import Box
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, meta
+from jinja2.bccache import Bucket, BytecodeCache, FileSystemBytecodeCache
 
 from ..augment import devices
+from ..data import BoxView
 from ..outputs import common as outputs_common
 from . import filters, log
 from . import strings as _strings
-from .files import create_file_from_text, find_file, get_moddir
+from .files import create_file_from_text, find_file, get_moddir, get_userdir
 
 
 def add_j2_filters(ENV: Environment) -> None:
@@ -31,6 +34,76 @@ def add_j2_filters(ENV: Environment) -> None:
   # Add fail() as a global function for template validation
   ENV.globals['fail'] = filters.j2_fail
 
+"""
+Compiled template cache
+
+Jinja2 environments are created for every unique template search path, and every
+environment would compile its own copy of a template. The TemplateCodeCache is a
+Jinja2 bytecode cache shared by all environments that:
+
+* Keeps the compiled template code in a process-wide dictionary keyed by the template
+  name and its resolved absolute path, so environments with different search paths that
+  find the same template file share the compiled code
+* Stores the compiled code in the user directory, so it can be reused by subsequent
+  netlab invocations
+
+Jinja2 checks the hash of the template source before using the cached code, so a cache
+entry is ignored (and replaced) after the template file has been changed.
+"""
+TEMPLATE_CACHE_DIR: typing.Final[str] = 'template-cache'
+
+class TemplateCodeCache(BytecodeCache):
+
+  def __init__(self, directory: typing.Optional[pathlib.Path] = None) -> None:
+    self.code_cache: typing.Dict[typing.Tuple[str,str],typing.Any] = {}
+    self.disk_cache: typing.Optional[FileSystemBytecodeCache] = None
+    if directory is None:
+      return
+    try:
+      directory.mkdir(parents=True,exist_ok=True)
+      self.disk_cache = FileSystemBytecodeCache(str(directory))
+    except Exception as ex:
+      if log.debug_active('template'):
+        print(f'Cannot use {directory} as the template cache: {ex}')
+
+  def get_cache_key(self, name: str, filename: typing.Optional[str] = None) -> str:
+    return super().get_cache_key(name,os.path.realpath(filename) if filename else None)
+
+  def load_bytecode(self, bucket: Bucket) -> None:
+    code = self.code_cache.get((bucket.key,bucket.checksum),None)
+    if code is not None:
+      bucket.code = code
+      return
+
+    if self.disk_cache is None:
+      return
+    try:
+      self.disk_cache.load_bytecode(bucket)
+    except Exception:                                     # Damaged cache entry, compile the template
+      bucket.reset()
+    if bucket.code is not None:
+      self.code_cache[(bucket.key,bucket.checksum)] = bucket.code
+
+  def dump_bytecode(self, bucket: Bucket) -> None:
+    self.code_cache[(bucket.key,bucket.checksum)] = bucket.code
+    if self.disk_cache is None:
+      return
+    try:
+      self.disk_cache.dump_bytecode(bucket)
+    except Exception as ex:                               # Failure to write the cache is not fatal
+      if log.debug_active('template'):
+        print(f'Cannot save compiled template into {self.disk_cache.directory}: {ex}')
+
+TEMPLATE_CODE_CACHE: typing.Optional[TemplateCodeCache] = None
+
+def get_template_code_cache() -> TemplateCodeCache:
+  global TEMPLATE_CODE_CACHE
+
+  if TEMPLATE_CODE_CACHE is None:
+    TEMPLATE_CODE_CACHE = TemplateCodeCache(get_userdir() / TEMPLATE_CACHE_DIR)
+
+  return TEMPLATE_CODE_CACHE
+
 """
 Render a Jinja2 template
 
@@ -48,7 +121,8 @@ Path parameters:
 def get_jinja2_env_for_path(template_path: tuple) -> Environment:
   ENV = Environment(loader=FileSystemLoader(template_path), \
           trim_blocks=True,lstrip_blocks=True, \
-          undefined=filters.j2_Undefined)
+          undefined=filters.j2_Undefined, \
+          bytecode_cache=get_template_code_cache())
   add_j2_filters(ENV)
   return ENV
 
@@ -85,6 +159,38 @@ def render_template(
 
   return template.render(**data)
 
+"""
+template_source_hash: compute the hash of a template and all templates it includes,
+imports or extends (using the same search path as render_config_text). Returns None
+if a template cannot be found or if a template uses a computed template name.
+"""
+@functools.lru_cache()
+def template_source_hash(template_path: str, extra_path: tuple) -> typing.Optional[str]:
+  in_folder = os.path.dirname(template_path)
+  search_path = (in_folder,) + tuple(p for p in extra_path if p != in_folder)
+  ENV = get_jinja2_env_for_path(search_path)
+  assert ENV.loader is not None
+
+  t_hash = hashlib.sha256()
+  t_list: typing.List[str] = [ os.path.basename(template_path) ]
+  t_seen: typing.Set[str] = set()
+  while t_list:
+    t_name = t_list.pop(0)
+    if t_name in t_seen:
+      continue
+    t_seen.add(t_name)
+    try:
+      source, filename, _ = ENV.loader.get_source(ENV,t_name)
+      t_refs = list(meta.find_referenced_templates(ENV.parse(source)))
+    except Exception:
+      return None
+    if None in t_refs:                                    # Computed template name, we can't know what's included
+      return None
+    t_hash.update(f'{filename}\n{source}\n'.encode('utf-8'))
+    t_list.extend(typing.cast(typing.List[str],t_refs))
+
+  return t_hash.hexdigest()
+
 """
 render_wrapper: when a device has a script wrapper template, use that template to create the
 final configuration script. The script wrappers should be simple, so we're using a shared Jinja2
@@ -101,22 +207,16 @@ def render_wrapper(wrapper: str, cfg_text: str, data: typing.Dict, **kwargs: typ
   return J2_WRAPPER_ENV.from_string(wrapper).render(netlab_config_text=cfg_text,**data,**kwargs)
 
 """
-write_template: Applies a custom template (in_folder/j2) and writes it to the
-given file path (out_folder/filename)
+render_config_text: Renders a configuration template (in_folder/j2)
 
 Might have to apply a default shebang (specified in 'netlab_default_shebang') or
 wrapper (specified in 'netlab_config_wrapper' group variable) to rendered text
 """
-def write_template(
+def render_config_text(
         in_folder: str,
         j2: str,
         data: typing.Dict,
-        out_folder: str,
-        filename: str,
-        extra_path: typing.Optional[list] = None) -> None:
-  if log.debug_active('template'):
-    print(f"write_template {in_folder}/{j2} -> {out_folder}/{filename}")
-  # Make sure we fail before creating any file(s)
+        extra_path: typing.Optional[list] = None) -> str:
   r_text = render_template(data=data,j2_file=j2,path=in_folder,extra_path=extra_path)
   cfg_mode = data.get('netlab_config_mode','')
   cfg_shebang = data.get('netlab_default_shebang','').strip(" \n")
@@ -136,6 +236,24 @@ def write_template(
     if wrapper:
       r_text = render_wrapper(wrapper,r_text,data,netlab_need_shebang=need_shebang)
 
+  return r_text
+
+"""
+write_template: Applies a custom template (in_folder/j2) and writes it to the
+given file path (out_folder/filename)
+"""
+def write_template(
+        in_folder: str,
+        j2: str,
+        data: typing.Dict,
+        out_folder: str,
+        filename: str,
+        extra_path: typing.Optional[list] = None) -> None:
+  if log.debug_active('template'):
+    print(f"write_template {in_folder}/{j2} -> {out_folder}/{filename}")
+  # Make sure we fail before creating any file(s)
+  r_text = render_config_text(in_folder=in_folder,j2=j2,data=data,extra_path=extra_path)
+
   # We have the final version of configuration text. Write it to the output file
   #
   pathlib.Path(out_folder).mkdir(parents=True, exist_ok=True)
@@ -264,7 +382,7 @@ def template_shared_data(topology: Box) -> dict:
   if TEMPLATE_SHARED_DATA is None:
     host_addrs = outputs_common.get_host_addresses(topology).to_dict()
     TEMPLATE_SHARED_DATA = {                      # Create the shared data we need for config templates
-      'hostvars': topology.nodes.to_dict(),
+      'hostvars': BoxView(topology.nodes),          # Node data is converted into dicts when needed
       'hosts': host_addrs,                        # Deprecated value
       'host_addrs': host_addrs,                   # New value that does not clash with Ansible
       'addressing': topology.addressing.to_dict(),
@@ -275,16 +393,19 @@ def template_shared_data(topology: Box) -> dict:
 
 """
 template_node_data: node data with extra Ansible-like attributes used in config templates or template paths
+
+Set 'shared' to False to get node data without the shared data (when the shared data is added later)
 """
-def template_node_data(n_data: Box, topology: Box) -> dict:
+def template_node_data(n_data: Box, topology: Box, shared: bool = True) -> dict:
   node_data = outputs_common.adjust_inventory_host(         # Add group variables to node data
                             node=n_data,
                             defaults=topology.defaults,
                             group_vars=True,
                             template_vars=True).to_dict()
-  shared_data = template_shared_data(topology)
-  for k,v in shared_data.items():                           # ...copy shared data
-    node_data[k] = v
+  if shared:
+    shared_data = template_shared_data(topology)
+    for k,v in shared_data.items():                         # ...copy shared data
+      node_data[k] = v
 
   # ... and add provider info
   node_data['node_provider'] = devices.get_provider(n_data,topology.defaults)
@@ -322,15 +443,31 @@ def render_config_template(
     node_dict.pop('netlab_config_mode',None)
     return True
   except Exception as ex:                               # Gee, we failed
-    short_path = template_path.replace(str(get_moddir()),'package:')
-    log.error(                                          # Report an error and move on
-      text=f"Error rendering template {template_id} for node {node.name}/device {node.device}",
-      more_data=[f'Template source: {short_path}',f'error: {str(ex)}'] + template_error_location(ex),
-      module='initial',
-      category=log.IncorrectValue)
+    report_template_error(node,template_id,template_error_data(template_path,ex))
     node_dict.pop('netlab_config_mode',None)
     return False
 
+"""
+template_error_data: the extra data describing a template rendering error. Has to be
+collected where the exception was raised (the traceback cannot be sent between processes)
+"""
+def template_error_data(template_path: str, ex: Exception) -> list:
+  short_path = template_path.replace(str(get_moddir()),'package:')
+  return [f'Template source: {short_path}',f'error: {str(ex)}'] + template_error_location(ex)
+
+def report_template_error(node: Box, template_id: str, error_data: list) -> None:
+  log.error(                                          # Report an error and move on
+    text=f"Error rendering template {template_id} for node {node.name}/device {node.device}",
+    more_data=error_data,
+    module='initial',
+    category=log.IncorrectValue)
+
+def report_missing_template(node: Box, module: str) -> None:
+  log.error(
+    f'Cannot find {module} configuration template for {node.name}/device {node.device}',
+    module='configs',
+    more_hints=["Use the '--debug template' option if you're troubleshooting custom configuration templates"])
+
 """
 Given the node data and module/template name, create a node config file
 """
@@ -351,10 +488,7 @@ def create_config_file(
               provider_path=provider_path)
 
   if not t_path:
-    log.error(
-      f'Cannot find {module} configuration template for {node.name}/device {node.device}',
-      module='configs',
-      more_hints=["Use the '--debug template' option if you're troubleshooting custom configuration templates"])
+    report_missing_template(node,module)
     return False
 
   OK = render_config_template(              # ... node.template.cfg/sh file in the output directory
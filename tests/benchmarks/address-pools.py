@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+#
+# Measure the time needed to allocate subnets from addressing pools:
+#
+# * ID-based loopback allocation (IPv4 /32 and IPv6 /64 loopbacks indexed by node ID)
+# * ID-based loopback allocation with sparse node IDs (every 100th ID)
+# * Sequential P2P link prefix allocation (IPv4 /30 and IPv6 /64)
+#
+# Usage: PYTHONPATH=../.. python3 address-pools.py [-l 10000] [-p 50000] [--json]
+#
+
+import ipaddress
+import time
+
+import benchlib
+from box import Box
+
+from netsim.augment import addressing
+from netsim.data import get_box
+from netsim.utils import log
+
+
+def create_pools() -> Box:
+  addrs = get_box({
+    'loopback': {
+      'ipv4': '10.0.0.0/8', 'ipv6': '2001:db8::/32', 'prefix': 32, 'prefix6': 64 },
+    'p2p': {
+      'ipv4': '172.16.0.0/12', 'ipv6': '2001:db9::/32', 'prefix': 30, 'prefix6': 64 }})
+  for pool in addrs.values():
+    for af in ('ipv4','ipv6'):
+      pool[f'{af}_pfx'] = ipaddress.ip_network(pool[af])
+
+  return addressing.create_pool_generators(addrs,[])
+
+def time_allocation(loopbacks: int, links: int) -> dict:
+  pools = create_pools()
+  start = time.perf_counter()
+  for n_id in range(1,loopbacks+1):
+    addressing.get(pools,['loopback'],n_id)
+  lb_time = time.perf_counter() - start
+
+  pools = create_pools()
+  start = time.perf_counter()
+  for n_id in range(100,loopbacks * 100 + 1,100):
+    addressing.get(pools,['loopback'],n_id)
+  sparse_time = time.perf_counter() - start
+
+  start = time.perf_counter()
+  for _ in range(links):
+    addressing.get(pools,['p2p'])
+  p2p_time = time.perf_counter() - start
+
+  return {
+    'loopbacks': loopbacks,
+    'loopback_time': lb_time,
+    'sparse_time': sparse_time,
+    'links': links,
+    'p2p_time': p2p_time }
+
+def main() -> None:
+  parser = benchlib.get_parser('Benchmark address pool allocation')
+  parser.add_argument('-l','--loopbacks', dest='loopbacks', type=int, default=10000, help='Number of loopbacks')
+  parser.add_argument('-p','--p2p', dest='links', type=int, default=50000, help='Number of P2P links')
+  args = parser.parse_args()
+
+  log.init_log_system(header=False)
+  result = time_allocation(args.loopbacks,args.links)
+  if benchlib.report(args,result):
+    return
+
+  print(f'{result["loopbacks"]} ID-based loopbacks: {result["loopback_time"]:.2f}s')
+  print(f'{result["loopbacks"]} ID-based loopbacks, sparse IDs: {result["sparse_time"]:.2f}s')
+  print(f'{result["links"]} sequential P2P prefixes: {result["p2p_time"]:.2f}s')
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,265 @@
+#
+# Shared scaffolding for the netlab benchmark scripts:
+#
+# * Synthetic topology generators (routed chains, leaf-and-spine fabrics, IBGP mesh,
+#   EVPN, multi-VRF, MLAG, VLAN rings)
+# * Loading and transforming generated topologies
+# * Timing (and restoring) patched netlab functions
+# * Command-line arguments and result reporting (text tables and JSON reports)
+#
+# The benchmark scripts import this module from their own directory, for example:
+#
+#   PYTHONPATH=../.. python3 transform-phases.py
+#
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import typing
+
+import yaml
+from box import Box
+
+from netsim import __version__, augment
+from netsim.utils import log, read
+
+DEVICES = [ 'frr', 'eos', 'iosv', 'cumulus', 'nxos', 'srlinux' ]
+
+"""
+Topology generators: every generator returns a topology dictionary that can be saved
+with write_topology and transformed with transform_topology
+"""
+def base_topology(node_count: int, module: list, device: str = 'frr', provider: str = 'clab') -> dict:
+  return {
+    'provider': provider,
+    'defaults': {
+      'device': device,
+      'const.MAX_NODE_ID': node_count + 10,
+      'devices.cumulus.warnings.unsupported_container': False },
+    'addressing': {
+      'loopback': { 'ipv4': '10.0.0.0/16' },
+      'mgmt': { 'ipv4': '192.168.0.0/16' },
+      'p2p': { 'ipv4': '10.128.0.0/10' },
+      'lan': { 'ipv4': '172.16.0.0/12', 'prefix': 20 } },  # Host indexes are node IDs
+    'module': module }
+
+def node_names(node_count: int, prefix: str = 'n') -> list:
+  return [ f'{prefix}{idx}' for idx in range(1,node_count+1) ]
+
+"""
+Chain of nodes (n1-n2-n3...) with optional chords (every fifth node is connected with
+the node seven hops further down the chain)
+"""
+def chord_links(nodes: list) -> list:
+  return [ f'{nodes[idx]}-{nodes[idx+7]}' for idx in range(0,len(nodes)-8,5) ]
+
+def chain_links(nodes: list, chords: bool = False) -> list:
+  links = [ f'{nodes[idx]}-{nodes[idx+1]}' for idx in range(len(nodes)-1) ]
+  return links + chord_links(nodes) if chords else links
+
+def routed_chain(
+      node_count: int,
+      module: list,
+      devices: typing.Optional[list] = None,
+      chords: bool = True,
+      provider: str = 'clab') -> dict:
+  topo = base_topology(node_count,module,provider=provider)
+  nodes = node_names(node_count)
+  topo['nodes'] = { n: { 'device': devices[idx % len(devices)] } if devices else {} for idx,n in enumerate(nodes) }
+  topo['links'] = chain_links(nodes,chords)
+  if 'bgp' in module:
+    topo['bgp'] = { 'as': 65000 }
+  return topo
+
+def fabric(node_count: int) -> typing.Tuple[list,list,list]:
+  s_count = max(2,node_count // 20)
+  spines = node_names(s_count,'s')
+  leaves = node_names(node_count-s_count,'l')
+  links = [ f'{leaf}-{spines[(idx + u) % s_count]}' for idx,leaf in enumerate(leaves) for u in range(2) ]
+  return spines,leaves,links
+
+def leaf_spine(node_count: int) -> dict:
+  spines,leaves,links = fabric(node_count)
+  topo = base_topology(node_count,[ 'ospf' ])
+  topo['nodes'] = spines + leaves
+  topo['links'] = links
+  return topo
+
+def ibgp_mesh(node_count: int) -> dict:
+  topo = base_topology(node_count,[ 'ospf', 'bgp' ])
+  topo['bgp'] = { 'as': 65000 }
+  topo['nodes'] = node_names(node_count,'r')
+  topo['links'] = [ f'r{idx}-r{idx % node_count + 1}' for idx in range(1,node_count+1) ]
+  return topo
+
+def evpn(node_count: int, vlan_count: int = 100) -> dict:
+  spines,leaves,links = fabric(node_count)
+  topo = base_topology(node_count,[ 'vlan', 'vxlan', 'ospf', 'bgp', 'evpn' ])
+  topo['bgp'] = { 'as': 65000 }
+  topo['groups'] = { 'spines': { 'members': spines, 'module': [ 'ospf', 'bgp' ], 'bgp.rr': True }}
+  topo['vlans'] = { f'v{idx}': { 'mode': 'bridge' } for idx in range(1,vlan_count+1) }
+  topo['nodes'] = spines + leaves
+  topo['links'] = links + [
+    { leaf: {}, 'vlan.access': f'v{(idx * 4 + v) % vlan_count + 1}' } for idx,leaf in enumerate(leaves) for v in range(4) ]
+  return topo
+
+"""
+Routers connected in a chain, every router has VRF-lite stub networks in 'vrf_links' VRFs
+"""
+def multi_vrf(node_count: int, vrf_count: int = 20, vrf_links: int = 2, device: str = 'frr') -> dict:
+  topo = base_topology(node_count,[ 'vrf', 'ospf' ],device=device)
+  topo['vrfs'] = { f'vrf{idx}': {} for idx in range(1,vrf_count+1) }
+  topo['nodes'] = node_names(node_count,'r')
+  topo['links'] = chain_links(topo['nodes']) + [
+    { f'r{idx}': {}, 'vrf': f'vrf{(idx + v) % vrf_count + 1}' } for idx in range(1,node_count+1) for v in range(vrf_links) ]
+  return topo
+
+def mlag(node_count: int) -> dict:
+  topo = base_topology(node_count,[ 'lag', 'vlan' ],device='eos')
+  topo['nodes'], topo['vlans'] = {}, {}
+  topo['links'] = []                                         # Static lag.ifindex: the global lag_id range is limited
+  for idx in range(1,node_count // 3 + 1):
+    s1, s2, x = f's{idx}a', f's{idx}b', f'x{idx}'
+    topo['nodes'].update({ s1: {}, s2: {}, x: {} })
+    topo['vlans'][f'v{idx}'] = {}
+    topo['links'] += [
+      { 'lag': { 'members': [ f'{s1}-{s2}' ], 'mlag.peergroup': True, 'ifindex': 1 }},
+      { 'lag': { 'members': [ f'{x}-{s1}', f'{x}-{s2}' ], 'ifindex': 2 }, 'vlan.access': f'v{idx}' } ]
+  return topo
+
+"""
+Switches connected with a ring of VLAN trunks and a VLAN access LAN segment, all VLANs
+present on all switches
+"""
+def vlan_ring(node_count: int, vlan_count: int = 4) -> dict:
+  topo = base_topology(node_count,[ 'vlan' ])
+  nodes = node_names(node_count,'s')
+  vlans = [ f'v{idx}' for idx in range(1,vlan_count+1) ]
+  topo['vlans'] = { v: {} for v in vlans }
+  topo['nodes'] = nodes
+  topo['links'] = [ { nodes[idx]: {}, nodes[(idx + 1) % node_count]: {}, 'vlan.trunk': vlans } for idx in range(node_count) ]
+  topo['links'].append({ 'interfaces': [ { 'node': n } for n in nodes ], 'vlan.access': vlans[0] })
+  return topo
+
+SCENARIOS: typing.Dict[str,typing.Callable] = {
+  'leaf-spine': leaf_spine,
+  'ibgp-mesh': ibgp_mesh,
+  'evpn': evpn,
+  'multi-vrf': multi_vrf,
+  'mlag': mlag }
+
+def write_topology(topo: dict, tmpdir: str, name: str) -> str:
+  topo_file = os.path.join(tmpdir,f'{name}.yml')
+  with open(topo_file,'w') as output:
+    output.write(yaml.safe_dump(topo))
+  return topo_file
+
+"""
+Read and transform a topology file, return the transformed topology and the transformation time
+"""
+def transform_topology(topo_file: str, quiet: bool = False) -> typing.Tuple[Box,float]:
+  log.init_log_system(header=False)
+  if quiet:
+    log.set_flag(quiet=True)
+  topology = read.load(topo_file,user_defaults=[])
+  start = time.perf_counter()
+  augment.main.transform(topology)
+  return topology,time.perf_counter() - start
+
+"""
+CallTimer: replace functions with timed wrappers and accumulate the time spent in the
+outermost calls (nested calls of timed functions are not counted twice). The original
+functions are restored when leaving the 'with' block.
+
+The optional 'select' callback gets the call arguments and decides whether to time the call
+"""
+class CallTimer:
+  def __init__(self, select: typing.Optional[typing.Callable] = None) -> None:
+    self.time = 0.0
+    self.calls = 0
+    self.depth = 0
+    self.select = select
+    self.patched: list = []
+
+  def wrap(self, f_code: typing.Callable) -> typing.Callable:
+    def timed_call(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+      if self.depth or (self.select and not self.select(*args,**kwargs)):
+        return f_code(*args,**kwargs)
+      self.depth += 1
+      start = time.perf_counter()
+      try:
+        return f_code(*args,**kwargs)
+      finally:
+        self.time += time.perf_counter() - start
+        self.calls += 1
+        self.depth -= 1
+    return timed_call
+
+  def patch(self, parent: typing.Any, name: str) -> None:
+    f_code = getattr(parent,name)
+    self.patched.append((parent,name,f_code))
+    setattr(parent,name,self.wrap(f_code))
+
+  """
+  Patch a function in all netlab modules that imported it (from module import function)
+  """
+  def patch_imported(self, f_code: typing.Callable) -> None:
+    name = f_code.__name__
+    for m_name,module in list(sys.modules.items()):
+      if m_name.startswith('netsim') and getattr(module,name,None) is f_code:
+        self.patch(module,name)
+
+  def restore(self) -> None:
+    for parent,name,f_code in reversed(self.patched):
+      setattr(parent,name,f_code)
+    self.patched = []
+
+  def __enter__(self) -> 'CallTimer':
+    return self
+
+  def __exit__(self, *exc: typing.Any) -> None:
+    self.restore()
+
+"""
+Command-line arguments shared by all benchmarks: topology sizes and output format
+"""
+def get_parser(description: str, sizes: typing.Optional[list] = None, what: str = 'nodes') -> argparse.ArgumentParser:
+  parser = argparse.ArgumentParser(description=description)
+  if sizes:
+    parser.add_argument('-n','--nodes', dest='sizes', type=int, nargs='+', default=sizes,
+                    help=f'Number of {what} in generated topologies')
+  parser.add_argument('--json', dest='json', action='store_true', help='Print the results in JSON format')
+  parser.add_argument('--report', dest='report', help='Save the JSON report into the specified file')
+  return parser
+
+"""
+Print a table of results; the columns are described with a dictionary of headings and
+functions that format the column values
+"""
+def print_table(results: list, columns: typing.Dict[str,typing.Callable]) -> None:
+  rows = [ [ str(f(r)) for f in columns.values() ] for r in results ]
+  widths = [ max([ len(h), 8 ] + [ len(row[idx]) for row in rows ]) for idx,h in enumerate(columns.keys()) ]
+  print(' '.join(h.rjust(w) for h,w in zip(columns.keys(),widths)))
+  for row in rows:
+    print(' '.join(v.rjust(w) for v,w in zip(row,widths)))
+
+"""
+Save the results (with netlab and Python versions) into the JSON report file and/or
+print them in JSON format. Returns True if the results were printed.
+"""
+def report(args: argparse.Namespace, results: typing.Any) -> bool:
+  data = {
+    'netlab': __version__,
+    'python': platform.python_version(),
+    'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    'results': results }
+  if args.report:
+    with open(args.report,'w') as output:
+      json.dump(data,output,indent=2)
+  if args.json:
+    json.dump(data,sys.stdout,indent=2)
+    print()
+  return args.json
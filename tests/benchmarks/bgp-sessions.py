@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+#
+# Measure the time needed to transform large generated BGP topologies (a few
+# autonomous systems with route reflectors or a full IBGP mesh) and the time
+# spent building the IBGP sessions and route reflector clusters
+#
+# Usage: PYTHONPATH=../.. python3 bgp-sessions.py [-n 500 1000 2000] [-a 4] [--json]
+#
+
+import tempfile
+
+import benchlib
+
+from netsim.modules import bgp
+
+
+def generate_topology(node_count: int, as_count: int, rr_count: int) -> dict:
+  topo = benchlib.base_topology(node_count,[ 'bgp' ])
+  topo['defaults']['bgp.warnings.missing_igp'] = False
+  topo['nodes'] = {}
+  for n_id,n_name in enumerate(benchlib.node_names(node_count),start=1):
+    topo['nodes'][n_name] = { 'bgp': { 'as': 65000 + n_id % as_count } }
+    if n_id <= as_count * rr_count:                 # The first few nodes in each AS are route reflectors
+      topo['nodes'][n_name]['bgp']['rr'] = True
+
+  topo['links'] = [ f'n{n_id}-n{n_id + as_count}' for n_id in range(1,node_count-as_count+1,as_count) ]
+  return topo
+
+def time_transform(topo_file: str) -> dict:
+  with benchlib.CallTimer() as timer:
+    for f_name in ('build_ibgp_sessions','build_bgp_rr_clusters'):
+      timer.patch(bgp,f_name)
+    topology,total_time = benchlib.transform_topology(topo_file)
+
+  return {
+    'transform': total_time,
+    'ibgp': timer.time,
+    'neighbors': sum(len(n.bgp.neighbors) for n in topology.nodes.values()) }
+
+def main() -> None:
+  parser = benchlib.get_parser('Benchmark BGP session setup on generated topologies',sizes=[ 500, 1000, 2000 ])
+  parser.add_argument('-a','--as-count', dest='as_count', type=int, default=4,
+                  help='Number of autonomous systems')
+  args = parser.parse_args()
+
+  results = []
+  with tempfile.TemporaryDirectory() as tmpdir:
+    for size in args.sizes:
+      for design,rr_count in (('rr',2),('mesh',0)):
+        if design == 'mesh' and size > 1000:          # A full mesh with thousands of nodes is not realistic
+          continue
+        topo_file = benchlib.write_topology(
+                      generate_topology(size,args.as_count,rr_count),tmpdir,f'topology-{size}-{design}')
+        results.append({ 'nodes': size, 'design': design, **time_transform(topo_file) })
+
+  if benchlib.report(args,results):
+    return
+
+  benchlib.print_table(results,{
+    'nodes': lambda r: r['nodes'],
+    'design': lambda r: r['design'],
+    'neighbors': lambda r: r['neighbors'],
+    'transform': lambda r: f'{r["transform"]:.2f}s',
+    'ibgp': lambda r: f'{r["ibgp"]:.3f}s' })
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+#
+# Measure the time spent in device data lookups (get_device_attribute, get_device_features,
+# get_consolidated_device_data, get_node_group_var) while transforming large generated
+# lab topologies using a mix of devices
+#
+# Only the outermost lookup calls are timed (get_device_features calls get_device_attribute)
+#
+# Usage: PYTHONPATH=../.. python3 device-data.py [-n 100 300] [-p clab] [--json]
+#
+
+import tempfile
+
+import benchlib
+
+from netsim.augment import devices
+
+LOOKUPS = [ 'get_device_attribute', 'get_device_features', 'get_consolidated_device_data', 'get_node_group_var' ]
+
+def time_transform(topo_file: str) -> dict:
+  with benchlib.CallTimer() as timer:
+    for f_name in LOOKUPS:
+      timer.patch(devices,f_name)
+    _,total_time = benchlib.transform_topology(topo_file)
+
+  return {
+    'transform': total_time,
+    'lookups': timer.time,
+    'calls': timer.calls,
+    'share': timer.time / total_time }
+
+def main() -> None:
+  parser = benchlib.get_parser('Benchmark device data lookups on generated topologies',sizes=[ 100, 300 ])
+  parser.add_argument('-p','--provider', dest='provider', default='clab', help='Virtualization provider')
+  args = parser.parse_args()
+
+  results = []
+  with tempfile.TemporaryDirectory() as tmpdir:
+    for size in args.sizes:
+      topo = benchlib.routed_chain(size,[ 'ospf', 'bgp' ],devices=benchlib.DEVICES,provider=args.provider)
+      topo_file = benchlib.write_topology(topo,tmpdir,f'topology-{size}')
+      results.append({ 'nodes': size, **time_transform(topo_file) })
+
+  if benchlib.report(args,results):
+    return
+
+  benchlib.print_table(results,{
+    'nodes': lambda r: r['nodes'],
+    'transform': lambda r: f'{r["transform"]:.2f}s',
+    'lookups': lambda r: f'{r["lookups"]:.2f}s',
+    'calls': lambda r: r['calls'],
+    'share': lambda r: f'{r["share"]:.1%}' })
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+#
+# Measure the time needed to parse nodesets (netlab initial -l, netlab exec, netlab
+# report --node) and to create the pruned topology on large synthetic lab topologies
+#
+# The topologies are not transformed; they contain just enough data to make the
+# nodeset expressions (globs, groups, device names) meaningful.
+#
+# Usage: PYTHONPATH=../.. python3 nodeset.py [-n 500 2000] [-r 5] [--json]
+#
+
+import time
+
+import benchlib
+from box import Box
+
+from netsim import data
+from netsim.cli import _nodeset
+from netsim.utils import log
+
+NODESETS = [ 'leaf*', 'spine*,leaf1*', 'edge,all', 'frr,eos', 'leaf1,leaf2,spine20' ]
+
+def generate_topology(node_count: int) -> Box:
+  nodes = {}
+  for n_id in range(1,node_count+1):
+    n_name = f'spine{n_id}' if n_id % 20 == 0 else f'leaf{n_id}'
+    nodes[n_name] = {
+      'name': n_name,
+      'id': n_id,
+      'device': benchlib.DEVICES[n_id % len(benchlib.DEVICES)],
+      'interfaces': [
+        { 'ifindex': i, 'ifname': f'eth{i}', 'ipv4': f'10.{n_id // 250}.{n_id % 250}.{i}/24' } for i in range(1,9) ] }
+
+  return data.get_box({
+    'name': 'nodeset',
+    'nodes': nodes,
+    'groups': { 'edge': { 'members': [ n for n in nodes if n.endswith('7') ] } },
+    'links': [ { 'interfaces': [ { 'node': n } ], 'linkindex': idx } for idx,n in enumerate(nodes) ],
+    'defaults': { 'devices': { d: { 'description': d } for d in benchlib.DEVICES } } })
+
+def time_nodesets(topology: Box, repeat: int) -> dict:
+  parse_time = 0.0
+  prune_time = 0.0
+  for _ in range(repeat):
+    for ns in NODESETS:
+      start = time.perf_counter()
+      node_list = _nodeset.parse_nodeset(ns,topology)
+      parse_time += time.perf_counter() - start
+      start = time.perf_counter()
+      _nodeset.get_nodeset(topology,node_list)
+      prune_time += time.perf_counter() - start
+
+  return {
+    'parse': parse_time / repeat,
+    'prune': prune_time / repeat }
+
+def main() -> None:
+  parser = benchlib.get_parser('Benchmark nodeset parsing and topology pruning',sizes=[ 500, 2000 ])
+  parser.add_argument('-r','--repeat', dest='repeat', type=int, default=5, help='Number of iterations')
+  args = parser.parse_args()
+
+  log.init_log_system(header=False)
+  results = [ { 'nodes': size, **time_nodesets(generate_topology(size),args.repeat) } for size in args.sizes ]
+  if benchlib.report(args,results):
+    return
+
+  print(f'Time needed to process {len(NODESETS)} nodesets')
+  benchlib.print_table(results,{
+    'nodes': lambda r: r['nodes'],
+    'parse': lambda r: f'{r["parse"]:.3f}s',
+    'prune': lambda r: f'{r["prune"]:.3f}s' })
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+#
+# Measure the time needed to read large generated lab topologies with read_yaml
+# using the libyaml-based loader and the pure-Python loader
+#
+# Usage: PYTHONPATH=../.. python3 read-yaml.py [-n 1000 5000 10000] [-r 3] [--json]
+#
+
+import os
+import tempfile
+import time
+
+import benchlib
+
+from netsim.utils import read as _read
+
+"""
+Routed chain with per-node attributes and multi-access links with link attributes
+"""
+def generate_topology(node_count: int) -> dict:
+  topo = benchlib.routed_chain(node_count,[ 'ospf', 'bgp' ],chords=False)
+  for n_id,n_data in enumerate(topo['nodes'].values(),start=1):
+    n_data.update({
+      'id': n_id,
+      'device': 'frr',
+      'module': [ 'ospf', 'bgp' ],
+      'bgp': { 'as': 65000 + n_id % 100 },
+      'ospf': { 'area': f'0.0.0.{n_id % 10}' } })
+
+  topo['links'] += [ { f'n{n_id}': {}, f'n{n_id + 2}': {}, 'bandwidth': 1000 } for n_id in range(1,node_count-1,2) ]
+  return topo
+
+def time_read(fname: str, loader: type, repeat: int) -> float:
+  saved_loader = _read.UniqueKeyLoader
+  _read.UniqueKeyLoader = loader                            # type: ignore[misc]
+  try:
+    best = None
+    for _ in range(repeat):
+      _read.read_cache = {}
+      start = time.perf_counter()
+      _read.read_yaml(filename=fname)
+      elapsed = time.perf_counter() - start
+      best = elapsed if best is None else min(best,elapsed)
+  finally:
+    _read.UniqueKeyLoader = saved_loader                    # type: ignore[misc]
+
+  return best or 0.0
+
+def main() -> None:
+  parser = benchlib.get_parser('Benchmark read_yaml on generated topologies',sizes=[ 1000, 5000, 10000 ])
+  parser.add_argument('-r','--repeat', dest='repeat', type=int, default=3,
+                  help='Number of runs per measurement (the best one is reported)')
+  args = parser.parse_args()
+
+  results = []
+  with tempfile.TemporaryDirectory() as tmpdir:
+    for size in args.sizes:
+      fname = benchlib.write_topology(generate_topology(size),tmpdir,f'topology-{size}')
+      results.append({
+        'nodes': size,
+        'bytes': os.path.getsize(fname),
+        'libyaml': time_read(fname,_read.UniqueKeyLoader,args.repeat),
+        'python': time_read(fname,_read.PyUniqueKeyLoader,args.repeat) })
+
+  if benchlib.report(args,results):
+    return
+
+  benchlib.print_table(results,{
+    'nodes': lambda r: r['nodes'],
+    'bytes': lambda r: r['bytes'],
+    'libyaml': lambda r: f'{r["libyaml"]:.3f}s',
+    'python': lambda r: f'{r["python"]:.3f}s' })
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+#
+# Measure the time needed to assign unique per-VRF OSPF router IDs on devices that need them
+# (Cisco IOSv/CSR) in large generated topologies with many VRFs per PE router
+#
+# Usage: PYTHONPATH=../.. python3 router-ids.py [-n 50 200] [-v 20] [--json]
+#
+
+import tempfile
+
+import benchlib
+
+from netsim.modules import _routing
+
+"""
+Multi-VRF topology: every PE router has a VRF-lite stub network in every VRF, and
+runs OSPF in all VRFs
+"""
+def generate_topology(node_count: int, vrf_count: int) -> dict:
+  topo = benchlib.multi_vrf(node_count,vrf_count,vrf_links=vrf_count,device='iosv')
+  topo['addressing']['lan'] = { 'ipv4': '172.16.0.0/12' }     # Thousands of VRF stub networks
+  topo['addressing']['router_id'] = { 'ipv4': '10.200.0.0/16', 'prefix': 32 }
+  for vdata in topo['vrfs'].values():
+    vdata['ospf.active'] = True
+  return topo
+
+def measure(topo_file: str) -> dict:
+  with benchlib.CallTimer() as timer:
+    timer.patch(_routing,'get_unique_router_ids')
+    topology,total = benchlib.transform_topology(topo_file,quiet=True)
+
+  rids = [ vdata.ospf.router_id for n in topology.nodes.values() for vdata in n.get('vrfs',{}).values() if 'ospf' in vdata ]
+  return {
+    'router_ids': timer.time,
+    'transform': total,
+    'vrf_instances': len(rids),
+    'unique_ids': len(set(rids)) }
+
+def main() -> None:
+  parser = benchlib.get_parser('Benchmark unique VRF router ID assignment',sizes=[ 50, 200 ],what='PE routers')
+  parser.add_argument('-v','--vrfs', dest='vrfs', type=int, default=20, help='Number of VRFs per PE router')
+  args = parser.parse_args()
+
+  results = []
+  with tempfile.TemporaryDirectory() as tmpdir:
+    for size in args.sizes:
+      topo_file = benchlib.write_topology(generate_topology(size,args.vrfs),tmpdir,f'rid-{size}')
+      result = { 'nodes': size, 'vrfs': args.vrfs, **measure(topo_file) }
+      results.append(result)
+      if not args.json:
+        print(f'{size:>5} PEs, {args.vrfs} VRFs: unique router IDs {result["router_ids"]:.2f}s, '
+              f'transform {result["transform"]:.2f}s, {result["unique_ids"]}/{result["vrf_instances"]} unique VRF IDs')
+
+  benchlib.report(args,results)
+
+if __name__ == '__main__':
+  main()
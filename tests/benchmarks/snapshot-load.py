@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+#
+# Compare the time needed to load the pickled snapshot and the indexed snapshot (in full and
+# a single node) of generated OSPF+IBGP topologies. A single-node load is what 'netlab connect'
+# and 'netlab inspect --node' do when the lab directory contains an indexed snapshot.
+#
+# Usage: PYTHONPATH=../.. python3 snapshot-load.py [-n 50 200] [--json]
+#
+
+import os
+import pickle
+import tempfile
+import time
+import typing
+
+import benchlib
+
+from netsim.augment import topology as a_topology
+from netsim.utils import read, snapshot
+
+
+def timed(action: typing.Callable) -> float:
+  start = time.perf_counter()
+  action()
+  return time.perf_counter() - start
+
+def measure(topo_file: str, tmpdir: str) -> dict:
+  topology,_ = benchlib.transform_topology(topo_file,quiet=True)
+  topodict = a_topology.cleanup_topology(topology).to_dict()
+
+  p_file = os.path.join(tmpdir,'netlab.snapshot.pickle')
+  i_file = os.path.join(tmpdir,snapshot.SNAPSHOT_FILE)
+  with open(p_file,'wb') as output:
+    pickle.dump(topodict,output)
+  snapshot.write_snapshot(topodict,i_file)
+
+  n_name = list(topodict['nodes'].keys())[-1]
+  return {
+    'pickle_bytes': os.path.getsize(p_file),
+    'indexed_bytes': os.path.getsize(i_file),
+    'pickle_load': timed(lambda: read.load_pickled_data(p_file)),
+    'indexed_load': timed(lambda: snapshot.read_snapshot(i_file)),
+    'node_load': timed(lambda: snapshot.read_snapshot(i_file,nodes=[n_name])) }
+
+def main() -> None:
+  args = benchlib.get_parser(
+            'Benchmark pickled and indexed snapshot loading',
+            sizes=[ 50, 200 ], what='routers').parse_args()
+
+  results = []
+  with tempfile.TemporaryDirectory() as tmpdir:
+    for size in args.sizes:
+      topo = benchlib.routed_chain(size,[ 'ospf', 'bgp' ],chords=False)
+      topo_file = benchlib.write_topology(topo,tmpdir,f'snap-{size}')
+      result = { 'nodes': size, **measure(topo_file,tmpdir) }
+      results.append(result)
+      if not args.json:
+        print(f'{size:>5} routers: pickle {result["pickle_bytes"]/1e6:.1f}MB loaded in {result["pickle_load"]:.2f}s, '
+              f'indexed {result["indexed_bytes"]/1e6:.1f}MB loaded in {result["indexed_load"]:.2f}s, '
+              f'single node in {result["node_load"]:.3f}s')
+
+  benchlib.report(args,results)
+
+if __name__ == '__main__':
+  main()
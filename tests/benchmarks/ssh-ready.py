@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+#
+# Measure how long it takes 'netlab initial' to notice that the lab devices are ready
+#
+# The script emulates a lab with many devices that become ready at random times: every
+# device gets a local TCP server that starts sending the SSH banner when the device becomes
+# ready, and the "SSH command" is a shell command that takes a while to complete, and hangs
+# (until the timeout) while the device is not ready.
+#
+# The script reports the average and maximum delay between the time a device became
+# ready and the time the SSH readiness check succeeded, and the number of SSH logins.
+#
+# Usage: PYTHONPATH=../.. python3 ssh-ready.py [-n 200] [-t 20] [--json]
+#
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
+
+import benchlib
+from box import Box
+
+from netsim.cli import external_commands
+from netsim.cli.initial import ready
+from netsim.data import get_box
+from netsim.utils import log
+
+SSH_BANNER = b'SSH-2.0-netlab-benchmark\r\n'
+BASE_PORT = 42000
+
+def build_topology(node_count: int) -> Box:
+  topology = get_box({ 'defaults': { 'netlab': { 'initial': { 'ssh': { 'report': '' }}}}, 'nodes': {} })
+  for n_id in range(1,node_count+1):
+    topology.nodes[f'n{n_id}'] = {
+      'name': f'n{n_id}',
+      'device': 'bench',
+      'mgmt': { 'ipv4': '127.0.0.1' },
+      'ansible_user': 'bench',                     # Node variables, no need for device defaults
+      'ansible_ssh_pass': '',
+      'netlab_ssh_args': '',
+      'netlab_check_command': 'true',
+      'netlab_ssh_multiplex': False,               # The emulated SSH command cannot use SSH multiplexing
+      'netlab_check_retries': 20,
+      'netlab_check_delay': 5 }
+  return topology
+
+"""
+Emulated devices: a background thread starts a TCP server sending the SSH banner and
+creates a "device is ready" file at the time the device becomes ready
+"""
+def start_devices(topology: Box, ready_time: dict, ready_interval: float, tmpdir: str) -> asyncio.AbstractEventLoop:
+  loop = asyncio.new_event_loop()
+
+  async def banner(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    writer.write(SSH_BANNER)
+    await writer.drain()
+    writer.close()
+
+  def device_ready(n_name: str, port: int) -> None:
+    loop.create_task(asyncio.start_server(banner,'127.0.0.1',port))
+    open(os.path.join(tmpdir,n_name),'w').close()
+    ready_time[n_name] = time.time()
+
+  for idx,n_name in enumerate(topology.nodes.keys()):
+    loop.call_later(random.uniform(0,ready_interval),device_ready,n_name,BASE_PORT+idx)
+
+  threading.Thread(target=loop.run_forever,daemon=True).start()
+  return loop
+
+def measure(node_count: int, ready_interval: float, tmpdir: str) -> dict:
+  topology = build_topology(node_count)
+  ready_time: dict = {}
+  setup_ready = ready.setup_ssh_ready_parameters
+
+  def setup_emulated_devices(nodeset: list, topology: Box) -> None:
+    setup_ready(nodeset,topology)
+    for idx,n_name in enumerate(nodeset):
+      r_data = topology.nodes[n_name]._ready
+      n_file = os.path.join(tmpdir,n_name)
+      r_data.ssh_exec = [                               # A slow SSH session that hangs while the device is not ready
+        'sh','-c',
+        f'echo >>{n_file}.logins; if [ -e {n_file} ]; then sleep 0.2; date +%s.%N >{n_file}.ready; ' +
+        'else sleep 3; exit 1; fi' ]
+      r_data.ssh_host = '127.0.0.1'
+      r_data.ssh_port = BASE_PORT + idx
+
+  ready.setup_ssh_ready_parameters = setup_emulated_devices   # type: ignore
+  external_commands.has_command = lambda cmd: True            # type: ignore
+
+  loop = start_devices(topology,ready_time,ready_interval,tmpdir)
+  start = time.time()
+  ready.device_ssh_ready(list(topology.nodes.keys()),topology)
+  elapsed = time.time() - start
+  loop.call_soon_threadsafe(loop.stop)
+
+  lag = []
+  logins = 0
+  for n_name in topology.nodes.keys():
+    n_file = os.path.join(tmpdir,n_name)
+    with open(n_file+'.ready') as f_ready:
+      lag.append(float(f_ready.read()) - ready_time[n_name])
+    with open(n_file+'.logins') as f_logins:
+      logins += len(f_logins.read())
+
+  return {
+    'nodes': node_count,
+    'elapsed': round(elapsed,2),
+    'avg_lag': round(sum(lag) / len(lag),2),
+    'max_lag': round(max(lag),2),
+    'logins': logins }
+
+def main() -> None:
+  parser = benchlib.get_parser('Benchmark the SSH readiness check')
+  parser.add_argument('-n','--nodes', dest='nodes', type=int, default=200, help='Number of emulated devices')
+  parser.add_argument('-t','--time', dest='time', type=float, default=20,
+                  help='Devices become ready at random times within this interval')
+  args = parser.parse_args()
+
+  log.init_log_system(header=False)
+  with tempfile.TemporaryDirectory() as tmpdir:
+    result = measure(args.nodes,args.time,tmpdir)
+
+  if benchlib.report(args,result):
+    return
+
+  print(f"{result['nodes']} nodes ready in {result['elapsed']}s, detection lag: " +
+        f"average {result['avg_lag']}s, max {result['max_lag']}s, {result['logins']} SSH logins")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+#
+# Measure the memory needed to build the configuration template data (shared data
+# and per-node data) for large generated lab topologies, comparing the lazy hostvars
+# view with a full copy of node data (the way it was done before)
+#
+# Every measurement runs in a separate process; the script reports the peak RSS
+# increase and the peak Python memory allocation (tracemalloc) while building the
+# template data for all nodes (netlab create) or for a small subset of nodes
+# (netlab initial --limit, netlab config)
+#
+# Usage: PYTHONPATH=../.. python3 template-data.py [-n 250 1000] [-l 10] [--json]
+#
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import benchlib
+
+from netsim.utils import templates
+
+"""
+Template access pattern: every node looks at the data of all its neighbors
+(similar to what the routing protocol configuration templates do)
+"""
+def access_neighbors(node_dict: dict) -> int:
+  count = 0
+  for intf in node_dict.get('interfaces',[]):
+    for ngb in intf.get('neighbors',[]):
+      count += len(node_dict['hostvars'][ngb['node']].get('interfaces',[]))
+
+  return count
+
+def measure(topo_file: str, eager: bool, limit: int) -> dict:
+  topology,_ = benchlib.transform_topology(topo_file)
+
+  if eager:                                         # Emulate the old behavior
+    saved_view = templates.BoxView
+    templates.BoxView = lambda nodes: nodes.to_dict()   # type: ignore
+
+  base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  tracemalloc.start()
+  start = time.perf_counter()
+  for n_data in list(topology.nodes.values())[:limit or None]:
+    access_neighbors(templates.template_node_data(n_data,topology))
+  elapsed = time.perf_counter() - start
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+
+  if eager:
+    templates.BoxView = saved_view                  # type: ignore
+
+  return {
+    'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss,
+    'traced_kb': peak // 1024,
+    'time': elapsed }
+
+def run_measurement(topo_file: str, mode: str, limit: int) -> dict:
+  result = subprocess.run(
+              [ sys.executable, __file__, '--measure', topo_file, mode, str(limit) ],
+              capture_output=True, text=True, check=True)
+  return json.loads(result.stdout.strip().split('\n')[-1])
+
+def main() -> None:
+  parser = benchlib.get_parser('Benchmark memory used by configuration template data',sizes=[ 250, 1000 ])
+  parser.add_argument('-l','--limit', dest='limit', type=int, default=10,
+                  help='Number of nodes in the "subset" measurement')
+  parser.add_argument('--measure', dest='measure', nargs=3, help=argparse.SUPPRESS)
+  args = parser.parse_args()
+  if args.measure:
+    print(json.dumps(measure(args.measure[0],args.measure[1] == 'eager',int(args.measure[2]))))
+    return
+
+  results = []
+  with tempfile.TemporaryDirectory() as tmpdir:
+    for size in args.sizes:
+      topo_file = benchlib.write_topology(benchlib.routed_chain(size,[ 'ospf' ]),tmpdir,f'topology-{size}')
+      for limit in (0,args.limit):
+        results.append({
+          'nodes': size,
+          'subset': limit or size,
+          'eager': run_measurement(topo_file,'eager',limit),
+          'lazy': run_measurement(topo_file,'lazy',limit) })
+
+  if benchlib.report(args,results):
+    return
+
+  benchlib.print_table([ { 'mode': mode, **r, **r[mode] } for r in results for mode in ('eager','lazy') ],{
+    'nodes': lambda r: r['nodes'],
+    'subset': lambda r: r['subset'],
+    'mode': lambda r: r['mode'],
+    'peak RSS': lambda r: f'{r["rss_kb"]}KB',
+    'traced': lambda r: f'{r["traced_kb"]}KB',
+    'time': lambda r: f'{r["time"]:.2f}s' })
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+#
+# Measure how the topology transformation (augment.main.transform) scales with the size of
+# synthetic lab topologies, timing every step of transform_setup, transform_data and
+# post_transform, and every module hook
+#
+# Scenarios (topology generators are in benchlib.py):
+#
+# * leaf-spine: leaf-and-spine fabric running OSPF
+# * ibgp-mesh: OSPF + full mesh of IBGP sessions
+# * evpn: leaf-and-spine fabric with VLANs bridged over VXLAN (EVPN control plane)
+# * multi-vrf: routers with VRF-lite stub networks in many VRFs
+# * mlag: MLAG switch pairs with a LAG to an access switch
+#
+# The steps are discovered from the code of the transformation phases: every call of a
+# module-level function (for example, augment.links.transform or log.exit_on_error) is
+# timed; hooks called with a hook name (plugin.execute, execute_module_hooks) are timed
+# per hook. The time spent outside of the timed steps is reported as 'other'.
+#
+# The benchmark does not need any virtualization providers; it only transforms the topologies.
+#
+# Usage: PYTHONPATH=../.. python3 transform-phases.py [-n 100 500 2000] [-s leaf-spine evpn]
+#                                                     [--json] [--report file.json]
+#
+
+import argparse
+import dis
+import tempfile
+import time
+import typing
+
+import benchlib
+
+from netsim import modules
+from netsim.augment import main
+
+PHASES = [ 'transform_setup', 'transform_data', 'post_transform' ]
+
+"""
+Timer: accumulate the time spent in the outermost timed calls
+"""
+class Timer:
+  def __init__(self) -> None:
+    self.phase = ''
+    self.depth = 0
+    self.steps: typing.Dict[typing.Tuple[str,str],list] = {}
+    self.hooks: typing.Dict[typing.Tuple[str,str],list] = {}
+    self.hook_depth = 0
+
+  def add(self, table: dict, key: tuple, elapsed: float) -> None:
+    stat = table.setdefault(key,[ 0.0, 0 ])
+    stat[0] += elapsed
+    stat[1] += 1
+
+  def step(self, label: str, f_code: typing.Callable) -> typing.Callable:
+    def timed_step(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+      if self.depth or not self.phase:                # Nested step or a call outside of timed phases
+        return f_code(*args,**kwargs)
+      s_label = f'{label}({args[0]})' if args and isinstance(args[0],str) else label
+      self.depth += 1
+      start = time.perf_counter()
+      try:
+        return f_code(*args,**kwargs)
+      finally:
+        self.add(self.steps,(self.phase,s_label),time.perf_counter() - start)
+        self.depth -= 1
+    return timed_step
+
+  def phase_call(self, phase: str, f_code: typing.Callable) -> typing.Callable:
+    def timed_phase(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+      self.phase = phase
+      start = time.perf_counter()
+      try:
+        return f_code(*args,**kwargs)
+      finally:
+        self.add(self.steps,(phase,'total'),time.perf_counter() - start)
+        self.phase = ''
+    return timed_phase
+
+  def hook(self, f_code: typing.Callable) -> typing.Callable:
+    def timed_hook(module: str, method: str, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+      if self.hook_depth:
+        return f_code(module,method,*args,**kwargs)
+      self.hook_depth += 1
+      start = time.perf_counter()
+      try:
+        return f_code(module,method,*args,**kwargs)
+      finally:
+        self.add(self.hooks,(module,method),time.perf_counter() - start)
+        self.hook_depth -= 1
+    return timed_hook
+
+"""
+Find the module-level functions called from a transformation phase: chains of global
+name/attribute lookups in the phase code (for example, augment.links.transform)
+"""
+def find_steps(phase: typing.Callable) -> typing.List[typing.Tuple[typing.Any,str,str]]:
+  steps = []
+  chain: typing.List[str] = []
+  for instr in list(dis.get_instructions(phase)) + [ None ]:
+    if instr is not None and instr.opname == 'LOAD_GLOBAL':
+      chain = [ instr.argval ]
+      continue
+    if instr is not None and chain and instr.opname in ('LOAD_ATTR','LOAD_METHOD'):
+      chain.append(instr.argval)
+      continue
+    if chain:
+      parent: typing.Any = main
+      for name in chain[:-1]:
+        parent = getattr(parent,name,None)
+      if parent is not None and callable(getattr(parent,chain[-1],None)):
+        steps.append((parent,chain[-1],'.'.join(chain)))
+      chain = []
+
+  return steps
+
+def time_transform(topo_file: str) -> dict:
+  timer = Timer()
+  patched: list = []
+
+  def patch(parent: typing.Any, name: str, new_code: typing.Callable) -> None:
+    patched.append((parent,name,getattr(parent,name)))
+    setattr(parent,name,new_code)
+
+  try:
+    for phase in PHASES:
+      for parent,name,label in find_steps(getattr(main,phase)):
+        if not any(p is parent and n == name for p,n,_ in patched):
+          patch(parent,name,timer.step(label,getattr(parent,name)))
+    for phase in PHASES:
+      patch(main,phase,timer.phase_call(phase,getattr(main,phase)))
+    patch(modules,'call_module_hook',timer.hook(modules.call_module_hook))
+
+    topology,total = benchlib.transform_topology(topo_file)
+  finally:
+    for parent,name,f_code in reversed(patched):
+      setattr(parent,name,f_code)
+
+  steps = []
+  for phase in PHASES:
+    p_steps = [ (k[1],v) for k,v in timer.steps.items() if k[0] == phase and k[1] != 'total' ]
+    p_total = timer.steps.get((phase,'total'),[ 0.0, 0 ])[0]
+    steps += [ { 'phase': phase, 'step': s, 'time': v[0], 'calls': v[1] } for s,v in p_steps ]
+    steps.append({ 'phase': phase, 'step': 'other', 'time': p_total - sum(v[0] for _,v in p_steps), 'calls': 0 })
+
+  return {
+    'total': total,
+    'phases': { phase: timer.steps.get((phase,'total'),[ 0.0 ])[0] for phase in PHASES },
+    'steps': steps,
+    'hooks': [ { 'module': k[0], 'hook': k[1], 'time': v[0], 'calls': v[1] } for k,v in timer.hooks.items() ],
+    'nodes': len(topology.nodes),
+    'links': len(topology.get('links',[])) }
+
+def parse() -> argparse.Namespace:
+  parser = benchlib.get_parser(
+              'Benchmark the topology transformation on synthetic topologies',
+              sizes=[ 100, 500, 2000 ])
+  parser.add_argument('-s','--scenario', dest='scenarios', nargs='+', choices=list(benchlib.SCENARIOS.keys()),
+                  default=list(benchlib.SCENARIOS.keys()), help='Topology scenarios')
+  parser.add_argument('-t','--top', dest='top', type=int, default=10, help='Number of slowest steps/hooks to print')
+  return parser.parse_args()
+
+def print_results(result: dict, top: int) -> None:
+  print(f'{result["scenario"]}: {result["nodes"]} nodes, {result["links"]} links, transform {result["total"]:.2f}s')
+  print('  '+', '.join(f'{phase} {t:.2f}s' for phase,t in result['phases'].items()))
+  for title,items,label in (
+        ('steps',result['steps'],lambda r: f'{r["phase"]}: {r["step"]}'),
+        ('module hooks',result['hooks'],lambda r: f'{r["module"]}.{r["hook"]}')):
+    print(f'  slowest {title}:')
+    for r in sorted(items,key=lambda r: r['time'],reverse=True)[:top]:
+      print(f'    {r["time"]:>8.3f}s {r["calls"]:>7} {label(r)}')
+
+def main_bench() -> None:
+  args = parse()
+  results = []
+  with tempfile.TemporaryDirectory() as tmpdir:
+    for scenario in args.scenarios:
+      for size in args.sizes:
+        topo_file = benchlib.write_topology(benchlib.SCENARIOS[scenario](size),tmpdir,f'{scenario}-{size}')
+        result = { 'scenario': scenario, 'size': size, **time_transform(topo_file) }
+        results.append(result)
+        if not args.json:
+          print_results(result,args.top)
+
+  benchlib.report(args,results)
+
+if __name__ == '__main__':
+  main_bench()
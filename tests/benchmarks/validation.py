@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+#
+# Measure the time spent validating object attributes (validate_attributes) while
+# transforming large generated lab topologies using a mix of devices
+#
+# Only the outermost validate_attributes calls are timed (the function calls itself
+# to validate module attributes)
+#
+# Usage: PYTHONPATH=../.. python3 validation.py [-n 100 300] [-p clab] [--json]
+#
+
+import tempfile
+
+import benchlib
+
+from netsim.data import validate
+
+"""
+Routed chain of mixed devices with node, link, interface, and group attributes
+"""
+def generate_topology(node_count: int, provider: str) -> dict:
+  topo = benchlib.routed_chain(node_count,[ 'ospf', 'bgp' ],devices=benchlib.DEVICES,provider=provider)
+  topo.pop('bgp')
+  for n_data in topo['nodes'].values():
+    n_data['bgp.as'] = 65000
+  nodes = list(topo['nodes'].keys())
+  topo['links'] = [ { n1: {}, n2: { 'ospf.cost': 10 }, 'bandwidth': 1000 } for n1,n2 in zip(nodes,nodes[1:]) ]
+  topo['links'] += benchlib.chord_links(nodes)
+  topo['groups'] = {
+    'edge': { 'members': [ f'n{n_id}' for n_id in range(1,node_count+1,10) ], 'ospf.area': '0.0.0.1' }}
+  return topo
+
+def time_transform(topo_file: str) -> dict:
+  with benchlib.CallTimer() as timer:                 # Replace validate_attributes in all modules that imported it,
+    timer.patch_imported(validate.validate_attributes)  # including the validation module (recursive calls)
+    _,total_time = benchlib.transform_topology(topo_file)
+
+  return {
+    'transform': total_time,
+    'validation': timer.time,
+    'calls': timer.calls,
+    'share': timer.time / total_time }
+
+def main() -> None:
+  parser = benchlib.get_parser('Benchmark attribute validation on generated topologies',sizes=[ 100, 300 ])
+  parser.add_argument('-p','--provider', dest='provider', default='clab', help='Virtualization provider')
+  args = parser.parse_args()
+
+  results = []
+  with tempfile.TemporaryDirectory() as tmpdir:
+    for size in args.sizes:
+      topo_file = benchlib.write_topology(generate_topology(size,args.provider),tmpdir,f'topology-{size}')
+      results.append({ 'nodes': size, **time_transform(topo_file) })
+
+  if benchlib.report(args,results):
+    return
+
+  benchlib.print_table(results,{
+    'nodes': lambda r: r['nodes'],
+    'transform': lambda r: f'{r["transform"]:.2f}s',
+    'validation': lambda r: f'{r["validation"]:.2f}s',
+    'calls': lambda r: r['calls'],
+    'share': lambda r: f'{r["share"]:.1%}' })
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+#
+# Measure the VLAN module on wide L2 topologies: switches connected with a ring of VLAN
+# trunks and a VLAN access LAN segment, all VLANs present on all switches.
+#
+# Reports the time spent in the vlan module hooks, the whole transformation, the number of
+# distinct neighbor entries in SVI neighbor lists, and the size of the pickled snapshot
+#
+# Usage: PYTHONPATH=../.. python3 vlan-neighbors.py [-n 50 200] [-v 4] [--json]
+#
+
+import pickle
+import tempfile
+
+import benchlib
+
+from netsim import modules
+from netsim.augment import topology as a_topology
+
+
+def measure(topo_file: str) -> dict:
+  with benchlib.CallTimer(select=lambda module, *args, **kwargs: module == 'vlan') as timer:
+    timer.patch(modules,'call_module_hook')
+    topology,total = benchlib.transform_topology(topo_file)
+
+  entries = [ n for node in topology.nodes.values() for intf in node.interfaces
+                if intf.get('type',None) == 'svi' for n in intf.get('neighbors',[]) ]
+  snapshot = a_topology.cleanup_topology(topology).to_dict()
+  return {
+    'vlan_hooks': timer.time,
+    'transform': total,
+    'svi_neighbors': len(entries),
+    'distinct_entries': len({ id(n) for n in entries }),
+    'snapshot_bytes': len(pickle.dumps(snapshot)) }
+
+def main() -> None:
+  parser = benchlib.get_parser(
+              'Benchmark VLAN neighbor lists on wide L2 topologies',
+              sizes=[ 50, 200 ], what='switches')
+  parser.add_argument('-v','--vlans', dest='vlans', type=int, default=4, help='Number of VLANs')
+  args = parser.parse_args()
+
+  results = []
+  with tempfile.TemporaryDirectory() as tmpdir:
+    for size in args.sizes:
+      topo_file = benchlib.write_topology(benchlib.vlan_ring(size,args.vlans),tmpdir,f'vlan-{size}')
+      result = { 'nodes': size, 'vlans': args.vlans, **measure(topo_file) }
+      results.append(result)
+      if not args.json:
+        print(f'{size:>5} switches, {args.vlans} VLANs: vlan hooks {result["vlan_hooks"]:.2f}s, '
+              f'transform {result["transform"]:.2f}s, {result["svi_neighbors"]} SVI neighbors '
+              f'({result["distinct_entries"]} distinct), snapshot {result["snapshot_bytes"]/1e6:.1f}MB')
+
+  benchlib.report(args,results)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,58 @@
+#
+# Address pool allocator tests: compare the subnet allocator with the reference
+# implementation (subnet generators and lists of subnets allocated by index)
+#
+import ipaddress
+import random
+import typing
+
+import pytest
+
+from netsim.augment.addressing import SubnetAllocator
+
+
+class ReferenceAllocator:
+  def __init__(self, prefix: typing.Any, plen: int) -> None:
+    self.subnets = prefix.subnets(new_prefix=plen)
+    self.cache: list = []
+
+  def next(self) -> typing.Any:
+    return next(self.subnets,None)
+
+  def nth(self, n: int) -> typing.Any:
+    try:
+      while len(self.cache) < n:
+        self.cache.append(next(self.subnets))
+    except StopIteration:
+      return None
+    return self.cache[n-1]
+
+@pytest.mark.parametrize('prefix,plen', [
+  ('10.0.0.0/24', 32),
+  ('10.1.0.0/16', 30),
+  ('172.16.0.0/20', 24),
+  ('2001:db8:1::/56', 64),
+  ('2001:db8::/120', 127) ])
+def test_subnet_allocator(prefix: str, plen: int) -> None:
+  network = ipaddress.ip_network(prefix)
+  rng = random.Random(f'{prefix}/{plen}')
+  for _ in range(20):
+    ref = ReferenceAllocator(network,plen)
+    alloc = SubnetAllocator(network,plen)
+    for _ in range(rng.randint(1,300)):                     # A random mix of sequential and by-index allocations
+      if rng.random() < 0.4:
+        assert alloc.next() == ref.next()
+      else:
+        n = rng.randint(1,320)
+        assert alloc.nth(n) == ref.nth(n)
+
+def test_subnet_allocator_exhaustion() -> None:
+  alloc = SubnetAllocator(ipaddress.ip_network('10.0.0.0/29'),30)
+  assert str(alloc.nth(1)) == '10.0.0.0/30'
+  assert str(alloc.next()) == '10.0.0.4/30'
+  assert alloc.next() is None
+  assert alloc.nth(2) is None
+  assert str(alloc.nth(1)) == '10.0.0.0/30'
+
+  with pytest.raises(ValueError):
+    SubnetAllocator(ipaddress.ip_network('10.0.0.0/24'),16).next()
@@ -0,0 +1,132 @@
+#
+# Transformation cache tests: cache key, cache hits and misses, plugin changes,
+# warning replay, and (not) caching topologies with errors
+#
+import os
+import pathlib
+
+import pytest
+from box import Box
+
+from netsim.augment import cache
+from netsim.utils import log, read
+
+TOPOLOGY = """
+defaults.device: frr
+defaults.netlab.create.cache:
+  enabled: True
+  dir: {cache_dir}
+defaults.hints.cache_test.replay: cache test static hint
+
+plugin: [ cache_test ]
+
+nodes: [ r1, r2 ]
+links: [ r1-r2 ]
+"""
+
+PLUGIN = """
+from netsim.utils import log
+
+def post_transform(topology):
+  {action}
+"""
+
+PLUGIN_WARNING = \
+  "log.warning(text='transformation cache test warning\\nsecond line',module='cache_test'," + \
+  "hint='replay',more_hints=['cache test hint'],more_data=['cache test data'])"
+
+@pytest.fixture
+def lab(tmp_path: pathlib.Path) -> pathlib.Path:
+  log.init_log_system(header=False)
+  topo_file = tmp_path / 'topology.yml'
+  topo_file.write_text(TOPOLOGY.format(cache_dir=tmp_path / 'cache'))
+  set_plugin(tmp_path,PLUGIN_WARNING)
+  return topo_file
+
+def set_plugin(path: pathlib.Path, action: str) -> None:
+  (path / 'cache_test.py').write_text(PLUGIN.format(action=action))
+
+def load(topo_file: pathlib.Path) -> Box:
+  read.read_cache.clear()
+  return read.load(str(topo_file),user_defaults=[])
+
+def cache_entries(topo_file: pathlib.Path) -> list:
+  return list((topo_file.parent / 'cache').glob('*.pickle'))
+
+def test_key_stability(lab: pathlib.Path, tmp_path: pathlib.Path) -> None:
+  key = cache.get_cache_key(load(lab))
+  assert cache.get_cache_key(load(lab)) == key            # Same inputs, same key
+
+  cwd = os.getcwd()
+  try:
+    os.chdir(tmp_path)                                    # The key does not depend on the current directory
+    assert cache.get_cache_key(load(lab)) == key
+  finally:
+    os.chdir(cwd)
+
+  lab.write_text(lab.read_text().replace('r1-r2','r2-r1'))
+  assert cache.get_cache_key(load(lab)) != key            # Changed topology, different key
+
+def test_hit_and_miss(lab: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+  result = cache.transform(load(lab))                     # Miss: transform the topology, save the results
+  assert not log.pending_errors()
+  assert len(cache_entries(lab)) == 1
+
+  def no_transform(topology: Box) -> None:
+    raise AssertionError('cache hit expected')
+
+  monkeypatch.setattr(cache.main,'transform',no_transform)
+  cached = cache.transform(load(lab))                     # Hit: no transformation
+  assert cached.nodes.to_dict() == result.nodes.to_dict()
+  assert cached.links.to_list() == result.links.to_list()
+
+  monkeypatch.undo()
+  lab.write_text(lab.read_text().replace('[ r1, r2 ]','[ r1, r2, r3 ]'))
+  result = cache.transform(load(lab))                     # Different topology, miss
+  assert 'r3' in result.nodes
+  assert len(cache_entries(lab)) == 2
+
+def test_plugin_change(lab: pathlib.Path) -> None:
+  cache.transform(load(lab))
+  c_file = cache_entries(lab)[0]
+  assert cache.load_cached_topology(c_file) is not None
+
+  set_plugin(lab.parent,"topology.message = 'changed'")   # The cache key does not change, but the
+  assert cache.load_cached_topology(c_file) is None       # cache entry must not be used
+
+  result = cache.transform(load(lab))
+  assert result.message == 'changed'
+
+def test_warning_replay(lab: pathlib.Path, capsys: pytest.CaptureFixture) -> None:
+  def test_warnings() -> list:
+    return [ { k: v for k,v in w.items() if k not in ('path','time') }
+               for w in log.get_warning_log(records=True) if w['module'] == 'cache_test' ]
+
+  w_log = len(log.get_warning_log())
+  capsys.readouterr()
+  cache.transform(load(lab))                              # Warning generated by the plugin
+  w_uncached = test_warnings()
+  t_uncached = log.get_warning_log()[w_log:]
+  e_uncached = capsys.readouterr().err
+  assert w_uncached[0]['more_data'] == [ 'cache test data' ]
+  assert 'cache test static hint' in e_uncached
+  assert t_uncached == [ 'cache_test: transformation cache test warning', 'second line' ]
+
+  log.init_log_system(header=False)                       # Start with a clean slate (new netlab run)
+  w_log = len(log.get_warning_log())
+  cache.transform(load(lab))                              # Warning replayed from the cache entry
+  assert test_warnings() == w_uncached                    # ... with the same module, hints, and data
+  assert log.get_warning_log()[w_log:] == t_uncached
+  assert capsys.readouterr().err == e_uncached            # ... and the same printout
+
+def test_no_entry_on_error(lab: pathlib.Path) -> None:
+  set_plugin(lab.parent,"log.error('transformation cache test error',log.IncorrectValue,'cache_test')")
+  log.set_flag(raise_error=True)
+  try:
+    with pytest.raises(log.ErrorAbort):
+      cache.transform(load(lab))
+    assert log.pending_errors()
+    assert cache_entries(lab) == []
+  finally:
+    log.set_flag(raise_error=False)
+    log.init_log_system(header=False)
@@ -0,0 +1,190 @@
+#
+# Docker Engine API client tests
+#
+# The tests use a stand-in Docker daemon: a HTTP/1.1 server listening on a local
+# UNIX socket that implements the few API calls used by netlab
+#
+import http.server
+import io
+import json
+import os
+import socketserver
+import struct
+import tarfile
+import threading
+import typing
+
+import pytest
+from box import Box
+
+from netsim.data import get_box
+from netsim.providers.clab import Containerlab
+from netsim.utils import dockerapi, log
+
+
+class DockerStandIn(socketserver.ThreadingMixIn,socketserver.UnixStreamServer):
+  daemon_threads = True
+
+  def __init__(self, path: str) -> None:
+    super().__init__(path,DockerHandler)
+    self.connections = 0
+    self.uploads: typing.List[typing.Tuple[str,dict]] = []
+    self.execs: typing.Dict[str,dict] = {}
+    self.containers = {
+      'clab-test-r1': { 'Status': 'Up 2 minutes', 'Image': 'quay.io/frrouting/frr:10.0.1' },
+      'clab-test-r2': { 'Status': 'Up 1 minute', 'Image': 'quay.io/frrouting/frr:10.0.1' }}
+
+class DockerHandler(http.server.BaseHTTPRequestHandler):
+  protocol_version = 'HTTP/1.1'
+  server: DockerStandIn
+
+  def setup(self) -> None:
+    super().setup()
+    self.server.connections += 1
+
+  def log_message(self, format: str, *args: typing.Any) -> None:
+    pass
+
+  def reply(self, status: int, data: typing.Any = None, content_type: str = 'application/json') -> None:
+    body = b'' if data is None else data.encode('utf-8') if isinstance(data,str) else json.dumps(data).encode('utf-8')
+    self.send_response(status)
+    self.send_header('Content-Type',content_type)
+    self.send_header('Content-Length',str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def read_body(self) -> bytes:
+    return self.rfile.read(int(self.headers.get('Content-Length',0)))
+
+  def container(self) -> typing.Optional[str]:
+    c_name = self.path.split('/')[2]
+    if c_name in self.server.containers:
+      return c_name
+
+    self.reply(404,{ 'message': f'No such container: {c_name}' })
+    return None
+
+  def do_GET(self) -> None:
+    if self.path == '/_ping':
+      self.reply(200,'OK','text/plain')
+    elif self.path == '/containers/json':
+      self.reply(200,[ { 'Names': [ '/'+c_name ], **c_data } for c_name,c_data in self.server.containers.items() ])
+    elif self.path.startswith('/exec/'):
+      self.reply(200,{ 'ExitCode': self.server.execs[self.path.split('/')[2]]['exit'] })
+    else:
+      self.reply(404,{ 'message': 'page not found' })
+
+  def do_PUT(self) -> None:
+    c_name = self.container()
+    if c_name is None:
+      return
+    with tarfile.open(fileobj=io.BytesIO(self.read_body())) as tar:
+      files = { t_info.name: tar.extractfile(t_info).read().decode('utf-8') for t_info in tar }   # type: ignore
+    self.server.uploads.append((c_name,files))
+    self.reply(200)
+
+  def do_POST(self) -> None:
+    body = json.loads(self.read_body() or '{}')
+    if self.path.startswith('/containers/'):
+      c_name = self.container()
+      if c_name is None:
+        return
+      exec_id = f'exec{len(self.server.execs)}'
+      self.server.execs[exec_id] = { 'container': c_name, 'cmd': body['Cmd'], 'exit': 0 }
+      self.reply(201,{ 'Id': exec_id })
+      return
+
+    exec_data = self.server.execs[self.path.split('/')[2]]      # Exec start: stream the output, close the connection
+    script = exec_data['cmd'][0]
+    self.send_response(200)
+    self.send_header('Content-Type','application/vnd.docker.raw-stream')
+    self.send_header('Connection','close')
+    self.end_headers()
+    for stream,data in ((1,f'running {script}\n'),(2,'warning\n'),(1,'done\n')):
+      self.wfile.write(struct.pack('>BxxxL',stream,len(data))+data.encode('utf-8'))
+      self.wfile.flush()
+    exec_data['exit'] = 1 if 'fail' in script else 0
+    self.close_connection = True
+
+@pytest.fixture
+def docker_server(tmp_path: typing.Any, monkeypatch: pytest.MonkeyPatch) -> typing.Iterator[DockerStandIn]:
+  s_path = str(tmp_path / 'docker.sock')
+  server = DockerStandIn(s_path)
+  threading.Thread(target=server.serve_forever,daemon=True).start()
+  monkeypatch.setenv('DOCKER_HOST',f'unix://{s_path}')
+  dockerapi.reset_client()
+  yield server
+  dockerapi.reset_client()
+  server.shutdown()
+  server.server_close()
+
+def test_docker_api_connection_pool(docker_server: DockerStandIn) -> None:
+  client = dockerapi.get_client()
+  assert client is not None
+  assert client is dockerapi.get_client()
+  for _ in range(5):
+    c_list = client.containers()
+  assert [ c['Names'][0] for c in c_list ] == [ '/clab-test-r1', '/clab-test-r2' ]
+  assert docker_server.connections == 1                     # Ping and all container requests used the same connection
+
+  with pytest.raises(dockerapi.DockerAPIError,match='No such container'):
+    client.exec('nonexistent',['true'])
+
+def test_docker_api_exec(docker_server: DockerStandIn) -> None:
+  client = dockerapi.get_client()
+  assert client is not None
+  received: list = []
+  exit_code, stdout, stderr = client.exec('clab-test-r1',['/tmp/fail.sh'],output=lambda s,d: received.append((s,d)))
+  assert exit_code == 1
+  assert stdout == 'running /tmp/fail.sh\ndone\n'
+  assert stderr == 'warning\n'
+  assert received == [ (1,b'running /tmp/fail.sh\n'), (2,b'warning\n'), (1,b'done\n') ]
+  assert client.exec('clab-test-r2',['/tmp/ok.sh'])[0] == 0
+
+def test_docker_api_put_files(docker_server: DockerStandIn, tmp_path: typing.Any) -> None:
+  client = dockerapi.get_client()
+  assert client is not None
+  for f_name in ('a','b'):
+    (tmp_path / f_name).write_text(f'file {f_name}\n')
+  client.put_files('clab-test-r1',[ (str(tmp_path / 'a'),'/tmp/a.sh'), (str(tmp_path / 'b'),'/etc/b.sh') ])
+  assert docker_server.uploads == [ ('clab-test-r1',{ 'tmp/a.sh': 'file a\n', 'etc/b.sh': 'file b\n' }) ]
+
+def test_docker_api_unavailable(tmp_path: typing.Any, monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setenv('DOCKER_HOST',f'unix://{tmp_path}/missing.sock')
+  dockerapi.reset_client()
+  assert dockerapi.get_client() is None
+  monkeypatch.setenv('DOCKER_HOST','tcp://127.0.0.1:2375')
+  dockerapi.reset_client()
+  assert dockerapi.get_client() is None
+  dockerapi.reset_client()
+
+def test_clab_lab_status(docker_server: DockerStandIn) -> None:
+  status = Containerlab('clab',Box({ 'docker_api': True })).get_lab_status()
+  assert status['clab-test-r2'].status == 'Up 1 minute'
+  assert status['clab-test-r1'].image == 'quay.io/frrouting/frr:10.0.1'
+
+def test_clab_deploy_node_config(
+      docker_server: DockerStandIn,
+      tmp_path: typing.Any,
+      monkeypatch: pytest.MonkeyPatch) -> None:
+  log.init_log_system(header=False)
+  monkeypatch.chdir(tmp_path)
+  os.makedirs('node_files/r1')
+  for script in ('initial','ospf','bgp'):
+    (tmp_path / 'node_files' / 'r1' / script).write_text(f'echo {script}\n')
+
+  node = get_box({
+    'name': 'r1',
+    'clab': {
+      'name': 'clab-test-r1',
+      'config_templates': [
+        { 'source': 'initial', 'target': '/etc/config/initial.sh', 'mode': 'cp_sh' },
+        { 'source': 'ospf', 'target': '/etc/config/ospf.sh', 'mode': 'cp_sh' },
+        { 'source': 'bgp', 'target': '/etc/config/bgp.sh', 'mode': 'cp_sh' } ]}})
+  topology = get_box({ 'name': 'test', 'nodes': { 'r1': node }})
+  Containerlab('clab',Box({ 'docker_api': True })).deploy_node_config(node,topology,['initial','ospf'])
+
+  assert docker_server.uploads == [                         # A single upload with all the scripts we need
+    ('clab-test-r1',{ 'etc/config/initial.sh': 'echo initial\n', 'etc/config/ospf.sh': 'echo ospf\n' }) ]
+  assert [ e['cmd'] for e in docker_server.execs.values() ] == [ ['/etc/config/initial.sh'], ['/etc/config/ospf.sh'] ]
+  assert node._deploy.success == [ 'initial', 'ospf' ]
@@ -0,0 +1,70 @@
+#
+# External command execution tests: captured output, streaming, concurrency
+#
+import asyncio
+import concurrent.futures
+import time
+
+from netsim.cli import external_commands
+
+
+def test_capture_output() -> None:
+  received: list = []
+  result = external_commands.run_command_capture(
+             [ 'sh', '-c', 'echo one; echo two >&2; printf three; exit 3' ],
+             output=lambda stream,line: received.append((stream,line)))
+  assert result.returncode == 3 and not result.OK
+  assert result.stdout == 'one\nthree'
+  assert result.stderr == 'two\n'
+  assert sorted(received) == [ (1,'one\n'), (1,'three'), (2,'two\n') ]
+
+def test_ring_buffer() -> None:
+  result = external_commands.run_command_capture([ 'seq', '1', '1000' ],max_lines=5)
+  assert result.OK
+  assert result.stdout == '996\n997\n998\n999\n1000\n'
+  assert result.dropped[1] == 995
+
+def test_errors() -> None:
+  result = external_commands.run_command_capture([ 'netlab-nonexistent-command' ])
+  assert result.returncode is None and result.error
+
+  result = external_commands.run_command_capture([ 'sleep', '5' ],timeout=0.2)
+  assert result.timed_out and result.returncode is None
+
+def test_concurrent_threads() -> None:
+  def run(idx: int) -> external_commands.CommandResult:
+    return external_commands.run_command_result(
+             [ 'sh', '-c', f'for i in 1 2 3; do echo out{idx}; echo err{idx} >&2; sleep 0.01; done; exit {idx % 2}' ])
+
+  with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+    results = list(executor.map(run,range(16)))
+
+  for idx,result in enumerate(results):                     # Every invocation gets its own output
+    assert result.returncode == idx % 2
+    assert result.stdout == f'out{idx}\n' * 3
+    assert result.stderr == f'err{idx}\n' * 3
+
+def test_async_commands() -> None:
+  async def run_all() -> list:
+    return await asyncio.gather(
+             *[ external_commands.run_command_async([ 'sh', '-c', f'sleep 0.2; echo {idx}' ]) for idx in range(50) ])
+
+  start = time.monotonic()
+  results = asyncio.run(run_all())
+  assert [ r.stdout for r in results ] == [ f'{idx}\n' for idx in range(50) ]
+  assert time.monotonic() - start < 5                       # The commands were executed concurrently
+
+def test_run_command() -> None:
+  assert external_commands.run_command('echo hello',check_result=True,return_stdout=True) == 'hello\n'
+  assert external_commands.CAPTURED_STDOUT == 'hello\n'
+  assert external_commands.run_command([ 'sh', '-c', 'exit 2' ],check_result=True,ignore_errors=True) is False
+  assert external_commands.run_command([ 'sh', '-c', 'exit 2' ],check_result=True,return_exitcode=True) == 2
+  assert external_commands.run_command([ 'netlab-nonexistent-command' ],check_result=True,ignore_errors=True) is False
+
+def test_sync_calls_in_event_loop() -> None:
+  async def run_sync() -> tuple:                            # Synchronous calls made from async code
+    return (
+      external_commands.run_command('echo hello',check_result=True,return_stdout=True),
+      external_commands.run_command_capture([ 'echo', 'world' ]).stdout)
+
+  assert asyncio.run(run_sync()) == ('hello\n','world\n')
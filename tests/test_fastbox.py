@@ -0,0 +1,110 @@
+#
+# Fast box tests: boxes created or merged by data.fastbox must be indistinguishable from
+# the boxes python-box would create (contents, box settings, safe attribute names, BoxLists)
+#
+import typing
+
+import pytest
+from box import Box, BoxList
+
+from netsim import augment, data
+from netsim.data import fastbox
+from netsim.utils import log, read
+
+
+def check_same(ref: typing.Any, new: typing.Any, path: str = 'top') -> None:
+  assert type(ref) is type(new), path
+  if isinstance(ref,Box):
+    assert ref._box_config == new._box_config, path
+    assert list(dict.keys(ref)) == list(dict.keys(new)), path
+    for k in dict.keys(ref):
+      check_same(dict.__getitem__(ref,k),dict.__getitem__(new,k),f'{path}.{k}')
+  elif isinstance(ref,BoxList):
+    assert ref.box_options == new.box_options, path
+    assert len(ref) == len(new), path
+    for idx,(r_item,n_item) in enumerate(zip(ref,new)):
+      check_same(r_item,n_item,f'{path}[{idx}]')
+  else:
+    assert ref == new, path
+
+SAMPLES = [
+  { 'a': 1, 'b': { 'c': [ 1, { 'd': 2 }, [ 3, { 'e': 4 } ] ] }, 'n': None },
+  { 'a.b': 1, 'a': { 'c': 2 }, 'x[0]': 3, 'x': [ 1 ], 'l': [ { 'p.q': 1 } ] },
+  { 'class': 1, 'ansible-host': 2, 42: 3, '1st': 4, 'Ünicode': 5 },
+  { 'list': BoxList([ 1, { 'a': 1 } ]), 'box': Box({ 'x': { 'y': 1 } }) },
+]
+
+@pytest.fixture(scope='module')
+def topology() -> Box:
+  log.init_log_system(header=False)
+  topo = read.load('topology/input/vlan-bridge-trunk-router.yml',user_defaults=[])
+  augment.main.transform(topo)
+  return topo
+
+@pytest.mark.parametrize('sample',SAMPLES)
+def test_build_box(sample: dict) -> None:
+  check_same(Box(sample,**fastbox.BOX_SETTINGS),fastbox.build_box(sample))
+
+def test_build_topology(topology: Box) -> None:
+  for source in [ topology, topology.nodes.to_dict(), topology.defaults.vlan ]:
+    check_same(Box(source,**fastbox.BOX_SETTINGS),fastbox.build_box(source))
+
+def test_shared_lists(topology: Box) -> None:
+  node = topology.nodes[list(topology.nodes.keys())[0]]
+  copy = fastbox.build_box(node)
+  assert copy.interfaces is node.interfaces                 # python-box shares BoxList values with the source
+  assert copy.interfaces[0] is node.interfaces[0]
+
+@pytest.mark.parametrize('right',SAMPLES)
+def test_merge_boxes(topology: Box, right: dict) -> None:
+  node = topology.nodes[list(topology.nodes.keys())[0]]
+  left = fastbox.build_box({ 'a': { 'c': 1, 'x': 2 }, 'b': [ 1 ], 'class': { 'z': 0 } })
+  for l_box,r_box in [ (left,right), (node,right), (left,node), (node,topology.defaults.vlan) ]:
+    check_same(l_box + r_box,fastbox.merge_boxes(l_box,r_box))
+
+def test_fast_box_setting() -> None:
+  assert fastbox.is_netlab_box(data.get_box({ 'a': 1 }))
+  try:
+    data.set_fast_box(False)
+    check_same(Box({ 'a': { 'b': 1 } },**fastbox.BOX_SETTINGS),data.get_box({ 'a': { 'b': 1 } }))
+    assert data.merge_box(data.get_box({ 'a': 1 }),{ 'b': 2 }) == { 'a': 1, 'b': 2 }
+  finally:
+    data.set_fast_box(True)
+
+  other = Box({ 'a': 1 },box_intact_types=(Box,))           # Boxes with other settings are merged by python-box
+  assert not fastbox.is_netlab_box(other)
+  check_same(other + { 'b': { 'c': 1 } },fastbox.merge_boxes(other,{ 'b': { 'c': 1 } }))
+
+def test_self_check(monkeypatch: pytest.MonkeyPatch) -> None:
+  assert fastbox.COMPATIBLE and fastbox.self_check()
+
+  monkeypatch.setattr(fastbox,'_template',dict(fastbox._template,box_extra=True))   # Emulate a python-box change
+  assert not fastbox.self_check()
+  monkeypatch.undo()
+
+  monkeypatch.setattr(fastbox,'COMPATIBLE',False)           # The fast path cannot be enabled if the self-check failed
+  try:
+    data.set_fast_box(True)
+    assert not data.FAST_BOX
+  finally:
+    monkeypatch.undo()
+    data.set_fast_box(True)
+
+def test_fast_box_scope(monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setenv('NETLAB_NETLAB_CREATE_FAST__BOX','false')
+  assert not data.get_fast_box_default()
+  monkeypatch.delenv('NETLAB_NETLAB_CREATE_FAST__BOX')
+  assert data.get_fast_box_default()
+
+  fast_box_used = []
+  monkeypatch.setattr(augment.main,'transform_data',lambda topology: fast_box_used.append(data.FAST_BOX))
+  monkeypatch.setattr(augment.main,'post_transform',lambda topology: None)
+
+  log.init_log_system(header=False)
+  read.read_cache.clear()                                   # Do not modify cached topology data
+  topology = read.load('topology/input/vlan-bridge-trunk-router.yml',user_defaults=[])
+  topology.defaults.netlab.create.fast_box = False
+  augment.main.transform(topology)
+  read.read_cache.clear()
+  assert fast_box_used == [ False ]                         # The topology setting is used during the transformation
+  assert data.FAST_BOX                                      # ... but does not leak into subsequent transformations
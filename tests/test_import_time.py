@@ -0,0 +1,55 @@
+#
+# CLI startup tests: modules imported by netlab commands (measured with python -X importtime)
+#
+# Commands must not import the modules they do not need (for example, the topology
+# transformation code or Jinja2). The import-time budgets depend on the machine running
+# the tests and are checked only when NETLAB_IMPORT_BUDGET is set to the budget scale
+# factor (use 1 for the budgets below)
+#
+import os
+import subprocess
+import sys
+
+import pytest
+
+PKG_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUDGET_SCALE = os.environ.get('NETLAB_IMPORT_BUDGET',None)
+
+CLI_BUDGETS = {                                           # Import time budgets (ms) and modules that must not be imported
+  'help':    (150, [ 'netsim.augment.main', 'netsim.modules', 'jinja2', 'filelock', 'netaddr' ]),
+  'connect': (175, [ 'netsim.augment.main', 'netsim.modules', 'jinja2', 'asyncio' ]),
+  'status':  (175, [ 'netsim.augment.main', 'netsim.modules', 'jinja2' ]),
+  'version': (160, [ 'netsim.augment.main', 'netsim.modules', 'jinja2' ]),
+}
+
+def import_times(module: str) -> dict:
+  result = subprocess.run(
+             [ sys.executable, '-X', 'importtime', '-c', f'import {module}' ],
+             capture_output=True, text=True, cwd=PKG_ROOT, env=dict(os.environ,PYTHONPATH=PKG_ROOT))
+  assert result.returncode == 0, result.stderr
+
+  times = {}
+  for line in result.stderr.splitlines():                 # import time: self [us] | cumulative | imported package
+    if not line.startswith('import time:') or '|' not in line:
+      continue
+    _,cumulative,name = line.split('|')
+    if not cumulative.strip().isdigit():                  # Skip the header line
+      continue
+    times[name.rstrip()] = int(cumulative)
+
+  return times
+
+@pytest.mark.parametrize('cmd',CLI_BUDGETS.keys())
+def test_cli_imports(cmd: str) -> None:
+  _,forbidden = CLI_BUDGETS[cmd]
+  imported = { name.strip() for name in import_times(f'netsim.cli.{cmd}') }
+  assert [ m for m in forbidden if m in imported ] == [], f'netlab {cmd} imports modules it does not need'
+
+@pytest.mark.skipif(BUDGET_SCALE is None,reason='set NETLAB_IMPORT_BUDGET to check import-time budgets')
+@pytest.mark.parametrize('cmd',CLI_BUDGETS.keys())
+def test_cli_import_time(cmd: str) -> None:
+  budget,_ = CLI_BUDGETS[cmd]
+  times = import_times(f'netsim.cli.{cmd}')
+  total = sum(t for name,t in times.items() if name.startswith(' netsim'))  # Top-level netsim imports (the rest is Python startup)
+  assert total / 1000 < budget * float(BUDGET_SCALE or 1), f'netlab {cmd} imports take {total/1000:.0f}ms (budget {budget}ms)'
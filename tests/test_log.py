@@ -0,0 +1,39 @@
+#
+# Error logging tests: calling module lookup and structured error records
+#
+import pytest
+
+from netsim.utils import log
+
+
+@pytest.fixture
+def error_log() -> None:
+  log.init_log_system(header=False)
+  log.set_flag(raise_error=False)
+
+def report_error() -> None:
+  log.error('bad value',log.IncorrectValue)
+
+def test_calling_module(error_log: None) -> None:
+  report_error()
+  log.warning(text='odd value')
+  log.error('explicit module',log.IncorrectAttr,'vlan')
+  assert log.get_error_log() == [
+    'IncorrectValue in test_log: bad value',
+    'IncorrectAttr in vlan: explicit module' ]
+  assert log.get_warning_log()[-1:] == [ 'test_log: odd value' ]
+
+def test_error_records(error_log: None) -> None:
+  report_error()
+  log.warning(text='odd value',module='bgp')
+  errors = log.get_error_log(records=True)
+  assert [ (r['category'],r['module'],r['text']) for r in errors ] == [ ('IncorrectValue','test_log','bad value') ]
+  assert errors[0]['path'].endswith(f'test_log.py:{report_error.__code__.co_firstlineno + 1}')
+  assert errors[0]['time'] >= 0
+
+  warnings = log.get_warning_log(records=True)
+  assert [ (r['category'],r['module'],r['text']) for r in warnings ] == [ ('Warning','bgp','odd value') ]
+  assert 'test_log.py:' in warnings[0]['path']
+
+  log.init_log_system(header=False)
+  assert log.get_error_log(records=True) == []
@@ -0,0 +1,60 @@
+#
+# Indexed snapshot tests: round trip of a transformed topology and partial (per-node) loading
+#
+import os
+import pickle
+
+import pytest
+
+from netsim import augment
+from netsim.augment import topology as a_topology
+from netsim.utils import log, read, snapshot
+
+
+@pytest.fixture(scope='module')
+def topology() -> dict:
+  log.init_log_system(header=False)
+  topo = read.load('topology/input/vlan-bridge-trunk-router.yml',user_defaults=[])
+  augment.main.transform(topo)
+  return a_topology.cleanup_topology(topo).to_dict()
+
+def test_round_trip(topology: dict, tmp_path: str) -> None:
+  fname = os.path.join(tmp_path,snapshot.SNAPSHOT_FILE)
+  snapshot.write_snapshot(topology,fname)
+  assert snapshot.is_snapshot(fname)
+
+  with snapshot.Snapshot(fname) as snap:
+    assert snap.node_names() == list(topology['nodes'].keys())
+    data = snap.load()
+
+  assert list(data.keys()) == list(topology.keys())
+  assert data == topology
+
+def test_partial_load(topology: dict, tmp_path: str) -> None:
+  fname = os.path.join(tmp_path,snapshot.SNAPSHOT_FILE)
+  snapshot.write_snapshot(topology,fname)
+
+  n_name = list(topology['nodes'].keys())[0]
+  data = snapshot.read_snapshot(fname,nodes=[n_name])
+  assert list(data.nodes.keys()) == [ n_name ]
+  assert data.nodes[n_name].to_dict() == topology['nodes'][n_name]
+  assert data.defaults.to_dict() == topology['defaults']
+  assert data.links.to_list() == [ link for link in topology['links']
+                                     if n_name in [ intf['node'] for intf in link['interfaces'] ] ]
+
+  data = snapshot.read_snapshot(fname,nodes=[n_name,'no_such_node'])  # Unknown names -> load everything
+  assert list(data.nodes.keys()) == list(topology['nodes'].keys())
+
+def test_snapshot_selection(tmp_path: str) -> None:
+  p_file = os.path.join(tmp_path,'netlab.snapshot.pickle')
+  i_file = os.path.join(tmp_path,snapshot.SNAPSHOT_FILE)
+  with open(p_file,'wb') as output:
+    pickle.dump({},output)
+  assert snapshot.get_snapshot_file(p_file) == p_file           # No indexed snapshot
+
+  snapshot.write_snapshot({ 'nodes': {} },i_file)
+  os.utime(i_file,(0,0))
+  assert snapshot.get_snapshot_file(p_file) == p_file           # Indexed snapshot is older than the pickle
+
+  os.utime(i_file)
+  assert snapshot.get_snapshot_file(p_file) == i_file
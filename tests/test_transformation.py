@@ -8,12 +8,14 @@ import difflib
 import glob
 import pathlib
 import sys
+import typing
 
 import pytest
 import utils
 from box import Box
 
 from netsim import augment
+from netsim.augment import links
 from netsim.outputs import _TopologyOutput, ansible
 from netsim.utils import log
 from netsim.utils import read as _read
@@ -100,6 +102,44 @@ def test_error_cases():
   for test_case in list(glob.glob('errors/*yml')):
     run_error_case(test_case)
 
+"""
+Interface index allocation: compare the results of the incremental ifindex allocator
+with a full scan of node interfaces for every ifindex allocation in the test corpus
+"""
+def scan_unique_ifindex(node: Box, iftype: typing.Optional[str], start: int, stop: int) -> typing.Optional[int]:
+  idx_list = [
+    intf.ifindex for intf in node.interfaces
+      if iftype == intf.type or (iftype is None and intf.type not in links.VIRTUAL_INTERFACE_TYPES) ]
+  for ifindex in range(start,stop):
+    if ifindex not in idx_list:
+      return ifindex
+
+  return None
+
+@pytest.mark.filterwarnings("ignore::PendingDeprecationWarning")
+def test_ifindex_allocation(monkeypatch):
+  allocate = links.IfindexAllocator.allocate
+  count = 0
+
+  def checked_allocate(self, iftype, start, stop):  # type: ignore
+    nonlocal count
+    ifindex = allocate(self,iftype,start,stop)
+    node = [ n for n in topology.nodes.values() if n.interfaces is self.intf_list ][0]
+    assert ifindex == scan_unique_ifindex(node,iftype,start,stop), \
+      f'ifindex allocation mismatch: {test_case} node {node.name} type {iftype}'
+    count += 1
+    return ifindex
+
+  monkeypatch.setattr(links.IfindexAllocator,'allocate',checked_allocate)
+  _read.read_cache.clear()                          # Cached topologies might have been modified by earlier tests
+  for test_case in list(glob.glob('topology/input/*yml')):
+    log.set_flag(raise_error = False)
+    log.init_log_system(header = False)
+    topology = _read.load(test_case,relative_topo_name=True,user_defaults=[])
+    augment.main.transform(topology)
+
+  assert count > 0
+
 @pytest.mark.filterwarnings("ignore::PendingDeprecationWarning")
 def test_coverage_xf_cases():
   for test_case in list(glob.glob('coverage/input/*yml')):